@@ -0,0 +1,130 @@
+# admin.py
+"""
+Administrative commands that are too expensive to run on every process start.
+
+    python admin.py schema                 # create indexes/constraints, migrate, wait ONLINE
+    python admin.py ingest [--force]       # load the catalogue if its version stamp changed
+    python admin.py status                 # show the catalogue version stamp
+    python admin.py stats                  # node/relationship counts from the count store
+    python admin.py repair-progress [--all]  # verify and rebuild student progress counters
+    python admin.py import-roster FILE     # bulk create/update students from CSV or JSON Lines
+    python admin.py import-files --output import/  # CSVs for neo4j-admin offline import (no server)
+    python admin.py compact-attempts       # fold attempt log segments into the columnar store (no server)
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+from config.settings import app_config
+from core.database import DatabaseManager
+from core.sharding import build_database_manager
+from core.logging_setup import configure_from_settings
+from core.profiling import configure_from_settings as configure_profiling, profiler
+from core.schema import SchemaManager, load_declarations
+from repositories.attempt_log import AttemptLog
+from repositories.setup_repository import SetupRepository
+from repositories.student_repository import StudentRepository
+from services.data_population_service import DataPopulationService
+from services.import_file_generator import ImportFileGenerator
+from services.roster_import_service import RosterImportService
+
+configure_from_settings()
+logger = logging.getLogger(__name__)
+
+
+def apply_schema(db_manager: DatabaseManager) -> None:
+    """Create the declared schema on every shard and block until every index is ONLINE."""
+    def apply() -> None:
+        manager = SchemaManager(db_manager, load_declarations())
+        manager.apply()
+        manager.wait_until_online(app_config.index_wait_timeout)
+
+    db_manager.fan_out(apply)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="FastWise administrative commands.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('schema', help="Create constraints and indexes and run migrations")
+    ingest_parser = subparsers.add_parser('ingest', help="Load the question catalogue if it changed")
+    ingest_parser.add_argument('--file', default=app_config.data_file_path)
+    ingest_parser.add_argument('--batch-size', type=int, default=100)
+    ingest_parser.add_argument('--force', action='store_true', help="Ingest even if the stamp matches")
+    status_parser = subparsers.add_parser('status', help="Show the catalogue version stamp")
+    status_parser.add_argument('--file', default=app_config.data_file_path)
+    subparsers.add_parser('stats', help="Show node and relationship counts")
+    repair_parser = subparsers.add_parser('repair-progress', help="Verify and rebuild student progress counters")
+    repair_parser.add_argument('--batch-size', type=int, default=500)
+    repair_parser.add_argument('--all', action='store_true', help="Rebuild every student, not only drifted ones")
+    roster_parser = subparsers.add_parser('import-roster', help="Create or update students from a roster file")
+    roster_parser.add_argument('file', help="CSV (student_id,name,email header) or JSON Lines")
+    roster_parser.add_argument('--format', choices=('csv', 'jsonl'), help="Default: from the file extension")
+    roster_parser.add_argument('--batch-size', type=int, default=app_config.roster_batch_size)
+    roster_parser.add_argument('--workers', type=int, default=app_config.roster_import_workers)
+    files_parser = subparsers.add_parser(
+        'import-files', help="Write neo4j-admin import CSVs for seeding an empty database offline"
+    )
+    files_parser.add_argument('--file', default=app_config.data_file_path)
+    files_parser.add_argument('--prereq-map', default='data/prereq_map.json',
+                              help="Concept prerequisite map; pass '' to skip")
+    files_parser.add_argument('--output', default='import')
+    files_parser.add_argument('--database', default='neo4j')
+    compact_parser = subparsers.add_parser('compact-attempts', help="Compact the attempt log")
+    compact_parser.add_argument('--dir', default=app_config.attempt_log_dir)
+    args = parser.parse_args(argv)
+
+    if args.command == 'import-files':
+        # Offline: reads files and writes files, never connects to a server
+        start = time.perf_counter()
+        result = ImportFileGenerator(args.output, args.database).generate(args.file, args.prereq_map or None)
+        result['seconds'] = round(time.perf_counter() - start, 3)
+        command = result.pop('command')
+        print(json.dumps(result, indent=2))
+        print(f"\nStop the database, then run:\n\n{command}\n\nand afterwards: python admin.py schema")
+        return 0
+
+    if args.command == 'compact-attempts':
+        attempt_log = AttemptLog(args.dir, app_config.attempt_log_segment_bytes)
+        result = attempt_log.compact()
+        result['stats'] = attempt_log.stats()
+        print(json.dumps(result, indent=2))
+        return 0
+
+    configure_profiling()
+    db_manager = build_database_manager()
+    try:
+        population = DataPopulationService(db_manager, SetupRepository(db_manager))
+
+        if args.command == 'schema':
+            apply_schema(db_manager)
+        elif args.command == 'ingest':
+            start = time.perf_counter()
+            # The schema version is part of the stamp, so make sure it is applied first
+            apply_schema(db_manager)
+            stats = population.populate_if_changed(args.file, batch_size=args.batch_size, force=args.force)
+            stats['seconds'] = round(time.perf_counter() - start, 3)
+            print(json.dumps(stats, indent=2))
+            return 1 if stats.get('failed_items') else 0
+        elif args.command == 'status':
+            print(json.dumps(population.get_catalogue_status(args.file), indent=2, default=str))
+        elif args.command == 'stats':
+            print(json.dumps(population.get_population_summary(max_age=0), indent=2))
+        elif args.command == 'import-roster':
+            service = RosterImportService(StudentRepository(db_manager), args.batch_size, args.workers)
+            report = service.import_file(args.file, args.format)
+            print(json.dumps(report, indent=2))
+            return 1 if report['failed'] else 0
+        elif args.command == 'repair-progress':
+            report = StudentRepository(db_manager).repair_progress_counters(args.batch_size, rebuild_all=args.all)
+            print(json.dumps(report, indent=2))
+        return 0
+    finally:
+        # Writes the report of a session still running (e.g. PROFILE_ON_START during populate)
+        profiler.stop()
+        db_manager.close_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,591 @@
+# api/server.py
+"""
+Lightweight asyncio HTTP front-end for RecommendationService.
+
+Endpoints:
+    GET  /health
+    GET  /ready
+    GET  /stats?max_age=60
+    GET  /students/{student_id}/recommendation
+    GET  /students/{student_id}/progress
+    GET  /students/{student_id}/concepts/{concept_name}/questions?limit=10
+    GET  /students/{student_id}/reviews?limit=20&within=0
+    GET  /students/{student_id}/attempts?since=...&until=...&question_id=...&limit=100
+    POST /students/{student_id}/completions   {"question_id": "...", "is_mastered": true, "quality": 4,
+                                               "duration_seconds": 95.5}
+    GET  /reviews/due?within=3600&limit=100
+    POST /reviews/drain                       {"student_ids": [...], "within": 0, "limit_per_student": 20}
+
+Identical concurrent reads (same endpoint, student and parameters) are
+coalesced into one backend call, and responses are streamed as chunked JSON.
+
+    python -m api.server --backend memory --data data/questions.json
+    python -m api.server --backend neo4j
+"""
+import argparse
+import asyncio
+import contextvars
+import dataclasses
+import json
+import logging
+import re
+import sys
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from api.singleflight import SingleFlight
+from core.invalidation_bus import invalidation_bus
+from core.logging_setup import configure_from_settings, logging_stats
+from core.profiling import configure_from_settings as configure_profiling, profiler
+from core.readiness import ReadinessMonitor
+from core.tracing import configure_from_settings as configure_tracing, tracer
+from repositories.attempt_log import AttemptLog
+from core.exceptions import (
+    DataValidationError, DatabaseConnectionError, QuestionNotFoundError, ServiceOverloadedError,
+    StudentNotFoundError,
+)
+from services.recommendation_service import RecommendationService
+from services.review_scheduler import ReviewScheduler
+from services.statistics_service import StatisticsService
+from services.warmup_service import WarmupService
+
+logger = logging.getLogger(__name__)
+
+_REASONS = {
+    200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    500: 'Internal Server Error', 503: 'Service Unavailable',
+}
+_CHUNK_SIZE = 16 * 1024
+
+
+class ApiError(Exception):
+    """An error with an HTTP status, returned to the client as JSON."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize dataclasses (Question, Student) and date/time values."""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, 'iso_format'):
+        return value.iso_format()
+    return str(value)
+
+
+@dataclasses.dataclass
+class Route:
+    method: str
+    pattern: re.Pattern
+    # Called as handler(path_params, query, body); returns (status, payload).
+    handler: Callable[..., Awaitable[Tuple[int, Any]]]
+    # Coalesce identical concurrent requests (reads only).
+    coalesce: bool = False
+
+
+class RecommendationApi:
+    """Routes requests to RecommendationService on a worker thread pool."""
+
+    def __init__(
+        self,
+        recommendation_service: RecommendationService,
+        worker_threads: int = 32,
+        statistics: Optional[StatisticsService] = None,
+        readiness: Optional[ReadinessMonitor] = None
+    ):
+        self.service = recommendation_service
+        self.statistics = statistics
+        self.readiness = readiness
+        self.single_flight = SingleFlight()
+        self._executor = ThreadPoolExecutor(max_workers=worker_threads, thread_name_prefix="api-worker")
+        self.routes: List[Route] = [
+            Route('GET', re.compile(r'^/health$'), self.health),
+            Route('GET', re.compile(r'^/ready$'), self.ready),
+            Route('GET', re.compile(r'^/stats$'), self.stats, coalesce=True),
+            Route('GET', re.compile(r'^/students/(?P<student_id>[^/]+)/recommendation$'),
+                  self.recommendation, coalesce=True),
+            Route('GET', re.compile(r'^/students/(?P<student_id>[^/]+)/progress$'),
+                  self.progress, coalesce=True),
+            Route('GET', re.compile(r'^/students/(?P<student_id>[^/]+)/concepts/(?P<concept_name>[^/]+)/questions$'),
+                  self.concept_questions, coalesce=True),
+            Route('GET', re.compile(r'^/students/(?P<student_id>[^/]+)/reviews$'), self.student_reviews, coalesce=True),
+            Route('GET', re.compile(r'^/students/(?P<student_id>[^/]+)/attempts$'), self.attempts, coalesce=True),
+            Route('POST', re.compile(r'^/students/(?P<student_id>[^/]+)/completions$'), self.complete),
+            Route('GET', re.compile(r'^/reviews/due$'), self.due_reviews, coalesce=True),
+            Route('POST', re.compile(r'^/reviews/drain$'), self.drain_reviews),
+        ]
+
+    async def _call(self, function: Callable, *args, **kwargs) -> Any:
+        """Run a blocking service call on the worker pool, inside the caller's trace."""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, partial(context.run, function, *args, **kwargs))
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        """
+        Route one request.
+
+        Returns:
+            Tuple of (HTTP status, JSON-serializable payload)
+        """
+        with tracer.span('http.request', method=method, target=target) as span:
+            status, payload = await self._route(method, target, body)
+            span.set(status=status)
+        return status, payload
+
+    async def _route(self, method: str, target: str, body: bytes) -> Tuple[int, Any]:
+        url = urlsplit(target)
+        path = url.path
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        try:
+            path_matched = False
+            for route in self.routes:
+                match = route.pattern.match(path)
+                if not match:
+                    continue
+                path_matched = True
+                if route.method != method:
+                    continue
+                params = {key: unquote(value) for key, value in match.groupdict().items()}
+                if route.coalesce:
+                    key = (path, tuple(sorted(query.items())))
+                    return await self.single_flight.do(key, partial(route.handler, params, query, body))
+                return await route.handler(params, query, body)
+            if path_matched:
+                raise ApiError(405, f"{method} not allowed on {path}")
+            raise ApiError(404, f"No route for {path}")
+        except ApiError as e:
+            return e.status, {'error': e.message}
+        except (StudentNotFoundError, QuestionNotFoundError) as e:
+            return 404, {'error': str(e)}
+        except DataValidationError as e:
+            return 400, {'error': str(e)}
+        except ServiceOverloadedError as e:
+            logger.warning(f"Shed {method} {path}: {e}")
+            return 503, {'error': "overloaded"}
+        except DatabaseConnectionError as e:
+            logger.error(f"Backend unavailable for {method} {path}: {e}")
+            return 503, {'error': "backend unavailable"}
+        except Exception as e:
+            logger.exception(f"Unhandled error for {method} {path}: {e}")
+            return 500, {'error': "internal error"}
+
+    @staticmethod
+    def _limit(query: Dict[str, str], default: int) -> int:
+        try:
+            limit = int(query.get('limit', default))
+        except ValueError:
+            raise ApiError(400, "limit must be an integer")
+        if not 1 <= limit <= 100:
+            raise ApiError(400, "limit must be between 1 and 100")
+        return limit
+
+    async def health(self, params, query, body) -> Tuple[int, Any]:
+        healthy = await self._call(self.service.db_manager.health_check)
+        payload = {
+            'status': 'ok' if healthy else 'degraded',
+            'database': healthy,
+            'single_flight': {
+                'executed': self.single_flight.executed,
+                'coalesced': self.single_flight.coalesced,
+                'in_flight': self.single_flight.in_flight,
+            },
+        }
+        if self.service.student_directory is not None:
+            payload['student_directory'] = self.service.student_directory.stats()
+        if self.service.recommendation_cache is not None:
+            payload['recommendation_cache'] = self.service.recommendation_cache.stats()
+        if self.readiness is not None:
+            payload['readiness'] = self.readiness.stats()
+        if self.service.admission_controller is not None:
+            payload['admission'] = self.service.admission_controller.stats()
+        if self.service.curriculum_fallback is not None:
+            payload['curriculum_fallback'] = self.service.curriculum_fallback.stats()
+        if self.service.attempt_log is not None:
+            payload['attempt_log'] = self.service.attempt_log.stats()
+        if self.service.db_manager.shard_count > 1:
+            payload['sharding'] = self.service.db_manager.stats()
+        payload['invalidation_bus'] = invalidation_bus.stats()
+        payload['logging'] = logging_stats()
+        payload['tracing'] = tracer.stats()
+        payload['profiling'] = profiler.stats()
+        return (200 if healthy else 503), payload
+
+    async def ready(self, params, query, body) -> Tuple[int, Any]:
+        # Answered from cached state, never from a database round trip
+        if self.readiness is None:
+            healthy = self.service.db_manager.health_check()
+            return (200 if healthy else 503), {'ready': healthy}
+        ready = self.readiness.ready
+        return (200 if ready else 503), {'ready': ready, 'healthy': self.readiness.healthy}
+
+    @staticmethod
+    def _seconds(query: Dict[str, Any], name: str, default: float) -> float:
+        try:
+            seconds = float(query.get(name, default))
+        except (TypeError, ValueError):
+            raise ApiError(400, f"{name} must be a number of seconds")
+        if seconds < 0:
+            raise ApiError(400, f"{name} must not be negative")
+        return seconds
+
+    @staticmethod
+    def _datetime(query: Dict[str, Any], name: str) -> Optional[datetime]:
+        if name not in query:
+            return None
+        try:
+            value = datetime.fromisoformat(query[name].replace('Z', '+00:00'))
+        except ValueError:
+            raise ApiError(400, f"{name} must be an ISO 8601 date/time")
+        # Naive values are taken as UTC
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+    @staticmethod
+    def _json_body(body: bytes) -> Dict[str, Any]:
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            raise ApiError(400, "body must be JSON")
+        if not isinstance(payload, dict):
+            raise ApiError(400, "body must be a JSON object")
+        return payload
+
+    async def stats(self, params, query, body) -> Tuple[int, Any]:
+        if self.statistics is None:
+            raise ApiError(404, "statistics are not enabled")
+        try:
+            max_age = float(query['max_age']) if 'max_age' in query else None
+        except ValueError:
+            raise ApiError(400, "max_age must be a number")
+        return 200, await self._call(self.statistics.get, max_age)
+
+    async def recommendation(self, params, query, body) -> Tuple[int, Any]:
+        # The deadline starts now, so time spent waiting for a worker thread counts
+        admission = self.service.admission_controller
+        deadline = admission.deadline() if admission is not None else None
+        question, degraded = await self._call(self.service.recommend, params['student_id'], deadline)
+        return 200, {'student_id': params['student_id'], 'question': question, 'degraded': degraded}
+
+    async def progress(self, params, query, body) -> Tuple[int, Any]:
+        include_question_ids = query.get('include_questions', '').lower() in ('1', 'true', 'yes')
+        return 200, await self._call(
+            self.service.get_student_progress, params['student_id'], include_question_ids
+        )
+
+    async def concept_questions(self, params, query, body) -> Tuple[int, Any]:
+        questions = await self._call(
+            self.service.get_questions_by_concept,
+            params['student_id'], params['concept_name'], self._limit(query, 10)
+        )
+        return 200, {'student_id': params['student_id'], 'concept': params['concept_name'], 'questions': questions}
+
+    async def complete(self, params, query, body) -> Tuple[int, Any]:
+        payload = self._json_body(body)
+        question_id = payload.get('question_id')
+        if not question_id or not isinstance(question_id, str):
+            raise ApiError(400, "question_id is required")
+        is_mastered = bool(payload.get('is_mastered', True))
+        quality = payload.get('quality')
+        if quality is not None and (isinstance(quality, bool) or not isinstance(quality, int)):
+            raise ApiError(400, "quality must be an integer from 0 to 5")
+        duration = payload.get('duration_seconds')
+        if duration is not None and (isinstance(duration, bool) or not isinstance(duration, (int, float))):
+            raise ApiError(400, "duration_seconds must be a number")
+        await self._call(
+            self.service.complete_question, params['student_id'], question_id, is_mastered, quality, duration
+        )
+        return 202, {'student_id': params['student_id'], 'question_id': question_id, 'is_mastered': is_mastered}
+
+    async def attempts(self, params, query, body) -> Tuple[int, Any]:
+        attempts = await self._call(
+            self.service.get_attempt_history,
+            params['student_id'], self._datetime(query, 'since'), self._datetime(query, 'until'),
+            query.get('question_id'), self._limit(query, 100)
+        )
+        return 200, {'student_id': params['student_id'], 'attempts': attempts}
+
+    async def student_reviews(self, params, query, body) -> Tuple[int, Any]:
+        reviews = await self._call(
+            self.service.get_due_reviews,
+            params['student_id'], self._limit(query, 20), self._seconds(query, 'within', 0)
+        )
+        return 200, {'student_id': params['student_id'], 'reviews': reviews}
+
+    async def due_reviews(self, params, query, body) -> Tuple[int, Any]:
+        reviews = await self._call(
+            self.service.get_reviews_due_within, self._seconds(query, 'within', 3600), self._limit(query, 100)
+        )
+        return 200, {'reviews': reviews}
+
+    async def drain_reviews(self, params, query, body) -> Tuple[int, Any]:
+        payload = self._json_body(body)
+        student_ids = payload.get('student_ids')
+        if not isinstance(student_ids, list) or not all(isinstance(sid, str) for sid in student_ids):
+            raise ApiError(400, "student_ids must be a list of strings")
+        limit_per_student = self._limit({'limit': payload.get('limit_per_student', 20)}, 20)
+        drained = await self._call(
+            self.service.drain_due_reviews,
+            student_ids, self._seconds(payload, 'within', 0), limit_per_student
+        )
+        return 200, {'reviews': drained}
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+class HttpServer:
+    """Minimal HTTP/1.1 server (keep-alive, Content-Length bodies, chunked JSON responses)."""
+
+    def __init__(self, api: RecommendationApi, host: str = "127.0.0.1", port: int = 8080):
+        self.api = api
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"HTTP API listening on http://{self.host}:{self.port}")
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.api.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length') or 0)
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.api.dispatch(method.upper(), target, body)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                await self._stream_json(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _stream_json(writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool) -> None:
+        """Write the payload as chunked JSON, flushing about every 16 KiB."""
+        writer.write((
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}\r\n"
+            "Content-Type: application/json\r\n"
+            "Transfer-Encoding: chunked\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        ).encode('latin-1'))
+
+        buffer: List[str] = []
+        size = 0
+        for piece in json.JSONEncoder(default=_json_default).iterencode(payload):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= _CHUNK_SIZE:
+                data = ''.join(buffer).encode('utf-8')
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                await writer.drain()
+                buffer, size = [], 0
+        if buffer:
+            data = ''.join(buffer).encode('utf-8')
+            writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def build_recommendation_service(
+    backend: str, data_file: Optional[str] = None, shards: int = 1, students_file: Optional[str] = None
+) -> RecommendationService:
+    """
+    Wire RecommendationService to the in-process stand-in or to Neo4j.
+
+    Args:
+        backend: 'memory' or 'neo4j' (sharded per SHARD_URIS / SHARD_DATABASES)
+        data_file: Questions JSON to ingest into the memory backend
+        shards: Number of in-memory shards students are partitioned across
+        students_file: Roster (CSV or JSON Lines, see RosterImportService) to
+            load into the memory backend
+
+    Raises:
+        DataValidationError: If the roster has rows that could not be loaded
+    """
+    from config.settings import app_config
+
+    if backend == 'memory':
+        from repositories.in_memory import (
+            InMemoryCatalogueRepository, InMemoryDatabaseManager, InMemoryQuestionRepository,
+            InMemoryReviewRepository, InMemorySetupRepository, InMemoryStudentRepository,
+        )
+        from services.data_population_service import DataPopulationService
+
+        db_manager = InMemoryDatabaseManager()
+        if shards > 1:
+            from core.sharding import ShardedDatabaseManager
+
+            db_manager = ShardedDatabaseManager([InMemoryDatabaseManager() for _ in range(shards)])
+        if data_file:
+            DataPopulationService(
+                db_manager, InMemorySetupRepository(db_manager), InMemoryCatalogueRepository(db_manager)
+            ).populate_from_json_file(data_file)
+        student_repo = InMemoryStudentRepository(db_manager)
+        if students_file:
+            from services.roster_import_service import RosterImportService
+
+            report = RosterImportService(
+                student_repo, app_config.roster_batch_size, app_config.roster_import_workers
+            ).import_file(students_file)
+            if report['rejected'] or report['failed']:
+                raise DataValidationError(
+                    f"Roster {students_file}: {report['rejected']} rejected and {report['failed']} failed rows, "
+                    f"first problems: {report['rejected_rows'][:3]}"
+                )
+            logger.info(f"Loaded {report['created'] + report['updated']} students from {students_file}")
+        return RecommendationService(
+            db_manager, student_repo, InMemoryQuestionRepository(db_manager),
+            review_scheduler=ReviewScheduler(InMemoryReviewRepository(db_manager), app_config.review_lease_seconds),
+            attempt_log=build_attempt_log()
+        )
+
+    from core.sharding import build_database_manager
+    from repositories.question_repository import QuestionRepository
+    from repositories.review_repository import ReviewRepository
+    from repositories.student_repository import StudentRepository
+
+    db_manager = build_database_manager()
+    return RecommendationService(
+        db_manager, StudentRepository(db_manager), QuestionRepository(db_manager),
+        review_scheduler=ReviewScheduler(ReviewRepository(db_manager), app_config.review_lease_seconds),
+        attempt_log=build_attempt_log()
+    )
+
+
+def build_attempt_log() -> Optional[AttemptLog]:
+    """The attempt log from ATTEMPT_LOG_* settings, or None when it is disabled."""
+    from config.settings import app_config
+
+    if not app_config.attempt_log_enabled:
+        return None
+    return AttemptLog(
+        app_config.attempt_log_dir, app_config.attempt_log_segment_bytes, app_config.attempt_log_compact_interval
+    )
+
+
+def build_statistics_service(backend: str, db_manager) -> StatisticsService:
+    """Create the cached database statistics for the selected backend."""
+    from config.settings import app_config
+
+    if backend == 'memory':
+        from repositories.in_memory import InMemorySetupRepository as setup_repository_class
+    else:
+        from repositories.setup_repository import SetupRepository as setup_repository_class
+    return StatisticsService(
+        setup_repository_class(db_manager), app_config.stats_cache_ttl, app_config.stats_refresh_interval
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from config.settings import api_config, app_config
+
+    parser = argparse.ArgumentParser(description="Serve the recommendation HTTP API.")
+    parser.add_argument('--backend', choices=('memory', 'neo4j'), default='neo4j')
+    parser.add_argument('--data', help="Questions JSON to load into the memory backend")
+    parser.add_argument('--shards', type=int, default=1, help="Partition students across this many memory backends")
+    parser.add_argument('--students', help="Roster (CSV student_id,name,email or JSON Lines) to load into the memory "
+                                           "backend")
+    parser.add_argument('--host', default=api_config.host)
+    parser.add_argument('--port', type=int, default=api_config.port)
+    parser.add_argument('--workers', type=int, default=api_config.worker_threads)
+    args = parser.parse_args(argv)
+
+    configure_from_settings()
+    trace_exporter = configure_tracing()
+    configure_profiling()
+
+    if args.students and args.backend != 'memory':
+        parser.error("--students seeds the memory backend; use `python admin.py import-roster` for Neo4j")
+    service = build_recommendation_service(args.backend, args.data, args.shards, args.students)
+    statistics = build_statistics_service(args.backend, service.db_manager)
+    statistics.start()
+    invalidation_bus.start()
+    readiness = ReadinessMonitor(service.db_manager, app_config.readiness_interval)
+    service.db_manager.set_health_monitor(readiness)
+    if service.admission_controller is not None:
+        # Leaving degraded mode needs a fresh ping, not the cached state
+        service.admission_controller.health_check = readiness.check
+    readiness.start()
+    if service.attempt_log is not None:
+        service.attempt_log.start()
+    if service.recommendation_cache is not None:
+        service.recommendation_cache.start()
+    if service.curriculum_fallback is not None:
+        service.curriculum_fallback.start()
+
+    def warm_up() -> None:
+        report = None
+        if app_config.warmup_enabled:
+            report = WarmupService(
+                service, app_config.warmup_connections, app_config.warmup_hot_students,
+                app_config.recommendation_warm_hours
+            ).run()
+        else:
+            service.warm_recommendations(app_config.recommendation_warm_hours)
+        readiness.mark_warm(report)
+
+    # /ready answers 503 until warm-up has finished
+    threading.Thread(target=warm_up, name="warmup", daemon=True).start()
+    server = HttpServer(RecommendationApi(service, args.workers, statistics, readiness), args.host, args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        statistics.stop()
+        readiness.stop()
+        invalidation_bus.stop()
+        if service.attempt_log is not None:
+            service.attempt_log.stop()
+        if service.recommendation_cache is not None:
+            service.recommendation_cache.stop()
+        if service.curriculum_fallback is not None:
+            service.curriculum_fallback.stop()
+        service.close()
+        service.db_manager.close_connection()
+        profiler.stop()
+        if trace_exporter is not None:
+            trace_exporter.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+# benchmarks/bench_ingest_validation.py
+"""
+Throughput benchmark for precompiled ingest validation.
+
+Generates a synthetic catalogue, corrupts a fraction of the items (missing
+fields, wrong types, negative numbers, malformed approaches) and validates
+it in process and across process pools of increasing size.
+
+Usage:
+    python -m benchmarks.bench_ingest_validation --items 1000000 --workers 1 2 4
+"""
+import argparse
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+from benchmarks.generator import generate_questions, generate_vocabulary
+from utils.ingest_validator import QuestionItemValidator
+
+_CORRUPTIONS = (
+    lambda item: item.pop('question_title'),
+    lambda item: item.update(step_no=-1),
+    lambda item: item.update(sl_no="3"),
+    lambda item: item.update(question="  "),
+    lambda item: item.update(sub_concepts="Arrays"),
+    lambda item: item.update(solution_approaches=[{'explanation': "no name"}]),
+)
+
+
+def build_items(num_items: int, invalid_fraction: float, seed: int) -> List[Dict[str, Any]]:
+    # Generating a million distinct items is slower than validating them, so a
+    # smaller catalogue is tiled and re-keyed
+    base = generate_questions(min(num_items, 50_000), generate_vocabulary(500, seed=seed), seed=seed)
+    items = [dict(base[i % len(base)], id=f"q{i:07d}") for i in range(num_items)]
+    rng = random.Random(seed)
+    for index in rng.sample(range(num_items), int(num_items * invalid_fraction)):
+        items[index] = dict(items[index])
+        rng.choice(_CORRUPTIONS)(items[index])
+    return items
+
+
+def run(num_items: int, workers: List[int], invalid_fraction: float, chunk_size: int, seed: int) -> Dict[str, Any]:
+    items = build_items(num_items, invalid_fraction, seed)
+    validator = QuestionItemValidator()
+    results = []
+    for count in workers:
+        start = time.perf_counter()
+        report = validator.validate(items, workers=count, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+        results.append({
+            'workers': count,
+            'seconds': round(elapsed, 3),
+            'items_per_sec': round(num_items / elapsed),
+            'invalid_items': len(report['errors']),
+        })
+    return {
+        'benchmark': 'ingest_validation',
+        'items': num_items,
+        'invalid_fraction': invalid_fraction,
+        'cpus': os.cpu_count(),
+        'runs': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--items', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--invalid-fraction', type=float, default=0.01)
+    parser.add_argument('--chunk-size', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    print(json.dumps(run(args.items, args.workers, args.invalid_fraction, args.chunk_size, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_logging.py
+"""
+Per-call overhead of the logging path seen by a request thread.
+
+Logs the same hot-path message (a student id and a question id) through
+each configuration and reports the mean cost per call on the calling
+thread. Output goes to a temporary file, so terminal speed does not skew
+the synchronous cases; queued cases also report how long the listener
+took to drain.
+
+Usage:
+    python -m benchmarks.bench_logging --calls 200000
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+from core import logging_setup
+
+STUDENT_ID = "student_000042"
+QUESTION_ID = "q0001234"
+
+
+def _eager(logger: logging.Logger) -> None:
+    logger.info(f"Marking question {QUESTION_ID} as mastered by student {STUDENT_ID}")
+
+
+def _lazy(logger: logging.Logger) -> None:
+    logger.info("Marking question %s as mastered by student %s", QUESTION_ID, STUDENT_ID)
+
+
+def _per_call_ns(call: Callable[[logging.Logger], None], logger: logging.Logger, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        call(logger)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def run(calls: int) -> Dict[str, Any]:
+    cases = [
+        # name, call, level, format, sample rates, queued
+        ('eager_fstring_sync', _eager, 'INFO', 'text', None, False),
+        ('lazy_sync', _lazy, 'INFO', 'text', None, False),
+        ('lazy_queued', _lazy, 'INFO', 'text', None, True),
+        ('lazy_queued_json', _lazy, 'INFO', 'json', None, True),
+        ('lazy_queued_sampled_1pct', _lazy, 'INFO', 'text', {'*.hot': 0.01}, True),
+        ('eager_fstring_disabled', _eager, 'WARNING', 'text', None, True),
+        ('lazy_disabled', _lazy, 'WARNING', 'text', None, True),
+    ]
+    results: Dict[str, Any] = {'benchmark': 'logging', 'calls': calls}
+    logger = logging_setup.hot_path_logger('benchmarks.bench_logging')
+    with tempfile.TemporaryDirectory() as directory:
+        for name, call, level, log_format, rates, queued in cases:
+            path = os.path.join(directory, f"{name}.log")
+            with open(path, 'w', encoding='utf-8') as stream:
+                logging_setup.configure_logging(
+                    level=level, log_format=log_format, sample_rates=rates,
+                    async_queue=queued, queue_size=calls + 1, stream=stream
+                )
+                per_call = _per_call_ns(call, logger, calls)
+                drain_start = time.perf_counter()
+                logging_setup.shutdown_logging()
+                drain_seconds = time.perf_counter() - drain_start
+            results[name] = {
+                'caller_ns_per_call': round(per_call),
+                'drain_seconds': round(drain_seconds, 3) if queued else 0.0,
+                'bytes_written': os.path.getsize(path),
+            }
+    logging.getLogger().handlers.clear()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=200_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.calls), indent=2))
+
+
+if __name__ == "__main__":
+    main()
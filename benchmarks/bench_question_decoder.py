@@ -0,0 +1,99 @@
+# benchmarks/bench_question_decoder.py
+"""
+Microbenchmark for the Question record decoder.
+
+Compares the compiled positional decoder against the previous
+``dict(record)`` + per-row builder path.
+
+Usage:
+    python -m benchmarks.bench_question_decoder --rows 100000
+"""
+import argparse
+import json
+import time
+from typing import Any, Dict, List, Tuple
+
+from models.question import Question, SolutionApproach
+from repositories.record_decoder import QUESTION_COLUMNS, QuestionDecoder
+
+
+class _Record(tuple):
+    """Minimal stand-in for a Bolt record: a tuple that also maps keys to values."""
+
+    __slots__ = ()
+    _keys: Tuple[str, ...] = QUESTION_COLUMNS
+
+    def keys(self):
+        return self._keys
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            return tuple.__getitem__(self, self._keys.index(item))
+        return tuple.__getitem__(self, item)
+
+
+def _make_records(rows: int) -> List[_Record]:
+    return [
+        _Record((
+            f"q{i}", f"Question {i}", "content", "Easy", i // 100, (i // 10) % 10, i % 10,
+            ["Array"], ["Array Traversal"],
+            [{'name': 'Two Pointers', 'explanation': 'Walk from both ends'}],
+        ))
+        for i in range(rows)
+    ]
+
+
+def _legacy_build(data: Dict[str, Any]) -> Question:
+    solution_approaches = []
+    if data.get('solution_approaches'):
+        for approach_data in data['solution_approaches']:
+            if isinstance(approach_data, dict):
+                solution_approaches.append(SolutionApproach(
+                    name=approach_data.get('name', ''),
+                    explanation=approach_data.get('explanation', '')
+                ))
+    return Question(
+        id=data['id'], title=data['title'], content=data['content'],
+        difficulty=data['difficulty'], step_number=data['step_number'],
+        sub_step_number=data['sub_step_number'], sequence_number=data['sequence_number'],
+        standard_concepts=data.get('standard_concepts', []),
+        sub_concepts=data.get('sub_concepts', []),
+        solution_approaches=solution_approaches
+    )
+
+
+def _time(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rows: int, repeat: int) -> Dict[str, Any]:
+    records = _make_records(rows)
+    decoder = QuestionDecoder()
+
+    legacy = _time(lambda: [_legacy_build({k: r[k] for k in r.keys()}) for r in records], repeat)
+    compiled = _time(lambda: decoder.decode_all(QUESTION_COLUMNS, records), repeat)
+
+    return {
+        'benchmark': 'question_decoder',
+        'rows': rows,
+        'legacy_rows_per_sec': round(rows / legacy),
+        'compiled_rows_per_sec': round(rows / compiled),
+        'speedup': round(legacy / compiled, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
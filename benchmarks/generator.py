@@ -0,0 +1,121 @@
+# benchmarks/generator.py
+"""
+Reproducible synthetic curriculum and student generator.
+
+All output is a pure function of the seed, so a benchmark run can be
+repeated exactly against any backend.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+DIFFICULTIES = ('Easy', 'Medium', 'Hard')
+DIFFICULTY_WEIGHTS = (0.5, 0.35, 0.15)
+
+APPROACH_NAMES = (
+    'Brute Force', 'Two Pointers', 'Sliding Window', 'Hashing', 'Binary Search',
+    'Prefix Sums', 'Sorting', 'Greedy', 'Recursion', 'Dynamic Programming',
+    'Stack', 'Queue', 'Breadth First Search', 'Depth First Search', 'Bit Manipulation',
+)
+
+
+@dataclass
+class SyntheticStudent:
+    student_id: str
+    name: str
+    email: str
+    # Fraction of the curriculum this student has mastered.
+    mastery: float
+    mastered_question_ids: List[str] = field(default_factory=list)
+
+
+def generate_vocabulary(num_concepts: int, seed: int = 0, max_prerequisites: int = 2) -> Dict[str, List[str]]:
+    """
+    Generate a concept -> prerequisites map shaped like data/prereq_map.json.
+
+    Prerequisites always point at earlier concepts, so the map is a DAG.
+    """
+    rng = random.Random(seed)
+    names = [f"Concept {i:05d}" for i in range(num_concepts)]
+    vocabulary = {}
+    for index, name in enumerate(names):
+        count = rng.randint(0, min(max_prerequisites, index))
+        vocabulary[name] = rng.sample(names[max(0, index - 50):index], count) if count else []
+    return vocabulary
+
+
+def generate_questions(
+    num_questions: int,
+    vocabulary: Dict[str, List[str]],
+    steps: int = 20,
+    substeps_per_step: int = 8,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Generate question items in the ingest JSON format.
+
+    Questions are spread evenly across steps/substeps; concepts are drawn from
+    a window of the vocabulary that advances with the curriculum, so later
+    steps use later (more advanced) concepts.
+    """
+    rng = random.Random(seed)
+    concepts = list(vocabulary)
+    per_substep = max(1, -(-num_questions // (steps * substeps_per_step)))
+    window = max(5, len(concepts) // max(1, steps))
+
+    items = []
+    for index in range(num_questions):
+        slot, sequence = divmod(index, per_substep)
+        step, substep = divmod(slot, substeps_per_step)
+        position = min(len(concepts) - 1, int(index / max(1, num_questions) * len(concepts)))
+        candidates = concepts[max(0, position - window):position + 1] or concepts[:1]
+
+        sub_concepts = rng.sample(candidates, min(len(candidates), rng.randint(1, 3)))
+        standard_concepts = sorted({p for name in sub_concepts for p in vocabulary.get(name, [])})
+        approaches = [
+            {'approach_name': name, 'explanation': f"Solve using {name.lower()}."}
+            for name in rng.sample(APPROACH_NAMES, rng.randint(1, 2))
+        ]
+
+        items.append({
+            'id': f"q{index:07d}",
+            'question_title': f"Synthetic question {index}",
+            'question': f"Body of synthetic question {index}.",
+            'difficulty': rng.choices(DIFFICULTIES, DIFFICULTY_WEIGHTS)[0],
+            'step_no': step + 1,
+            'sub_step_no': substep + 1,
+            'sl_no': sequence + 1,
+            'standard_concepts': standard_concepts,
+            'sub_concepts': sub_concepts,
+            'solution_approaches': approaches,
+        })
+    return items
+
+
+def generate_students(num_students: int, questions: List[Dict[str, Any]], seed: int = 0) -> List[SyntheticStudent]:
+    """
+    Generate students with a right-skewed mastery distribution.
+
+    Mastery fractions follow Beta(2, 5): most students are early in the
+    curriculum and a long tail is far ahead. Each student masters a prefix of
+    the curriculum with ~10% of questions skipped, plus a few out-of-order.
+    """
+    rng = random.Random(seed)
+    ordered_ids = [
+        item['id'] for item in sorted(questions, key=lambda q: (q['step_no'], q['sub_step_no'], q['sl_no']))
+    ]
+    students = []
+    for index in range(num_students):
+        mastery = rng.betavariate(2, 5)
+        frontier = int(mastery * len(ordered_ids))
+        mastered = [qid for qid in ordered_ids[:frontier] if rng.random() > 0.1]
+        ahead = ordered_ids[frontier:frontier + 20]
+        mastered.extend(rng.sample(ahead, min(len(ahead), rng.randint(0, 2))))
+        students.append(SyntheticStudent(
+            student_id=f"student_{index:07d}",
+            name=f"Student {index}",
+            email=f"student{index}@example.com",
+            mastery=round(mastery, 4),
+            mastered_question_ids=mastered,
+        ))
+    return students
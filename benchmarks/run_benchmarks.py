@@ -0,0 +1,251 @@
+# benchmarks/run_benchmarks.py
+"""
+End-to-end benchmark suite.
+
+Generates a synthetic curriculum and student population, then measures
+ingest throughput, recommendation latency (as served and, separately, with
+the recommendation cache bypassed), completion write throughput and memory
+against either the in-process stand-in or a real Neo4j server.
+
+Usage:
+    python -m benchmarks.run_benchmarks --backend memory --questions 5000 --students 500
+    python -m benchmarks.run_benchmarks --backend neo4j --clear --output bench.json
+
+The neo4j backend uses NEO4J_URI/NEO4J_USER/NEO4J_PASSWORD and, with
+--clear, deletes ALL data in the target database first.
+"""
+import argparse
+import json
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from benchmarks.generator import generate_questions, generate_students, generate_vocabulary
+from models.student import Student
+from services.data_population_service import DataPopulationService
+from services.recommendation_service import RecommendationService
+from services.review_scheduler import ReviewScheduler
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """p50/p90/p99/max in milliseconds."""
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(samples, 0.50) * 1000, 3),
+        'p90_ms': round(percentile(samples, 0.90) * 1000, 3),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+def build_backend(backend: str, clear: bool) -> Dict[str, Any]:
+    """Create the db manager and repositories for the selected backend."""
+    if backend == 'memory':
+        from repositories.in_memory import (
+            InMemoryCatalogueRepository, InMemoryDatabaseManager, InMemoryQuestionRepository,
+            InMemoryReviewRepository, InMemorySetupRepository, InMemoryStudentRepository,
+        )
+        db_manager = InMemoryDatabaseManager()
+        return {
+            'db_manager': db_manager,
+            'catalogue_repo': InMemoryCatalogueRepository(db_manager),
+            'setup_repo': InMemorySetupRepository(db_manager),
+            'student_repo': InMemoryStudentRepository(db_manager),
+            'question_repo': InMemoryQuestionRepository(db_manager),
+            'review_repo': InMemoryReviewRepository(db_manager),
+        }
+
+    from config.settings import db_config
+    from core.database import DatabaseManager
+    from repositories.catalogue_repository import CatalogueRepository
+    from repositories.question_repository import QuestionRepository
+    from repositories.review_repository import ReviewRepository
+    from repositories.setup_repository import SetupRepository
+    from repositories.student_repository import StudentRepository
+
+    db_manager = DatabaseManager()
+    db_manager.initialize_connection(db_config.uri, db_config.username, db_config.password)
+    setup_repo = SetupRepository(db_manager)
+    if clear:
+        setup_repo.clear_all_data()
+    setup_repo.create_constraints_and_indexes()
+    return {
+        'db_manager': db_manager,
+        'catalogue_repo': CatalogueRepository(db_manager),
+        'setup_repo': setup_repo,
+        'student_repo': StudentRepository(db_manager),
+        'question_repo': QuestionRepository(db_manager),
+        'review_repo': ReviewRepository(db_manager),
+    }
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.trace_memory:
+        tracemalloc.start()
+
+    vocabulary = (
+        json.load(open(args.vocabulary, 'r', encoding='utf-8')) if args.vocabulary
+        else generate_vocabulary(args.concepts, seed=args.seed)
+    )
+    questions = generate_questions(
+        args.questions, vocabulary, steps=args.steps, substeps_per_step=args.substeps, seed=args.seed
+    )
+    students = generate_students(args.students, questions, seed=args.seed)
+
+    components = build_backend(args.backend, args.clear)
+    db_manager = components['db_manager']
+    student_repo = components['student_repo']
+    population = DataPopulationService(db_manager, components['setup_repo'], components['catalogue_repo'])
+    recommendations = RecommendationService(
+        db_manager, student_repo, components['question_repo'],
+        review_scheduler=ReviewScheduler(components['review_repo'])
+    )
+    results: Dict[str, Any] = {}
+
+    try:
+        # Ingest
+        start = time.perf_counter()
+        stats = population.populate_from_data_list(questions, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+        results['ingest'] = {
+            'items': len(questions),
+            'processed': stats['processed_items'],
+            'seconds': round(elapsed, 3),
+            'items_per_sec': round(len(questions) / elapsed, 1) if elapsed else None,
+        }
+
+        # Seed students and their mastery (not timed as a benchmark phase)
+        start = time.perf_counter()
+        for synthetic in students:
+            student_repo.create_or_update_student(
+                Student(student_id=synthetic.student_id, name=synthetic.name, email=synthetic.email)
+            )
+            for question_id in synthetic.mastered_question_ids:
+                student_repo.mark_question_as_mastered(synthetic.student_id, question_id)
+        results['seed_students'] = {
+            'students': len(students),
+            'mastered_edges': sum(len(s.mastered_question_ids) for s in students),
+            'seconds': round(time.perf_counter() - start, 3),
+        }
+
+        # Recommendation latency, as served (mostly cache hits once students repeat)
+        cache = recommendations.recommendation_cache
+        rng = random.Random(args.seed)
+        samples = []
+        for _ in range(args.requests):
+            student = rng.choice(students)
+            start = time.perf_counter()
+            recommendations.get_next_recommended_question(student.student_id)
+            samples.append(time.perf_counter() - start)
+        results['recommendation'] = latency_summary(samples)
+        if cache is not None:
+            results['recommendation']['cache'] = cache.stats()
+
+            # The same requests on the live path: drop the student's list (untimed) before each one
+            uncached_rng = random.Random(args.seed)
+            samples = []
+            for _ in range(args.requests):
+                student = uncached_rng.choice(students)
+                cache.invalidate(student.student_id)
+                start = time.perf_counter()
+                recommendations.get_next_recommended_question(student.student_id)
+                samples.append(time.perf_counter() - start)
+            results['recommendation_uncached'] = latency_summary(samples)
+
+        # Completion write throughput
+        question_ids = [item['id'] for item in questions]
+        completions = [(rng.choice(students).student_id, rng.choice(question_ids)) for _ in range(args.completions)]
+        samples = []
+        start = time.perf_counter()
+        for student_id, question_id in completions:
+            call_start = time.perf_counter()
+            recommendations.complete_question(student_id, question_id, is_mastered=rng.random() < 0.7)
+            samples.append(time.perf_counter() - call_start)
+        elapsed = time.perf_counter() - start
+        results['completion'] = dict(
+            latency_summary(samples),
+            writes_per_sec=round(len(completions) / elapsed, 1) if elapsed else None,
+        )
+    finally:
+        recommendations.close()
+        db_manager.close_connection()
+
+    results['memory'] = {
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+    if args.trace_memory:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results['memory'].update(traced_current_bytes=current, traced_peak_bytes=peak)
+
+    return {
+        'benchmark': 'fastwise_suite',
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'backend': args.backend,
+        'parameters': {
+            'seed': args.seed, 'questions': args.questions, 'students': args.students,
+            'concepts': len(vocabulary), 'steps': args.steps, 'substeps': args.substeps,
+            'requests': args.requests, 'completions': args.completions, 'batch_size': args.batch_size,
+        },
+        'results': results,
+    }
+
+
+def parse_args(argv: List[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the FastWise benchmark suite.")
+    parser.add_argument('--backend', choices=('memory', 'neo4j'), default='memory')
+    parser.add_argument('--clear', action='store_true', help="Delete all data in the neo4j target first")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--questions', type=int, default=2000)
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--concepts', type=int, default=250)
+    parser.add_argument('--vocabulary', help="Use a prereq map JSON (e.g. data/prereq_map.json) as vocabulary")
+    parser.add_argument('--steps', type=int, default=20)
+    parser.add_argument('--substeps', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--completions', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--trace-memory', action='store_true', help="Track Python allocations with tracemalloc")
+    parser.add_argument('--output', help="Write the JSON result here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+    if args.backend == 'neo4j' and args.clear is False:
+        print("Note: running against existing data; pass --clear for a reproducible baseline", file=sys.stderr)
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
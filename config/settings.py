@@ -1,5 +1,6 @@
 #config/settings.py
 import os
+import tempfile
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
@@ -10,13 +11,96 @@ class DatabaseConfig:
     uri: str = os.getenv("NEO4J_URI", "bolt://localhost:7687")
     username: str = os.getenv("NEO4J_USER", "neo4j")
     password: str = os.getenv("NEO4J_PASSWORD", "password")
+    shard_uris: str = os.getenv("SHARD_URIS", "")
+    shard_databases: str = os.getenv("SHARD_DATABASES", "")
+    shard_fan_out_workers: int = int(os.getenv("SHARD_FAN_OUT_WORKERS", "0"))
 
 @dataclass
 class AppConfig:
     data_file_path: str = os.getenv("DATA_FILE", "data/questions.json")
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    log_format: str = os.getenv("LOG_FORMAT", "text")
+    log_async: bool = os.getenv("LOG_ASYNC", "true").lower() == "true"
+    log_queue_size: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    log_sample_rates: str = os.getenv("LOG_SAMPLE_RATES", "*.hot=0.01")
     max_recommendations: int = int(os.getenv("MAX_RECOMMENDATIONS", "20"))
+    schema_strict: bool = os.getenv("SCHEMA_STRICT", "true").lower() == "true"
+    index_wait_timeout: float = float(os.getenv("INDEX_WAIT_TIMEOUT", "300"))
+    student_cache_ttl: float = float(os.getenv("STUDENT_CACHE_TTL", "300"))
+    student_negative_cache_ttl: float = float(os.getenv("STUDENT_NEGATIVE_CACHE_TTL", "30"))
+    student_cache_size: int = int(os.getenv("STUDENT_CACHE_SIZE", "100000"))
+    stats_cache_ttl: float = float(os.getenv("STATS_CACHE_TTL", "60"))
+    stats_refresh_interval: float = float(os.getenv("STATS_REFRESH_INTERVAL", "0"))
+    review_lease_seconds: float = float(os.getenv("REVIEW_LEASE_SECONDS", "900"))
+    recommendation_cache_size: int = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "100000"))
+    recommendation_cache_ttl: float = float(os.getenv("RECOMMENDATION_CACHE_TTL", "600"))
+    recommendation_cache_k: int = int(os.getenv("RECOMMENDATION_CACHE_K", "10"))
+    recommendation_refill_below: int = int(os.getenv("RECOMMENDATION_REFILL_BELOW", "3"))
+    recommendation_warm_hours: float = float(os.getenv("RECOMMENDATION_WARM_HOURS", "24"))
+    ingest_validation_workers: int = int(os.getenv("INGEST_VALIDATION_WORKERS", "1"))
+    roster_batch_size: int = int(os.getenv("ROSTER_BATCH_SIZE", "1000"))
+    roster_import_workers: int = int(os.getenv("ROSTER_IMPORT_WORKERS", "4"))
+    attempt_log_enabled: bool = os.getenv("ATTEMPT_LOG_ENABLED", "true").lower() == "true"
+    attempt_log_dir: str = os.getenv("ATTEMPT_LOG_DIR", "attempt_log")
+    attempt_log_segment_bytes: int = int(os.getenv("ATTEMPT_LOG_SEGMENT_BYTES", str(4 << 20)))
+    attempt_log_compact_interval: float = float(os.getenv("ATTEMPT_LOG_COMPACT_INTERVAL", "300"))
+    admission_max_concurrent: int = int(os.getenv("ADMISSION_MAX_CONCURRENT", "16"))
+    admission_max_queue: int = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+    admission_timeout: float = float(os.getenv("ADMISSION_TIMEOUT", "2.0"))
+    degraded_cooldown: float = float(os.getenv("DEGRADED_COOLDOWN", "5"))
+    degraded_fallback_size: int = int(os.getenv("DEGRADED_FALLBACK_SIZE", "200"))
+    degraded_fallback_ttl: float = float(os.getenv("DEGRADED_FALLBACK_TTL", "300"))
+    readiness_interval: float = float(os.getenv("READINESS_INTERVAL", "5"))
+    warmup_enabled: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    warmup_connections: int = int(os.getenv("WARMUP_CONNECTIONS", "10"))
+    warmup_hot_students: int = int(os.getenv("WARMUP_HOT_STUDENTS", "500"))
+    invalidation_bus_enabled: bool = os.getenv("INVALIDATION_BUS_ENABLED", "true").lower() == "true"
+    invalidation_bus_dir: str = os.getenv(
+        "INVALIDATION_BUS_DIR", os.path.join(tempfile.gettempdir(), "fastwise-invalidation")
+    )
+
+@dataclass
+class InstrumentationConfig:
+    enabled: bool = os.getenv("QUERY_METRICS_ENABLED", "true").lower() == "true"
+    slow_query_ms: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    metrics_port: int = int(os.getenv("METRICS_PORT", "0"))
+    metrics_dump_file: str = os.getenv("METRICS_DUMP_FILE", "")
+    plan_sample_rate: float = float(os.getenv("PLAN_CAPTURE_SAMPLE_RATE", "0"))
+    plan_capture_dir: str = os.getenv("PLAN_CAPTURE_DIR", "query_plans/captured")
+    trace_export: str = os.getenv("TRACE_EXPORT", "")
+    trace_sample_rate: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+    trace_slow_ms: float = float(os.getenv("TRACE_SLOW_MS", "0"))
+
+@dataclass
+class ApiConfig:
+    host: str = os.getenv("API_HOST", "127.0.0.1")
+    port: int = int(os.getenv("API_PORT", "8080"))
+    worker_threads: int = int(os.getenv("API_WORKER_THREADS", "32"))
+
+@dataclass
+class RankingConfig:
+    enabled: bool = os.getenv("RANKING_ENABLED", "true").lower() == "true"
+    candidate_pool: int = int(os.getenv("RANKING_CANDIDATE_POOL", "50"))
+    success_window: int = int(os.getenv("RANKING_SUCCESS_WINDOW", "20"))
+    curriculum_weight: float = float(os.getenv("RANK_WEIGHT_CURRICULUM", "1.0"))
+    difficulty_weight: float = float(os.getenv("RANK_WEIGHT_DIFFICULTY", "0.5"))
+    coverage_weight: float = float(os.getenv("RANK_WEIGHT_COVERAGE", "0.3"))
+
+@dataclass
+class ProfilingConfig:
+    signal_name: str = os.getenv("PROFILE_SIGNAL", "SIGUSR1")
+    on_start: bool = os.getenv("PROFILE_ON_START", "false").lower() == "true"
+    mode: str = os.getenv("PROFILE_MODE", "sample")
+    duration: float = float(os.getenv("PROFILE_DURATION", "60"))
+    max_calls: int = int(os.getenv("PROFILE_MAX_CALLS", "0"))
+    interval_ms: float = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+    top_n: int = int(os.getenv("PROFILE_TOP_N", "30"))
+    output_dir: str = os.getenv("PROFILE_DIR", "profiles")
 
 # Global config instances
 db_config = DatabaseConfig()
-app_config = AppConfig()
\ No newline at end of file
+app_config = AppConfig()
+instrumentation_config = InstrumentationConfig()
+api_config = ApiConfig()
+ranking_config = RankingConfig()
+profiling_config = ProfilingConfig()
\ No newline at end of file
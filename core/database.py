@@ -1,10 +1,15 @@
 #core/database.py
 import logging
-from typing import Optional,Callable,Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional,Callable,Any,List
 from neo4j import GraphDatabase, Driver
 from contextlib import contextmanager
 
 from .exceptions import DatabaseConnectionError
+from .instrumentation import query_instrumentation, stable_query_name
+from .query_plans import plan_capture
 
 logger = logging.getLogger(__name__)
 
@@ -15,12 +20,34 @@ class DatabaseManager:
     """
     _instance: Optional['DatabaseManager'] = None
     _driver: Optional[Driver] = None
+    # Background monitor (core/readiness.py) whose cached state health_check() returns
+    _health_monitor: Optional[Any] = None
+    # Database sessions are opened on; None is the server's default database
+    database: Optional[str] = None
+    # A single database holds every student (see core/sharding.py)
+    shard_count = 1
 
     def __new__(cls) -> 'DatabaseManager':
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
 
+    @classmethod
+    def standalone(cls, database: Optional[str] = None) -> 'DatabaseManager':
+        """A manager outside the process-wide singleton, e.g. one per shard."""
+        manager = super().__new__(cls)
+        manager.database = database
+        return manager
+
+    @contextmanager
+    def route(self, shard_key: str):
+        """Route the calls made inside the block to the shard owning ``shard_key``; a no-op here."""
+        yield
+
+    def fan_out(self, function: Callable, *args, **kwargs) -> List[Any]:
+        """Call ``function`` routed to each shard; one result per shard (here just one)."""
+        return [function(*args, **kwargs)]
+
     def initialize_connection(self, uri: str, username: str, password: str) -> None:
         """Initialize the Neo4j driver connection."""
         if self._driver is not None:
@@ -48,7 +75,7 @@ class DatabaseManager:
         if self._driver is None:
             raise DatabaseConnectionError("Database not initialized")
         
-        session = self._driver.session()
+        session = self._driver.session(database=self.database)
         try:
             yield session
         finally:
@@ -80,7 +107,9 @@ class DatabaseManager:
             raise RuntimeError("Database connection not established. Call connect() first.")
         
         try:
-            with self._driver.session() as session:
+            with query_instrumentation.observe(
+                f"tx:{transaction_function.__name__}", transaction_function.__qualname__
+            ), self._driver.session(database=self.database) as session:
                 # Use write_transaction for data modification operations
                 result = session.write_transaction(transaction_function, *args, **kwargs)
                 logger.debug("Transaction completed successfully")
@@ -106,7 +135,9 @@ class DatabaseManager:
             raise RuntimeError("Database connection not established. Call connect() first.")
         
         try:
-            with self._driver.session() as session:
+            with query_instrumentation.observe(
+                f"tx:{transaction_function.__name__}", transaction_function.__qualname__
+            ), self._driver.session(database=self.database) as session:
                 result = session.read_transaction(transaction_function, *args, **kwargs)
                 logger.debug("Read transaction completed successfully")
                 return result
@@ -115,7 +146,7 @@ class DatabaseManager:
             logger.error(f"Read transaction failed: {e}")
             raise
     
-    def execute_write_query(self, query: str, parameters: dict = None) -> Any:
+    def execute_write_query(self, query: str, parameters: dict = None, query_name: Optional[str] = None) -> Any:
         """
         Execute a single write query outside of a transaction.
         Use this for simple operations that don't require transaction management.
@@ -123,6 +154,7 @@ class DatabaseManager:
         Args:
             query: Cypher query string
             parameters: Query parameters
+            query_name: Stable name used for instrumentation
             
         Returns:
             Query result
@@ -131,22 +163,26 @@ class DatabaseManager:
             raise RuntimeError("Database connection not established. Call connect() first.")
         
         try:
-            with self._driver.session() as session:
-                result = session.run(query, parameters or {})
+            query_name = query_name or stable_query_name(query)
+            with query_instrumentation.observe(query_name, query, parameters) as observation, \
+                    self._driver.session(database=self.database) as session:
+                result = session.run(plan_capture.prepare(query_name, query), parameters or {})
                 # Consume the result to ensure it's executed
-                return result.consume()
+                observation.summary = result.consume()
+                return observation.summary
                 
         except Exception as e:
             logger.error(f"Write query failed: {e}")
             raise
     
-    def execute_read_query(self, query: str, parameters: dict = None) -> list:
+    def execute_read_query(self, query: str, parameters: dict = None, query_name: Optional[str] = None) -> list:
         """
         Execute a single read query and return results as a list.
         
         Args:
             query: Cypher query string
             parameters: Query parameters
+            query_name: Stable name used for instrumentation
             
         Returns:
             List of query results
@@ -155,26 +191,96 @@ class DatabaseManager:
             raise RuntimeError("Database connection not established. Call connect() first.")
         
         try:
-            with self._driver.session() as session:
-                result = session.run(query, parameters or {})
-                return [record for record in result]
+            query_name = query_name or stable_query_name(query)
+            with query_instrumentation.observe(query_name, query, parameters) as observation, \
+                    self._driver.session(database=self.database) as session:
+                result = session.run(plan_capture.prepare(query_name, query), parameters or {})
+                records = [record for record in result]
+                observation.rows = len(records)
+                observation.summary = result.consume()
+                return records
                 
         except Exception as e:
             logger.error(f"Read query failed: {e}")
             raise
     
+    def ping(self) -> float:
+        """
+        Run a trivial query on a pooled connection.
+
+        Unlike verify_connectivity() this reuses an idle pool connection
+        instead of opening a new one.
+
+        Returns:
+            Round-trip time in seconds
+
+        Raises:
+            Exception: If the query fails
+        """
+        if not self._driver:
+            raise DatabaseConnectionError("Database not initialized")
+        start = time.perf_counter()
+        with self._driver.session(database=self.database) as session:
+            session.run("RETURN 1").consume()
+        return time.perf_counter() - start
+
+    def warm_pool(self, connections: int, timeout: float = 30.0) -> int:
+        """
+        Open ``connections`` pool connections up front.
+
+        Each connection runs a trivial query and is held until all are open,
+        so the pool really grows to that size instead of reusing one socket.
+
+        Returns:
+            Number of connections opened
+        """
+        if not self._driver or connections < 1:
+            return 0
+        barrier = threading.Barrier(connections, timeout=timeout)
+
+        def open_connection() -> None:
+            try:
+                with self._driver.session(database=self.database) as session:
+                    session.run("RETURN 1").consume()
+                    barrier.wait()
+            except threading.BrokenBarrierError:
+                # Another connection failed; this one is open all the same
+                return
+            except Exception:
+                barrier.abort()
+                raise
+
+        opened = 0
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="pool-warmup") as pool:
+            for future in [pool.submit(open_connection) for _ in range(connections)]:
+                try:
+                    future.result()
+                    opened += 1
+                except Exception as e:
+                    logger.warning(f"Could not open a pool connection during warm-up: {e}")
+        return opened
+
+    def set_health_monitor(self, monitor: Optional[Any]) -> None:
+        """Serve health_check() from ``monitor.healthy`` instead of probing on every call."""
+        self._health_monitor = monitor
+
     def health_check(self) -> bool:
         """
         Check if the database connection is healthy.
         
+        Returns the cached state of the health monitor when one is set,
+        otherwise pings the database.
+
         Returns:
             True if connection is healthy, False otherwise
         """
+        if self._health_monitor is not None:
+            return self._health_monitor.healthy
         try:
             if not self._driver:
                 return False
             
-            self._driver.verify_connectivity()
+            self.ping()
             return True
             
         except Exception as e:
@@ -17,4 +17,12 @@ class QuestionNotFoundError(TutrException):
 
 class DataValidationError(TutrException):
     """Raised when data validation fails."""
-    pass
\ No newline at end of file
+    pass
+
+class SchemaError(TutrException):
+    """Raised when required indexes are missing, failed or not yet online."""
+    pass
+
+class ServiceOverloadedError(TutrException):
+    """Raised when a request is shed by admission control."""
+    pass
@@ -0,0 +1,337 @@
+#core/instrumentation.py
+import bisect
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("fastwise.slow_queries")
+
+# Latency bucket upper bounds in seconds (Prometheus-style cumulative buckets).
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Summary counters that represent graph updates.
+_UPDATE_COUNTERS = (
+    'nodes_created', 'nodes_deleted', 'relationships_created', 'relationships_deleted',
+    'properties_set', 'labels_added', 'labels_removed',
+)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def stable_query_name(query: str) -> str:
+    """Derive a stable name for an unnamed query from its normalized text."""
+    normalized = _WHITESPACE.sub(' ', query).strip()
+    return "cypher_" + hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:10]
+
+
+def redact_parameters(parameters: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Replace parameter values with their type (and size for collections)."""
+    redacted = {}
+    for key, value in (parameters or {}).items():
+        if isinstance(value, (list, tuple, dict, set)):
+            redacted[key] = f"<{type(value).__name__}[{len(value)}]>"
+        else:
+            redacted[key] = f"<{type(value).__name__}>"
+    return redacted
+
+
+def _count_db_hits(plan: Any) -> int:
+    """Sum db hits over a PROFILE plan tree (dict or driver ProfiledPlan)."""
+    if plan is None:
+        return 0
+    if isinstance(plan, dict):
+        hits = plan.get('dbHits', plan.get('db_hits', 0)) or 0
+        children = plan.get('children', [])
+    else:
+        hits = getattr(plan, 'db_hits', 0) or 0
+        children = getattr(plan, 'children', [])
+    return hits + sum(_count_db_hits(child) for child in children)
+
+
+class QueryObservation:
+    """One execution of a named query, filled in while the query runs."""
+
+    __slots__ = ('name', 'query', 'parameters', 'duration', 'rows', 'summary', 'error')
+
+    def __init__(self, name: str, query: str, parameters: Optional[Dict[str, Any]]):
+        self.name = name
+        self.query = query
+        self.parameters = parameters
+        self.duration = 0.0
+        self.rows = 0
+        self.summary = None
+        self.error: Optional[BaseException] = None
+
+    @property
+    def db_hits(self) -> int:
+        return _count_db_hits(getattr(self.summary, 'profile', None))
+
+    @property
+    def updates(self) -> int:
+        counters = getattr(self.summary, 'counters', None)
+        if counters is None:
+            return 0
+        return sum(getattr(counters, name, 0) or 0 for name in _UPDATE_COUNTERS)
+
+
+class QueryStats:
+    """Aggregated metrics for a single query name."""
+
+    __slots__ = ('bucket_counts', 'count', 'total_seconds', 'max_seconds',
+                 'rows', 'db_hits', 'updates', 'errors')
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.db_hits = 0
+        self.updates = 0
+        self.errors = 0
+
+    def record(self, observation: QueryObservation) -> None:
+        duration = observation.duration
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.total_seconds += duration
+        self.max_seconds = max(self.max_seconds, duration)
+        self.rows += observation.rows
+        self.db_hits += observation.db_hits
+        self.updates += observation.updates
+        if observation.error is not None:
+            self.errors += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(LATENCY_BUCKETS + (float('inf'),), self.bucket_counts):
+            cumulative += bucket_count
+            buckets['+Inf' if bound == float('inf') else str(bound)] = cumulative
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total_seconds': round(self.total_seconds, 6),
+            'max_seconds': round(self.max_seconds, 6),
+            'rows': self.rows,
+            'db_hits': self.db_hits,
+            'updates': self.updates,
+            'latency_buckets': buckets,
+        }
+
+
+class QueryMetricsRegistry:
+    """Thread-safe per-query metrics keyed by stable query name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, QueryStats] = {}
+
+    def __call__(self, observation: QueryObservation) -> None:
+        with self._lock:
+            stats = self._stats.get(observation.name)
+            if stats is None:
+                stats = self._stats[observation.name] = QueryStats()
+            stats.record(observation)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in sorted(self._stats.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+class SlowQueryLog:
+    """Logs queries slower than a threshold, with parameter values redacted."""
+
+    def __init__(self, threshold_ms: float):
+        self.threshold_ms = threshold_ms
+
+    def __call__(self, observation: QueryObservation) -> None:
+        elapsed_ms = observation.duration * 1000.0
+        if self.threshold_ms <= 0 or elapsed_ms < self.threshold_ms:
+            return
+        slow_query_logger.warning(json.dumps({
+            'query_name': observation.name,
+            'elapsed_ms': round(elapsed_ms, 3),
+            'rows': observation.rows,
+            'db_hits': observation.db_hits,
+            'parameters': redact_parameters(observation.parameters),
+            'query': _WHITESPACE.sub(' ', observation.query).strip(),
+        }))
+
+
+class QueryInstrumentation:
+    """
+    Hook invoked around every repository and DatabaseManager query.
+    Listeners receive each finished QueryObservation.
+    """
+
+    def __init__(self, slow_query_ms: float = 200.0):
+        self.enabled = True
+        self.metrics = QueryMetricsRegistry()
+        self.slow_log = SlowQueryLog(slow_query_ms)
+        self._listeners: List[Callable[[QueryObservation], None]] = [self.metrics, self.slow_log]
+
+    def add_listener(self, listener: Callable[[QueryObservation], None]) -> None:
+        """Register a callable that receives every finished observation."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[QueryObservation], None]) -> None:
+        """Unregister a previously added listener."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    @contextmanager
+    def observe(self, name: Optional[str], query: str, parameters: Optional[Dict[str, Any]] = None):
+        """
+        Context manager timing one query execution.
+
+        Also opens a ``query`` span carrying the query name, rows and db hits
+        when the current request is traced.
+
+        Args:
+            name: Stable query name; derived from the query text when omitted
+            query: Cypher query string
+            parameters: Query parameters
+
+        Yields:
+            QueryObservation to fill in with rows and result summary
+        """
+        observation = QueryObservation(name or stable_query_name(query), query, parameters)
+        with tracer.span('query', query_name=observation.name) as span:
+            try:
+                if not self.enabled:
+                    yield observation
+                    return
+
+                start = time.perf_counter()
+                try:
+                    yield observation
+                except BaseException as e:
+                    observation.error = e
+                    raise
+                finally:
+                    observation.duration = time.perf_counter() - start
+                    for listener in self._listeners:
+                        try:
+                            listener(observation)
+                        except Exception as e:
+                            logger.warning(f"Query instrumentation listener failed: {e}")
+            finally:
+                if span.recording:
+                    span.set(rows=observation.rows, db_hits=observation.db_hits)
+
+    def render_json(self) -> str:
+        """Render the current metrics as a JSON document."""
+        return json.dumps({'queries': self.metrics.snapshot()}, indent=2)
+
+    def render_prometheus(self) -> str:
+        """Render the current metrics in Prometheus text exposition format."""
+        lines = [
+            "# HELP fastwise_query_duration_seconds Query latency by query name.",
+            "# TYPE fastwise_query_duration_seconds histogram",
+        ]
+        snapshot = self.metrics.snapshot()
+        for name, stats in snapshot.items():
+            for bound, cumulative in stats['latency_buckets'].items():
+                lines.append(f'fastwise_query_duration_seconds_bucket{{query="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'fastwise_query_duration_seconds_sum{{query="{name}"}} {stats["total_seconds"]}')
+            lines.append(f'fastwise_query_duration_seconds_count{{query="{name}"}} {stats["count"]}')
+
+        for metric, key, help_text in (
+            ('fastwise_query_rows_total', 'rows', 'Rows returned by query name.'),
+            ('fastwise_query_db_hits_total', 'db_hits', 'Profiled db hits by query name.'),
+            ('fastwise_query_updates_total', 'updates', 'Graph updates by query name.'),
+            ('fastwise_query_errors_total', 'errors', 'Failed executions by query name.'),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, stats in snapshot.items():
+                lines.append(f'{metric}{{query="{name}"}} {stats[key]}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, file_path: str) -> None:
+        """Write the metrics to a file; Prometheus format for .prom/.txt, JSON otherwise."""
+        if file_path.endswith(('.prom', '.txt')):
+            content = self.render_prometheus()
+        else:
+            content = self.render_json()
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        logger.info(f"Query metrics written to {file_path}")
+
+
+class MetricsServer:
+    """
+    Minimal HTTP endpoint exposing query metrics.
+
+    GET /metrics serves Prometheus text, GET /metrics.json serves JSON.
+    """
+
+    def __init__(self, instrumentation: QueryInstrumentation, host: str = "127.0.0.1", port: int = 9464):
+        self.instrumentation = instrumentation
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start serving in a daemon thread."""
+        instrumentation = self.instrumentation
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = instrumentation.render_prometheus(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = instrumentation.render_json(), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                payload = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug("metrics endpoint: " + format % args)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _default_instrumentation() -> QueryInstrumentation:
+    from config.settings import instrumentation_config
+    instance = QueryInstrumentation(slow_query_ms=instrumentation_config.slow_query_ms)
+    instance.enabled = instrumentation_config.enabled
+    return instance
+
+
+# Process-wide instrumentation used by BaseRepository and DatabaseManager.
+query_instrumentation = _default_instrumentation()
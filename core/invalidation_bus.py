@@ -0,0 +1,274 @@
+#core/invalidation_bus.py
+"""
+Host-local cache invalidation bus over Unix datagram sockets.
+
+Every worker process that starts the bus binds one datagram socket in a
+shared directory and listens on it. Publishing sends a small JSON datagram
+to every other socket in that directory, so in-process caches on the same
+host are evicted within a millisecond or so of a write, without polling
+Neo4j and without a broker:
+
+    invalidation_bus.subscribe('student', lambda event: cache.invalidate(event['student_id']))
+    invalidation_bus.start()
+    invalidation_bus.publish('student', student_id='s1')
+
+Events are only delivered to *other* processes; the publisher applies its
+own changes in process. publish() only queues the event: a background
+sender thread does the socket writes, so a slow receiver never holds up the
+write path. Delivery is best effort: if the outbox or a receiver's queue
+stays full for longer than the send timeout the datagram is dropped (and
+counted), and the affected cache entries fall back to their TTL.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STUDENT = 'student'
+PROGRESS = 'progress'
+CATALOGUE = 'catalogue'
+
+_MAX_DATAGRAM = 64 * 1024
+_PEER_REFRESH_SECONDS = 1.0
+_SEND_TIMEOUT_SECONDS = 0.05
+# Events waiting for the sender thread; beyond this they are dropped
+_OUTBOX_SIZE = 10_000
+
+
+class InvalidationBus:
+    """Publishes invalidation events to, and receives them from, workers on this host."""
+
+    def __init__(self, directory: str, enabled: bool = True):
+        self.directory = directory
+        self.enabled = enabled
+        self._origin_pid = 0
+        self._origin = ""
+        self._handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
+        self._lock = threading.Lock()
+        self._sender: Optional[socket.socket] = None
+        self._receiver: Optional[socket.socket] = None
+        self._path: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._outbox: Optional[queue.Queue] = None
+        self._sender_thread: Optional[threading.Thread] = None
+        self._sender_pid = 0
+        self._flush_at_exit = False
+        # Guards _peers, which the sender thread replaces and health checks read
+        self._peers_lock = threading.Lock()
+        self._peers: List[str] = []
+        self._peers_listed_at = 0.0
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.received = 0
+        self.handler_errors = 0
+
+    @property
+    def origin(self) -> str:
+        """Identity of this process; re-derived after a fork so children don't share it."""
+        if self._origin_pid != os.getpid():
+            self._origin_pid = os.getpid()
+            self._origin = f"{self._origin_pid}-{uuid.uuid4().hex[:8]}"
+            self._sender = None
+            self._peers_listed_at = 0.0
+        return self._origin
+
+    def subscribe(self, kind: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a handler for events of one kind published by other processes."""
+        with self._lock:
+            self._handlers.setdefault(kind, []).append(handler)
+
+    def unsubscribe(self, kind: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """Remove a previously registered handler."""
+        with self._lock:
+            handlers = self._handlers.get(kind, [])
+            if handler in handlers:
+                handlers.remove(handler)
+
+    def publish(self, kind: str, **fields: Any) -> None:
+        """
+        Queue an event for every other worker on this host; never blocks.
+
+        Args:
+            kind: Event kind (STUDENT, PROGRESS or CATALOGUE)
+            **fields: JSON-serializable event fields, e.g. student_id
+        """
+        if not self.enabled:
+            return
+        payload = json.dumps(dict(fields, kind=kind, origin=self.origin)).encode('utf-8')
+        self.published += 1
+        try:
+            self._get_outbox().put_nowait(payload)
+        except queue.Full:
+            self.dropped += 1
+
+    def _get_outbox(self) -> queue.Queue:
+        """The outbox, starting the sender thread on first use (and again in a forked child)."""
+        with self._lock:
+            if self._sender_pid != os.getpid():
+                self._sender_pid = os.getpid()
+                self._outbox = queue.Queue(maxsize=_OUTBOX_SIZE)
+                self._sender_thread = threading.Thread(
+                    target=self._send_loop, args=(self._outbox,), name="invalidation-bus-sender", daemon=True
+                )
+                self._sender_thread.start()
+                if not self._flush_at_exit:
+                    # Short-lived publishers (admin.py ingest) exit right after publishing
+                    atexit.register(self._stop_sender)
+                    self._flush_at_exit = True
+            return self._outbox
+
+    def _send_loop(self, outbox: queue.Queue) -> None:
+        while True:
+            payload = outbox.get()
+            if payload is None:
+                return
+            sender = self._get_sender()
+            for peer in self._list_peers():
+                try:
+                    sender.sendto(payload, peer)
+                    self.delivered += 1
+                except (BlockingIOError, TimeoutError):
+                    self.dropped += 1
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # The worker behind this socket exited without cleaning up
+                    self._remove_stale(peer)
+                except OSError as e:
+                    self.dropped += 1
+                    logger.debug(f"Invalidation event to {peer} failed: {e}")
+
+    def _stop_sender(self) -> None:
+        """Send what is queued, then stop the sender thread."""
+        with self._lock:
+            outbox, thread = self._outbox, self._sender_thread
+            if thread is None or self._sender_pid != os.getpid():
+                return
+            self._outbox = self._sender_thread = None
+            self._sender_pid = 0
+        try:
+            outbox.put(None, timeout=1)
+        except queue.Full:
+            return
+        thread.join(timeout=1)
+
+    def start(self) -> None:
+        """Bind this process's socket and start receiving events."""
+        if not self.enabled or self._thread is not None:
+            return
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self._path = os.path.join(self.directory, f"{self.origin}.sock")
+        receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiver.bind(self._path)
+        self._receiver = receiver
+        self._thread = threading.Thread(target=self._run, name="invalidation-bus", daemon=True)
+        self._thread.start()
+        logger.info(f"Invalidation bus listening on {self._path}")
+
+    def stop(self) -> None:
+        """Send queued events, stop receiving and remove this process's socket."""
+        self._stop_sender()
+        receiver, self._receiver = self._receiver, None
+        if receiver is None:
+            return
+        try:
+            # Wake the listener blocked in recv(); it exits once _receiver is None
+            self._get_sender().sendto(b'', self._path)
+        except OSError:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        receiver.close()
+        try:
+            os.unlink(self._path)
+        except FileNotFoundError:
+            pass
+        self._path = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'listening': self._thread is not None,
+            'peers': len(self._list_peers(refresh=False)),
+            'queued': self._outbox.qsize() if self._outbox is not None else 0,
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'received': self.received,
+            'handler_errors': self.handler_errors,
+        }
+
+    def _get_sender(self) -> socket.socket:
+        if self._sender is None:
+            sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            # A full receiver queue blocks briefly (back-pressure during bursts)
+            # instead of dropping; a stuck receiver cannot stall the publisher.
+            sender.settimeout(_SEND_TIMEOUT_SECONDS)
+            self._sender = sender
+        return self._sender
+
+    def _list_peers(self, refresh: bool = True) -> List[str]:
+        """Sockets of the other workers; the list is replaced, never mutated, so callers may iterate it."""
+        with self._peers_lock:
+            now = time.monotonic()
+            if refresh and now - self._peers_listed_at > _PEER_REFRESH_SECONDS:
+                try:
+                    names = os.listdir(self.directory)
+                except FileNotFoundError:
+                    names = []
+                self._peers = [
+                    os.path.join(self.directory, name) for name in names
+                    if name.endswith('.sock') and name != f"{self.origin}.sock"
+                ]
+                self._peers_listed_at = now
+            return self._peers
+
+    def _remove_stale(self, peer: str) -> None:
+        try:
+            os.unlink(peer)
+        except OSError:
+            pass
+        with self._peers_lock:
+            self._peers = [known for known in self._peers if known != peer]
+
+    def _run(self) -> None:
+        receiver = self._receiver
+        while True:
+            try:
+                data = receiver.recv(_MAX_DATAGRAM)
+            except OSError:
+                return
+            if self._receiver is None:
+                return  # woken up by stop()
+            try:
+                event = json.loads(data)
+            except ValueError:
+                continue
+            if event.get('origin') == self.origin:
+                continue
+            self.received += 1
+            with self._lock:
+                handlers = list(self._handlers.get(event.get('kind'), ()))
+            for handler in handlers:
+                try:
+                    handler(event)
+                except Exception as e:
+                    self.handler_errors += 1
+                    logger.warning(f"Invalidation handler for {event.get('kind')} failed: {e}")
+
+
+def _default_bus() -> InvalidationBus:
+    from config.settings import app_config
+    return InvalidationBus(app_config.invalidation_bus_dir, enabled=app_config.invalidation_bus_enabled)
+
+
+# Process-wide bus used by the repositories and services that own caches.
+invalidation_bus = _default_bus()
@@ -0,0 +1,274 @@
+#core/logging_setup.py
+"""
+Process-wide logging configuration.
+
+Records are handed to a bounded in-memory queue and written to stdout by a
+listener thread, so a request thread never blocks on the stream; when the
+queue is full the record is dropped and counted instead. Messages are
+formatted on the listener thread, so callers should use lazy %-style
+arguments (``logger.info("Finding student %s", student_id)``), which also
+skip formatting entirely for records that are filtered out.
+
+Per-call messages on hot paths go to a dedicated child logger,
+``hot_path_logger(__name__)`` (``<module>.hot``), and are sampled: with
+LOG_SAMPLE_RATES="*.hot=0.01" one in a hundred records below WARNING is
+kept. Hot-path loggers decide before a LogRecord is built, so a dropped
+message costs a counter increment; other loggers matching a pattern are
+sampled by a handler filter. Kept records carry ``sample_rate`` so counts
+can be scaled back up.
+"""
+import atexit
+import fnmatch
+import itertools
+import json
+import logging
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, TextIO, Tuple
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes every LogRecord has; anything else on a record came from ``extra``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def hot_path_logger(name: str) -> 'HotPathLogger':
+    """The logger for per-call messages of module ``name``; sampled by LOG_SAMPLE_RATES."""
+    return HotPathLogger(logging.getLogger(f"{name}.hot"))
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """
+    Parse "pattern=rate,pattern=rate" (fnmatch patterns over logger names).
+
+    Raises:
+        ValueError: If an entry is malformed or a rate is outside 0..1
+    """
+    rates = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        pattern, separator, rate = entry.partition('=')
+        if not separator or not pattern.strip():
+            raise ValueError(f"Invalid log sample rate {entry!r}; expected pattern=rate")
+        value = float(rate)
+        if not 0.0 <= value <= 1.0:
+            raise ValueError(f"Log sample rate for {pattern.strip()!r} must be between 0 and 1, got {value}")
+        rates[pattern.strip()] = value
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in every 1/rate records below ``below_level`` per matching logger.
+
+    Sampling is by count, not random, so it costs one counter increment.
+    The first pattern (in configuration order) matching a logger name wins;
+    the match is resolved once per logger name.
+    """
+
+    def __init__(self, rates: Dict[str, float], below_level: int = logging.WARNING):
+        super().__init__()
+        self.rates = dict(rates)
+        self.below_level = below_level
+        self._samplers: Dict[str, Optional[Tuple[int, float, Any]]] = {}
+        self._lock = threading.Lock()
+        # Unlocked counter: cheap, may miss an increment under contention
+        self.dropped = 0
+
+    def _sampler(self, name: str) -> Optional[Tuple[int, float, Any]]:
+        with self._lock:
+            if name not in self._samplers:
+                sampler = None
+                for pattern, rate in self.rates.items():
+                    if fnmatch.fnmatchcase(name, pattern):
+                        # (keep every n-th, rate, counter); n == 0 drops everything
+                        sampler = (round(1 / rate) if rate > 0 else 0, rate, itertools.count())
+                        break
+                self._samplers[name] = sampler
+            return self._samplers[name]
+
+    def sample(self, name: str, level: int) -> Optional[float]:
+        """
+        Decide whether to keep a record of logger ``name`` at ``level``.
+
+        Returns:
+            None to drop it, else the sample rate it was kept at (1.0 if unsampled)
+        """
+        if level >= self.below_level:
+            return 1.0
+        sampler = self._samplers.get(name, False)
+        if sampler is False:
+            sampler = self._sampler(name)
+        if sampler is None:
+            return 1.0
+        every, rate, counter = sampler
+        # next() on itertools.count is atomic under the GIL
+        if every and next(counter) % every == 0:
+            return rate
+        self.dropped += 1
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if 'sample_rate' in record.__dict__:
+            # Already sampled by a HotPathLogger
+            return True
+        rate = self.sample(record.name, record.levelno)
+        if rate is None:
+            return False
+        if rate < 1.0:
+            record.sample_rate = rate
+        return True
+
+
+class HotPathLogger(logging.LoggerAdapter):
+    """
+    Logger for per-call messages that samples before building the record.
+
+    A filtered-out call costs a level check and a counter increment, not a
+    LogRecord (caller lookup, timestamps, thread and process names).
+    """
+
+    def __init__(self, logger: logging.Logger):
+        super().__init__(logger, None)
+
+    def log(self, level: int, msg: Any, *args: Any, **kwargs: Any) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        sampling = _state.sampling
+        if sampling is not None:
+            rate = sampling.sample(self.logger.name, level)
+            if rate is None:
+                return
+            if rate < 1.0:
+                kwargs['extra'] = {**(kwargs.get('extra') or {}), 'sample_rate': rate}
+        # Report the caller of info()/debug(), not this method
+        kwargs.setdefault('stacklevel', 2)
+        self.logger._log(level, msg, args, **kwargs)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler over a bounded queue that drops (and counts) instead of blocking.
+
+    Unlike the stock handler it does not format the record on the calling
+    thread; the listener formats it. Arguments are therefore rendered a
+    little later, so log values, not objects that are mutated right after.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, any ``extra`` fields and exc."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                payload[key] = value
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class _LoggingState:
+    listener: Optional[QueueListener] = None
+    queue_handler: Optional[NonBlockingQueueHandler] = None
+    sampling: Optional[SamplingFilter] = None
+
+
+_state = _LoggingState()
+
+
+def configure_logging(
+    level: str = 'INFO',
+    log_format: str = 'text',
+    sample_rates: Optional[Dict[str, float]] = None,
+    async_queue: bool = True,
+    queue_size: int = 10_000,
+    stream: Optional[TextIO] = None
+) -> None:
+    """
+    Replace the root handlers with the configured pipeline.
+
+    Args:
+        level: Root log level
+        log_format: 'text' (the classic one-line format) or 'json'
+        sample_rates: Logger name pattern -> fraction of records below WARNING kept
+        async_queue: Write through a bounded queue and a listener thread
+        queue_size: Records buffered before new ones are dropped
+        stream: Output stream (default stdout)
+    """
+    shutdown_logging()
+    _state.queue_handler = None
+    _state.sampling = None
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if log_format == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.setLevel(level)
+
+    if async_queue:
+        _state.queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+        _state.listener = QueueListener(_state.queue_handler.queue, output, respect_handler_level=True)
+        _state.listener.start()
+        handler: logging.Handler = _state.queue_handler
+    else:
+        handler = output
+    if sample_rates:
+        _state.sampling = SamplingFilter(sample_rates)
+        handler.addFilter(_state.sampling)
+    root.addHandler(handler)
+
+
+def configure_from_settings() -> None:
+    """configure_logging() from the LOG_* settings."""
+    from config.settings import app_config
+
+    configure_logging(
+        level=app_config.log_level,
+        log_format=app_config.log_format,
+        sample_rates=parse_sample_rates(app_config.log_sample_rates),
+        async_queue=app_config.log_async,
+        queue_size=app_config.log_queue_size,
+    )
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    if _state.listener is not None:
+        _state.listener.stop()
+        _state.listener = None
+
+
+def logging_stats() -> Dict[str, Any]:
+    """Records dropped by sampling and by a full queue, and the current queue depth."""
+    queue_handler = _state.queue_handler if _state.listener is not None else None
+    return {
+        'sampled_out': _state.sampling.dropped if _state.sampling is not None else 0,
+        'queue_dropped': queue_handler.dropped if queue_handler is not None else 0,
+        'queue_depth': queue_handler.queue.qsize() if queue_handler is not None else 0,
+    }
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,410 @@
+#core/profiling.py
+"""
+On-demand profiling of a live process.
+
+Only calls into classes marked with ``@profiled`` (RecommendationService,
+DataPopulationService) are profiled, from the outermost public method down.
+A session is started by a signal (PROFILE_SIGNAL, SIGUSR1 by default; the
+same signal again ends it early) or at start-up with PROFILE_ON_START, and
+ends after PROFILE_DURATION seconds or PROFILE_MAX_CALLS profiled calls.
+
+Two modes:
+
+* ``sample`` (default): a background thread snapshots the stacks of the
+  threads currently inside a profiled call every PROFILE_INTERVAL_MS. The
+  calls themselves run untouched, so the overhead is the sampler's.
+  Writes ``<session>.collapsed`` (``frame;frame;frame count`` lines, the
+  input of flamegraph.pl, speedscope and inferno) and ``<session>.top.txt``.
+* ``cprofile``: profiled calls run under cProfile, one at a time (only
+  one cProfile profiler can be active per process); calls arriving while
+  one is profiled run unprofiled. Exact call counts, at a cost of several
+  times the call's runtime. Writes ``<session>.prof``
+  (pstats; snakeviz, flameprof) and ``<session>.top.txt``.
+
+Outside a session a profiled method costs one attribute check.
+"""
+import cProfile
+import functools
+import inspect
+import io
+import logging
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MODES = ('sample', 'cprofile')
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, 'co_qualname', code.co_name)
+    module = frame.f_globals.get('__name__', os.path.basename(code.co_filename))
+    # ';' separates frames and ' ' the count in collapsed stacks
+    return f"{module}.{name}".replace(';', ':').replace(' ', '_')
+
+
+class _Session:
+    """One profiling window; see Profiler.start()."""
+
+    def __init__(self, mode: str, duration: float, max_calls: int, interval: float, output_dir: str):
+        self.mode = mode
+        self.duration = duration
+        self.max_calls = max_calls
+        self.interval = interval
+        self.output_dir = output_dir
+        self.name = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.started = time.monotonic()
+        self.calls = 0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.stats: Optional[pstats.Stats] = None
+        # thread ident -> frame of run() for threads inside a profiled call (sample mode)
+        self.threads: Dict[int, Any] = {}
+        self.in_flight = 0
+        # cProfile allows one active profiler per process, so cprofile mode profiles one call at a time
+        self.profiling = False
+        # done: stop profiling new calls; finished: the report is written
+        self.done = threading.Event()
+        self.finished = threading.Event()
+        self.idle = threading.Condition()
+
+    def claim(self) -> bool:
+        """
+        Count one more profiled call.
+
+        Returns:
+            False once the session is over or the call budget is spent, and in
+            cprofile mode while another call is being profiled
+        """
+        with self.idle:
+            if self.done.is_set() or (self.max_calls and self.calls >= self.max_calls):
+                return False
+            if self.mode == 'cprofile':
+                if self.profiling:
+                    return False
+                self.profiling = True
+            self.calls += 1
+            self.in_flight += 1
+            return True
+
+    def run(self, function: Callable, args: tuple, kwargs: dict) -> Any:
+        """Call ``function`` under the session; a profiler failure never fails the call."""
+        ident = threading.get_ident()
+        try:
+            if self.mode == 'cprofile':
+                return self._run_cprofile(function, args, kwargs)
+            self.threads[ident] = sys._getframe()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.threads.pop(ident, None)
+        finally:
+            with self.idle:
+                self.profiling = False
+                self.in_flight -= 1
+                if self.max_calls and self.calls >= self.max_calls and not self.in_flight:
+                    self.done.set()
+                self.idle.notify_all()
+
+    def _run_cprofile(self, function: Callable, args: tuple, kwargs: dict) -> Any:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except Exception as e:
+            # e.g. another profiling tool is active in this process
+            logger.warning(f"Could not profile {getattr(function, '__qualname__', function)}: {e}")
+            return function(*args, **kwargs)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            try:
+                profile.disable()
+                with self.idle:
+                    if self.stats is None:
+                        self.stats = pstats.Stats(profile)
+                    else:
+                        self.stats.add(profile)
+            except Exception as e:
+                logger.warning(f"Could not record a cProfile run: {e}")
+
+    def sample(self) -> None:
+        frames = sys._current_frames()
+        for ident, entry in list(self.threads.items()):
+            frame = frames.get(ident)
+            stack: List[str] = []
+            # Walk up from the running frame to the profiled method, below run()
+            while frame is not None and frame is not entry:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if frame is None or not stack:
+                continue
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+
+class Profiler:
+    """Process-wide switch for profiling sessions over ``@profiled`` classes."""
+
+    def __init__(self):
+        self._session: Optional[_Session] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.mode = 'sample'
+        self.duration = 60.0
+        self.max_calls = 0
+        self.interval = 0.005
+        self.top_n = 30
+        self.output_dir = 'profiles'
+        self.sessions = 0
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    @property
+    def active(self) -> bool:
+        return self._session is not None
+
+    def configure(
+        self,
+        mode: str = 'sample',
+        duration: float = 60.0,
+        max_calls: int = 0,
+        interval_ms: float = 5.0,
+        top_n: int = 30,
+        output_dir: str = 'profiles'
+    ) -> None:
+        """
+        Set the defaults of later sessions.
+
+        Args:
+            mode: 'sample' or 'cprofile'
+            duration: Seconds after which a session ends (0 = until stopped)
+            max_calls: Profiled calls after which a session ends (0 = no limit)
+            interval_ms: Sampling interval of 'sample' mode
+            top_n: Functions listed in the top report
+            output_dir: Where session reports are written
+
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r}; expected one of {', '.join(MODES)}")
+        self.mode = mode
+        self.duration = duration
+        self.max_calls = max_calls
+        self.interval = max(interval_ms, 0.5) / 1000
+        self.top_n = top_n
+        self.output_dir = output_dir
+
+    def start(self, mode: Optional[str] = None, duration: Optional[float] = None,
+              max_calls: Optional[int] = None) -> bool:
+        """
+        Start a session; arguments override the configured defaults.
+
+        Returns:
+            False if a session is already running
+        """
+        with self._lock:
+            if self._session is not None:
+                return False
+            session = _Session(
+                mode or self.mode, self.duration if duration is None else duration,
+                self.max_calls if max_calls is None else max_calls, self.interval, self.output_dir
+            )
+            if session.mode not in MODES:
+                raise ValueError(f"Unknown profiling mode {session.mode!r}")
+            self._session = session
+            self.sessions += 1
+        threading.Thread(target=self._run, args=(session,), name="profiler", daemon=True).start()
+        logger.info(
+            f"Profiling started ({session.mode}, {session.duration or 'unlimited'}s, "
+            f"{session.max_calls or 'unlimited'} calls) -> {session.output_dir}/{session.name}.*"
+        )
+        return True
+
+    def stop(self, timeout: float = 10.0) -> Optional[Dict[str, Any]]:
+        """
+        End the running session and wait for its report.
+
+        Returns:
+            The report (file paths and counts), or None if no session was running
+        """
+        session = self._session
+        if session is None:
+            return None
+        session.done.set()
+        session.finished.wait(timeout)
+        return self.last_report
+
+    def toggle(self) -> None:
+        """Start a session, or end the running one."""
+        if self._session is None:
+            self.start()
+        else:
+            self.stop()
+
+    def call(self, function: Callable, args: tuple, kwargs: dict) -> Any:
+        """Run ``function`` as a profiled call if a session is running and no scope is open in this thread."""
+        session = self._session
+        local = self._local
+        if session is None or getattr(local, 'inside', False) or not session.claim():
+            return function(*args, **kwargs)
+        local.inside = True
+        try:
+            return session.run(function, args, kwargs)
+        finally:
+            local.inside = False
+
+    def stats(self) -> Dict[str, Any]:
+        session = self._session
+        return {
+            'active': session is not None,
+            'mode': session.mode if session is not None else self.mode,
+            'calls': session.calls if session is not None else 0,
+            'sessions': self.sessions,
+            'last_report': self.last_report,
+        }
+
+    def _run(self, session: _Session) -> None:
+        end = session.started + session.duration if session.duration else None
+        while not session.done.is_set():
+            remaining = end - time.monotonic() if end is not None else None
+            if remaining is not None and remaining <= 0:
+                break
+            if session.mode == 'sample':
+                session.sample()
+                session.done.wait(session.interval if remaining is None else min(session.interval, remaining))
+            else:
+                session.done.wait(remaining)
+        session.done.set()
+        with session.idle:
+            # Let in-flight cProfile calls merge their stats
+            session.idle.wait_for(lambda: session.in_flight == 0, timeout=5)
+        try:
+            report = self._write_report(session)
+            logger.info(f"Profiling finished: {report}")
+        except Exception as e:
+            logger.error(f"Could not write profiling report: {e}")
+            report = {'error': str(e)}
+        with self._lock:
+            self.last_report = report
+            self._session = None
+        session.finished.set()
+
+    def _write_report(self, session: _Session) -> Dict[str, Any]:
+        os.makedirs(session.output_dir, exist_ok=True)
+        base = os.path.join(session.output_dir, session.name)
+        report: Dict[str, Any] = {
+            'mode': session.mode,
+            'seconds': round(time.monotonic() - session.started, 1),
+            'calls': session.calls,
+        }
+        if session.mode == 'sample':
+            with open(f"{base}.collapsed", 'w', encoding='utf-8') as output:
+                for stack, count in session.stacks.most_common():
+                    output.write(f"{stack} {count}\n")
+            top = self._top_from_samples(session)
+            report.update(samples=session.samples, collapsed=f"{base}.collapsed")
+        else:
+            top = ''
+            if session.stats is not None:
+                session.stats.dump_stats(f"{base}.prof")
+                buffer = io.StringIO()
+                session.stats.stream = buffer
+                session.stats.sort_stats('cumulative').print_stats(self.top_n)
+                session.stats.sort_stats('tottime').print_stats(self.top_n)
+                top = buffer.getvalue()
+                report['prof'] = f"{base}.prof"
+        with open(f"{base}.top.txt", 'w', encoding='utf-8') as output:
+            output.write(top)
+        report['top'] = f"{base}.top.txt"
+        return report
+
+    def _top_from_samples(self, session: _Session) -> str:
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in session.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+        samples = session.samples or 1
+        lines = [
+            f"{session.samples} samples every {session.interval * 1000:g}ms over {session.calls} profiled calls",
+            "",
+            f"{'self%':>7} {'total%':>7} {'self':>7} {'total':>7}  function",
+        ]
+        for frame, count in own.most_common(self.top_n):
+            lines.append(
+                f"{count / samples:7.1%} {total[frame] / samples:7.1%} {count:7d} {total[frame]:7d}  {frame}"
+            )
+        return '\n'.join(lines) + '\n'
+
+
+def profiled(cls):
+    """
+    Class decorator: make the public methods of ``cls`` profiling scopes.
+
+    Only the outermost profiled call of a thread is a scope; calls it makes
+    into profiled methods are part of its profile.
+    """
+    for attribute, method in list(vars(cls).items()):
+        if not attribute.startswith('_') and inspect.isfunction(method):
+            setattr(cls, attribute, _profiling_scope(method))
+    return cls
+
+
+def _profiling_scope(method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if profiler._session is None:
+            return method(*args, **kwargs)
+        return profiler.call(method, args, kwargs)
+    return wrapper
+
+
+def install_signal_handler(signal_name: str) -> bool:
+    """
+    Toggle a profiling session on ``signal_name`` (e.g. 'SIGUSR1').
+
+    Must be called from the main thread. The handler only starts a thread,
+    so it never blocks whatever the main thread was doing.
+
+    Returns:
+        False if the signal does not exist on this platform
+    """
+    signum = getattr(signal, signal_name, None)
+    if signum is None:
+        logger.warning(f"Profiling signal {signal_name} is not available on this platform")
+        return False
+
+    def handler(received, frame):
+        threading.Thread(target=profiler.toggle, name="profiler-toggle", daemon=True).start()
+
+    signal.signal(signum, handler)
+    logger.info(f"Send {signal_name} to pid {os.getpid()} to start or stop profiling")
+    return True
+
+
+def configure_from_settings() -> None:
+    """Configure the profiler from the PROFILE_* settings, install the signal and start if asked."""
+    from config.settings import profiling_config
+
+    profiler.configure(
+        profiling_config.mode, profiling_config.duration, profiling_config.max_calls,
+        profiling_config.interval_ms, profiling_config.top_n, profiling_config.output_dir
+    )
+    if profiling_config.signal_name and threading.current_thread() is threading.main_thread():
+        install_signal_handler(profiling_config.signal_name)
+    if profiling_config.on_start:
+        profiler.start()
+
+
+# Process-wide profiler
+profiler = Profiler()
@@ -0,0 +1,367 @@
+#core/query_plans.py
+"""
+Query plan capture and plan regression checks.
+
+When PLAN_CAPTURE_SAMPLE_RATE is above zero, sampled executions of each named
+query are run with PROFILE and their operator tree and db hits are stored
+under PLAN_CAPTURE_DIR, together with a sample of the parameters they ran
+with. A baseline of those plans is committed as query_plans/baseline.json
+and checked before deployment, re-planning each query with its sample
+parameters:
+
+    python -m core.query_plans baseline --captured query_plans/captured --output query_plans/baseline.json
+    python -m core.query_plans check --baseline query_plans/baseline.json
+"""
+import argparse
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .instrumentation import QueryObservation, query_instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Statements that can be prefixed with PROFILE/EXPLAIN (schema commands cannot).
+_PROFILABLE = re.compile(r'^\s*(MATCH|OPTIONAL|MERGE|WITH|UNWIND|CALL|RETURN|CREATE\s*\()', re.IGNORECASE)
+_PARAMETER = re.compile(r'\$([A-Za-z_][A-Za-z0-9_]*)')
+
+# Operators that read through an index.
+SEEK_OPERATORS = (
+    'NodeIndexSeek', 'NodeUniqueIndexSeek', 'NodeIndexSeekByRange', 'NodeIndexContainsScan',
+    'NodeIndexEndsWithScan', 'MultiNodeIndexSeek', 'DirectedRelationshipIndexSeek',
+    'UndirectedRelationshipIndexSeek', 'NodeIndexScan', 'NodeUniqueIndexSeekByRange',
+)
+# Operators whose appearance in a plan usually means a regression.
+SCAN_OPERATORS = ('AllNodesScan', 'NodeByLabelScan', 'CartesianProduct', 'Eager')
+
+# Stored parameter samples keep this many elements of a list (e.g. an UNWIND batch)
+_SAMPLE_LIST_LIMIT = 10
+
+
+def _operator_name(operator_type: str) -> str:
+    """
+    Strip the runtime and locking suffixes, e.g. 'NodeIndexSeek@neo4j' ->
+    'NodeIndexSeek' and 'NodeUniqueIndexSeek(Locking)' (under MERGE) -> 'NodeUniqueIndexSeek'.
+    """
+    return operator_type.split('@', 1)[0].split('(', 1)[0]
+
+
+def normalize_plan(plan: Any) -> Optional[Dict[str, Any]]:
+    """
+    Convert a driver plan (dict or plan object) into a stable operator tree.
+
+    Args:
+        plan: summary.plan or summary.profile from a query result
+
+    Returns:
+        Nested dictionary with operator, details, db_hits, rows and children
+    """
+    if plan is None:
+        return None
+    if isinstance(plan, dict):
+        operator_type = plan.get('operatorType', '')
+        arguments = plan.get('args', plan.get('arguments', {})) or {}
+        db_hits = plan.get('dbHits', plan.get('db_hits'))
+        rows = plan.get('rows')
+        children = plan.get('children', [])
+    else:
+        operator_type = getattr(plan, 'operator_type', '')
+        arguments = getattr(plan, 'arguments', {}) or {}
+        db_hits = getattr(plan, 'db_hits', None)
+        rows = getattr(plan, 'rows', None)
+        children = getattr(plan, 'children', [])
+
+    node = {
+        'operator': _operator_name(operator_type),
+        'details': arguments.get('Details', ''),
+        'children': [normalize_plan(child) for child in children],
+    }
+    if db_hits is not None:
+        node['db_hits'] = db_hits
+        node['rows'] = rows
+    return node
+
+
+def plan_operators(plan: Optional[Dict[str, Any]]) -> List[str]:
+    """Flatten an operator tree into a list of operator names (pre-order)."""
+    if not plan:
+        return []
+    operators = [plan['operator']]
+    for child in plan.get('children', []):
+        operators.extend(plan_operators(child))
+    return operators
+
+
+def sample_parameters(parameters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    JSON-safe copy of a query's parameters, stored with its plan for re-planning.
+
+    Long lists are cut to a few elements and values JSON cannot hold (e.g.
+    datetimes) are stored as strings; EXPLAIN only needs their shape.
+    """
+    def sample(value: Any) -> Any:
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, dict):
+            return {str(key): sample(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [sample(item) for item in value[:_SAMPLE_LIST_LIMIT]]
+        return str(value)
+
+    return {key: sample(value) for key, value in (parameters or {}).items()}
+
+
+def total_db_hits(plan: Optional[Dict[str, Any]]) -> int:
+    """Sum db hits over a normalized operator tree."""
+    if not plan:
+        return 0
+    return (plan.get('db_hits') or 0) + sum(total_db_hits(child) for child in plan.get('children', []))
+
+
+def compare_plans(
+    name: str,
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    db_hit_tolerance: float = 2.0
+) -> List[str]:
+    """
+    Compare a current plan against its baseline.
+
+    Args:
+        name: Query name
+        baseline: Baseline entry with 'plan' or, for expectations not yet
+            captured from a database, just 'operators' (and optionally 'db_hits')
+        current: Current entry with 'plan' (and optionally 'db_hits')
+        db_hit_tolerance: Allowed growth factor of profiled db hits
+
+    Returns:
+        List of regression messages; empty when the plan is acceptable
+    """
+    problems = []
+    baseline_ops = plan_operators(baseline['plan']) if baseline.get('plan') else baseline.get('operators', [])
+    current_ops = plan_operators(current.get('plan'))
+
+    lost_seeks = [op for op in SEEK_OPERATORS if baseline_ops.count(op) > current_ops.count(op)]
+    new_scans = [op for op in SCAN_OPERATORS if current_ops.count(op) > baseline_ops.count(op)]
+
+    if lost_seeks:
+        replaced_by = f" (now {', '.join(new_scans)})" if new_scans else ""
+        problems.append(f"{name}: lost index seek {', '.join(lost_seeks)}{replaced_by}")
+    elif new_scans:
+        problems.append(f"{name}: new scan operators {', '.join(new_scans)}")
+
+    baseline_hits = baseline.get('db_hits') or 0
+    current_hits = current.get('db_hits') or 0
+    if baseline_hits and current_hits > baseline_hits * db_hit_tolerance:
+        problems.append(f"{name}: db hits grew from {baseline_hits} to {current_hits}")
+
+    return problems
+
+
+class PlanCapture:
+    """
+    Profiles sampled executions of named queries and stores their plans.
+
+    Call prepare() to (maybe) prefix a query with PROFILE before running it;
+    the instrumentation listener records the resulting profile. Plan files
+    are written by a daemon thread, started on the first capture, so the
+    request thread never waits on I/O; a query profiled again before its file
+    was written is written once, with the latest plan.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, output_dir: Optional[str] = None):
+        self.sample_rate = sample_rate
+        self.output_dir = Path(output_dir) if output_dir else None
+        self._seen: set = set()
+        self._lock = threading.Lock()
+        self.plans: Dict[str, Dict[str, Any]] = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._queued: set = set()
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def prepare(self, name: str, query: str) -> str:
+        """
+        Return the query to execute, prefixed with PROFILE when sampled.
+
+        The first execution of every name is always sampled so each hot query
+        gets a plan soon after startup.
+        """
+        if not self.enabled or not _PROFILABLE.match(query):
+            return query
+        with self._lock:
+            first = name not in self._seen
+            self._seen.add(name)
+        if first or random.random() < self.sample_rate:
+            return "PROFILE " + query
+        return query
+
+    def __call__(self, observation: QueryObservation) -> None:
+        profile = getattr(observation.summary, 'profile', None)
+        if profile is None or observation.error is not None:
+            return
+        plan = normalize_plan(profile)
+        entry = {
+            'query': observation.query,
+            'parameters': sample_parameters(observation.parameters),
+            'plan': plan,
+            'operators': plan_operators(plan),
+            'db_hits': total_db_hits(plan),
+        }
+        with self._lock:
+            self.plans[observation.name] = entry
+            queue_write = self.output_dir is not None and observation.name not in self._queued
+            if queue_write:
+                self._queued.add(observation.name)
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="plan-writer", daemon=True)
+                    self._thread.start()
+        if queue_write:
+            self._queue.put(observation.name)
+
+    def stop(self) -> None:
+        """Write the queued plans and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while True:
+            name = self._queue.get()
+            if name is None:
+                break
+            with self._lock:
+                self._queued.discard(name)
+                entry = self.plans.get(name)
+            if entry is not None:
+                self._write(name, entry)
+
+    def _write(self, name: str, entry: Dict[str, Any]) -> None:
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.output_dir / f"{name}.json", 'w', encoding='utf-8') as f:
+                json.dump(entry, f, indent=2)
+            self.written += 1
+        except OSError as e:
+            logger.warning(f"Could not store query plan for {name}: {e}")
+
+
+def load_captured_plans(directory: str) -> Dict[str, Dict[str, Any]]:
+    """Load every captured <name>.json plan from a directory."""
+    plans = {}
+    for path in sorted(Path(directory).glob('*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            plans[path.stem] = json.load(f)
+    return plans
+
+
+def explain_plans(db_manager, baseline: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Re-plan every baseline query with EXPLAIN against the connected database.
+
+    Each query is bound to the parameter sample stored with it, so clauses
+    that need a value to plan (``LIMIT $limit``) work; EXPLAIN does not
+    execute the query.
+    """
+    current = {}
+    for name, entry in baseline.items():
+        query = entry['query']
+        parameters = entry.get('parameters')
+        if not isinstance(parameters, dict):
+            # Entries captured before samples were stored only list the names
+            parameters = {key: None for key in (parameters or _PARAMETER.findall(query))}
+        with db_manager.get_session() as session:
+            summary = session.run("EXPLAIN " + query, parameters).consume()
+        plan = normalize_plan(summary.plan)
+        current[name] = {'plan': plan, 'operators': plan_operators(plan)}
+    return current
+
+
+def check_plans(
+    baseline: Dict[str, Dict[str, Any]],
+    current: Dict[str, Dict[str, Any]],
+    db_hit_tolerance: float = 2.0
+) -> List[str]:
+    """Compare every baseline query with its current plan and collect regressions."""
+    problems = []
+    for name, entry in sorted(baseline.items()):
+        if name not in current:
+            problems.append(f"{name}: no current plan")
+            continue
+        problems.extend(compare_plans(name, entry, current[name], db_hit_tolerance))
+    return problems
+
+
+def _default_plan_capture() -> PlanCapture:
+    from config.settings import instrumentation_config
+    capture = PlanCapture(instrumentation_config.plan_sample_rate, instrumentation_config.plan_capture_dir)
+    if capture.enabled:
+        query_instrumentation.add_listener(capture)
+        atexit.register(capture.stop)
+    return capture
+
+
+# Process-wide plan capture used by BaseRepository and DatabaseManager.
+plan_capture = _default_plan_capture()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Capture and check Cypher query plans.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    baseline_parser = subparsers.add_parser('baseline', help="Write a baseline from captured plans")
+    baseline_parser.add_argument('--captured', default='query_plans/captured')
+    baseline_parser.add_argument('--output', default='query_plans/baseline.json')
+
+    check_parser = subparsers.add_parser('check', help="Compare current plans against the baseline")
+    check_parser.add_argument('--baseline', default='query_plans/baseline.json')
+    check_parser.add_argument('--captured', help="Compare captured plans instead of running EXPLAIN")
+    check_parser.add_argument('--db-hit-tolerance', type=float, default=2.0)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'baseline':
+        plans = load_captured_plans(args.captured)
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(plans, f, indent=2, sort_keys=True)
+        print(f"Wrote baseline for {len(plans)} queries to {args.output}")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    if args.captured:
+        current = load_captured_plans(args.captured)
+    else:
+        from core.sharding import build_database_manager
+
+        # Sharded deployments hold the same schema on every shard; plans come from the first
+        db_manager = build_database_manager()
+        try:
+            current = explain_plans(db_manager, baseline)
+        finally:
+            db_manager.close_connection()
+
+    problems = check_plans(baseline, current, args.db_hit_tolerance)
+    for problem in problems:
+        print(f"PLAN REGRESSION {problem}")
+    print(f"Checked {len(baseline)} queries, {len(problems)} regressions")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
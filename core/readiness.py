@@ -0,0 +1,129 @@
+#core/readiness.py
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessMonitor:
+    """
+    Cached database health and process readiness.
+
+    A daemon thread pings the database every ``interval`` seconds with a
+    trivial query on a pooled connection (DatabaseManager.ping) and caches
+    the outcome, so health endpoints and admission control read a flag
+    instead of opening a connection per poll. The database counts as down
+    after ``failure_threshold`` consecutive failed pings and as up again
+    after one success.
+
+    The process is ready once it is healthy and mark_warm() has been called
+    at the end of warm-up.
+    """
+
+    def __init__(self, db_manager, interval: float = 5.0, failure_threshold: int = 2):
+        self.db_manager = db_manager
+        self.interval = interval
+        self.failure_threshold = max(1, failure_threshold)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Unknown until the first ping; assume healthy so startup is not blocked on it
+        self._healthy = True
+        self._warm = False
+        self._consecutive_failures = 0
+        self._last_checked: Optional[float] = None
+        self._last_latency: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._warmup: Optional[Dict[str, Any]] = None
+        self.checks = 0
+        self.failed_checks = 0
+
+    @property
+    def healthy(self) -> bool:
+        """Database health as of the last ping."""
+        return self._healthy
+
+    @property
+    def ready(self) -> bool:
+        """Healthy and warmed up."""
+        return self._warm and self._healthy
+
+    def check(self) -> bool:
+        """
+        Ping the database now and update the cached state.
+
+        Returns:
+            The new health state
+        """
+        try:
+            latency = self.db_manager.ping()
+            error = None
+        except Exception as e:
+            latency = None
+            error = str(e)
+        with self._lock:
+            self.checks += 1
+            self._last_checked = time.monotonic()
+            if error is None:
+                if not self._healthy:
+                    logger.info("Database is reachable again")
+                self._healthy = True
+                self._consecutive_failures = 0
+                self._last_latency = latency
+                self._last_error = None
+            else:
+                self.failed_checks += 1
+                self._consecutive_failures += 1
+                self._last_error = error
+                if self._healthy and self._consecutive_failures >= self.failure_threshold:
+                    logger.warning(
+                        f"Database marked unhealthy after {self._consecutive_failures} failed pings: {error}"
+                    )
+                    self._healthy = False
+            return self._healthy
+
+    def mark_warm(self, report: Optional[Dict[str, Any]] = None) -> None:
+        """Record that warm-up finished; ``report`` is shown in stats()."""
+        with self._lock:
+            self._warm = True
+            self._warmup = report
+
+    def start(self) -> None:
+        """Take a first reading and start the background pinger."""
+        if self._thread is not None:
+            return
+        self.check()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="readiness-pinger", daemon=True)
+        self._thread.start()
+        logger.info(f"Readiness pinger started (every {self.interval}s)")
+
+    def stop(self) -> None:
+        """Stop the background pinger."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'healthy': self._healthy,
+                'ready': self._warm and self._healthy,
+                'warm': self._warm,
+                'checks': self.checks,
+                'failed_checks': self.failed_checks,
+                'consecutive_failures': self._consecutive_failures,
+                'last_check_age_seconds': (
+                    round(time.monotonic() - self._last_checked, 1) if self._last_checked is not None else None
+                ),
+                'last_latency_ms': round(self._last_latency * 1000, 2) if self._last_latency is not None else None,
+                'last_error': self._last_error,
+                'warmup': self._warmup,
+            }
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
@@ -0,0 +1,314 @@
+#core/schema.py
+"""
+Declarative schema management.
+
+Repositories declare the indexes they need and the access pattern of each
+hot query (equality lookups and ORDER BY properties) next to the queries
+themselves, along with retired indexes earlier versions created. The
+SchemaManager drops the retired indexes, creates the declared ones, waits for
+them to come ONLINE and audits that every hot query is index-backed:
+
+    python -m core.schema apply      # drop retired indexes, create constraints/indexes, migrate properties
+    python -m core.schema audit      # report un-backed queries and stale (undeclared) indexes
+"""
+import argparse
+import hashlib
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .exceptions import SchemaError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """A range index or uniqueness constraint on a node label."""
+    name: str
+    label: str
+    properties: Tuple[str, ...]
+    unique: bool = False
+
+    def create_statement(self) -> str:
+        variable = 'n'
+        columns = ", ".join(f"{variable}.{prop}" for prop in self.properties)
+        if self.unique:
+            key = columns if len(self.properties) == 1 else f"({columns})"
+            return (f"CREATE CONSTRAINT {self.name} IF NOT EXISTS FOR ({variable}:{self.label}) "
+                    f"REQUIRE {key} IS UNIQUE")
+        return f"CREATE INDEX {self.name} IF NOT EXISTS FOR ({variable}:{self.label}) ON ({columns})"
+
+
+@dataclass(frozen=True)
+class QueryAccess:
+    """The properties a named hot query filters on and orders by."""
+    query_name: str
+    label: str
+    lookup: Tuple[str, ...] = ()
+    order_by: Tuple[str, ...] = ()
+
+
+@dataclass
+class SchemaAuditReport:
+    """Result of comparing declarations (and optionally the live schema)."""
+    problems: List[str] = field(default_factory=list)
+    pending: List[str] = field(default_factory=list)
+    # Live indexes nothing declares: they cost writes and serve no declared query
+    stale: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+class SchemaRegistry:
+    """Process-wide collection of index declarations and hot-query access patterns."""
+
+    def __init__(self):
+        self.indexes: Dict[str, IndexSpec] = {}
+        self.queries: List[QueryAccess] = []
+        self.migrations: List[Tuple[str, str]] = []
+        self.retired: List[str] = []
+
+    def index(self, name: str, label: str, *properties: str, unique: bool = False) -> IndexSpec:
+        """Declare an index (or a uniqueness constraint when unique=True)."""
+        spec = IndexSpec(name, label, tuple(properties), unique)
+        self.indexes[name] = spec
+        return spec
+
+    def query(
+        self,
+        query_name: str,
+        label: str,
+        lookup: Tuple[str, ...] = (),
+        order_by: Tuple[str, ...] = ()
+    ) -> QueryAccess:
+        """Declare the lookup and ORDER BY properties a hot query uses on one label."""
+        access = QueryAccess(query_name, label, tuple(lookup), tuple(order_by))
+        if access not in self.queries:
+            self.queries.append(access)
+        return access
+
+    def retire(self, name: str) -> None:
+        """Declare an index (or constraint) earlier versions created and SchemaManager.apply() drops."""
+        if name not in self.retired:
+            self.retired.append(name)
+
+    def migration(self, name: str, statement: str) -> None:
+        """Declare an idempotent data migration run by SchemaManager.apply()."""
+        if all(existing != name for existing, _ in self.migrations):
+            self.migrations.append((name, statement))
+
+    def version(self) -> str:
+        """Fingerprint of the declared indexes and migrations; changes when the schema does."""
+        parts = sorted(spec.create_statement() for spec in self.indexes.values())
+        parts.extend(f"DROP {name}" for name in sorted(self.retired))
+        parts.extend(name for name, _ in self.migrations)
+        return hashlib.sha256("\n".join(parts).encode('utf-8')).hexdigest()[:16]
+
+    @staticmethod
+    def unbacked(access: QueryAccess, index_properties: List[Tuple[str, ...]]) -> List[str]:
+        """
+        List the parts of a query's access pattern no index can serve.
+
+        A lookup property is backed by any index leading with it; an ORDER BY is
+        backed by an index whose leading properties equal the ORDER BY columns.
+        """
+        problems = []
+        for prop in access.lookup:
+            if not any(props[:1] == (prop,) for props in index_properties):
+                problems.append(f"{access.query_name}: lookup on :{access.label}({prop}) is not index-backed")
+        if access.order_by and not any(
+            props[:len(access.order_by)] == access.order_by for props in index_properties
+        ):
+            columns = ", ".join(access.order_by)
+            problems.append(f"{access.query_name}: ORDER BY :{access.label}({columns}) is not index-backed")
+        return problems
+
+    def audit_declarations(self) -> SchemaAuditReport:
+        """Check every declared hot query against the declared indexes (no database needed)."""
+        report = SchemaAuditReport()
+        for access in self.queries:
+            declared = [spec.properties for spec in self.indexes.values() if spec.label == access.label]
+            report.problems.extend(self.unbacked(access, declared))
+        return report
+
+
+# Declarations are registered by the repository modules at import time.
+schema_registry = SchemaRegistry()
+
+
+class SchemaManager:
+    """Applies, waits for and audits the declared schema on a live database."""
+
+    def __init__(self, db_manager, registry: SchemaRegistry = schema_registry):
+        self.db_manager = db_manager
+        self.registry = registry
+
+    def apply(self) -> None:
+        """Drop retired indexes, create all declared constraints and indexes, then run migrations."""
+        # First, since a retired index on the same property blocks creating its constraint
+        live = {index['name']: index for index in self.live_indexes()}
+        for name in self.registry.retired:
+            index = live.get(name)
+            if index is None:
+                continue
+            kind = 'CONSTRAINT' if index.get('owningConstraint') else 'INDEX'
+            try:
+                self.db_manager.execute_write_query(f"DROP {kind} {name} IF EXISTS", query_name='schema.drop')
+                logger.info(f"Dropped retired {kind.lower()} {name}")
+            except Exception as e:
+                logger.warning(f"Could not drop {name}: {e}")
+
+        for spec in self.registry.indexes.values():
+            try:
+                self.db_manager.execute_write_query(spec.create_statement(), query_name='schema.create')
+                logger.info(f"Ensured {'constraint' if spec.unique else 'index'} {spec.name}")
+            except Exception as e:
+                logger.warning(f"Could not create {spec.name}: {e}")
+
+        for name, statement in self.registry.migrations:
+            summary = self.db_manager.execute_write_query(statement, query_name=f"schema.migrate.{name}")
+            properties_set = getattr(getattr(summary, 'counters', None), 'properties_set', 0)
+            if properties_set:
+                logger.info(f"Migration {name} set {properties_set} properties")
+
+    def live_indexes(self) -> List[Dict[str, Any]]:
+        """Return the database's indexes as dictionaries."""
+        records = self.db_manager.execute_read_query(
+            "SHOW INDEXES YIELD name, type, entityType, labelsOrTypes, properties, state, owningConstraint",
+            query_name='schema.show_indexes'
+        )
+        return [dict(record) for record in records]
+
+    def wait_until_online(self, timeout: float = 300.0, poll_interval: float = 0.5) -> None:
+        """
+        Block until every declared index is ONLINE.
+
+        Raises:
+            SchemaError: If an index FAILED or the timeout elapsed
+        """
+        deadline = time.monotonic() + timeout
+        declared = set(self.registry.indexes)
+        while True:
+            states = {index['name']: index['state'] for index in self.live_indexes()}
+            failed = sorted(name for name in declared if states.get(name) == 'FAILED')
+            if failed:
+                raise SchemaError(f"Index population failed: {failed}")
+            pending = sorted(name for name in declared if states.get(name) != 'ONLINE')
+            if not pending:
+                logger.info(f"All {len(declared)} declared indexes are ONLINE")
+                return
+            if time.monotonic() >= deadline:
+                raise SchemaError(f"Indexes not ONLINE after {timeout}s: {pending}")
+            logger.info(f"Waiting for indexes to come ONLINE: {pending}")
+            time.sleep(poll_interval)
+
+    def audit(self) -> SchemaAuditReport:
+        """Compare declared indexes and hot-query access patterns with the live schema."""
+        report = self.registry.audit_declarations()
+        live = {index['name']: index for index in self.live_indexes()}
+
+        for spec in self.registry.indexes.values():
+            index = live.get(spec.name)
+            if index is None:
+                report.problems.append(f"index {spec.name} on :{spec.label}{spec.properties} does not exist")
+                continue
+            if tuple(index.get('properties') or ()) != spec.properties:
+                report.problems.append(
+                    f"index {spec.name} is on {tuple(index['properties'])} but declared on {spec.properties}"
+                )
+            if index.get('state') != 'ONLINE':
+                report.pending.append(f"index {spec.name} is {index.get('state')}")
+
+        for access in self.registry.queries:
+            online = [
+                tuple(index.get('properties') or ())
+                for index in live.values()
+                if index.get('state') == 'ONLINE' and access.label in (index.get('labelsOrTypes') or ())
+            ]
+            report.problems.extend(self.registry.unbacked(access, online))
+
+        for name, index in sorted(live.items()):
+            # LOOKUP indexes are the built-in label/type token indexes
+            if name in self.registry.indexes or index.get('type') == 'LOOKUP':
+                continue
+            labels = ":".join(index.get('labelsOrTypes') or ())
+            properties = tuple(index.get('properties') or ())
+            retired = " (retired; `apply` drops it)" if name in self.registry.retired else ""
+            report.stale.append(f"index {name} on :{labels}{properties} is not declared{retired}")
+        return report
+
+    def ensure_ready(self, timeout: float = 300.0, strict: bool = True) -> SchemaAuditReport:
+        """
+        Wait for the declared indexes and verify hot queries are index-backed.
+
+        Args:
+            timeout: Seconds to wait for index population
+            strict: Raise instead of logging when the audit finds problems
+
+        Raises:
+            SchemaError: In strict mode, if any hot query is not index-backed
+        """
+        self.wait_until_online(timeout)
+        report = self.audit()
+        for item in report.stale:
+            logger.warning(f"Schema audit: {item}")
+        for problem in report.problems:
+            logger.error(f"Schema audit: {problem}")
+        if strict and not report.ok:
+            raise SchemaError(f"Schema audit failed with {len(report.problems)} problem(s)")
+        return report
+
+
+def load_declarations() -> SchemaRegistry:
+    """Import the repository modules so their declarations are registered."""
+    import repositories.catalogue_repository  # noqa: F401
+    import repositories.question_repository  # noqa: F401
+    import repositories.student_repository  # noqa: F401
+    import repositories.setup_repository  # noqa: F401
+    import repositories.review_repository  # noqa: F401
+    return schema_registry
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Apply and audit the declared graph schema.")
+    parser.add_argument('command', choices=('apply', 'wait', 'audit', 'declarations'))
+    parser.add_argument('--timeout', type=float, default=300.0)
+    args = parser.parse_args(argv)
+
+    registry = load_declarations()
+    if args.command == 'declarations':
+        report = registry.audit_declarations()
+    else:
+        from config.settings import db_config
+        from core.database import DatabaseManager
+
+        db_manager = DatabaseManager()
+        db_manager.initialize_connection(db_config.uri, db_config.username, db_config.password)
+        try:
+            manager = SchemaManager(db_manager, registry)
+            if args.command == 'apply':
+                manager.apply()
+                manager.wait_until_online(args.timeout)
+            elif args.command == 'wait':
+                manager.wait_until_online(args.timeout)
+            report = manager.audit()
+        finally:
+            db_manager.close_connection()
+
+    for item in report.pending:
+        print(f"PENDING {item}")
+    for item in report.stale:
+        print(f"STALE {item}")
+    for problem in report.problems:
+        print(f"PROBLEM {problem}")
+    print("Schema OK" if report.ok else f"{len(report.problems)} schema problem(s)")
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
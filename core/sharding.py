@@ -0,0 +1,240 @@
+#core/sharding.py
+"""
+Student sharding.
+
+Students are hash-partitioned across several databases: a student and all
+of their progress, reviews and counters live on shard
+``crc32(student_id) % shards``. The question catalogue is replicated to
+every shard, so each student-scoped query (which joins progress with the
+catalogue) runs on a single shard.
+
+ShardedDatabaseManager is a DatabaseManager over one manager per shard.
+Which shard a call goes to is held in a ContextVar set by route():
+
+* repositories mark their methods (see repositories/base_repository.py) as
+  routed by student, partitioned by student, fanned out across all shards,
+  or replicated to all shards, and BaseRepository applies the routing;
+* manager-level calls made inside route() go to that shard; unrouted reads
+  go to shard 0 (catalogue data is the same everywhere) and unrouted writes
+  (execute_transaction, execute_write_query: schema and catalogue loads)
+  are replicated to every shard.
+
+Fan-outs run in parallel on a small pool; a fan-out started on a pool
+thread (i.e. already inside a shard call) runs in the calling thread.
+The shard count is part of the data layout: changing it means moving
+students, so it is fixed for the lifetime of a deployment.
+"""
+import contextvars
+import logging
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, TypeVar
+
+from .database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Index of the shard the current call is routed to; None when unrouted
+_current_shard: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar('fastwise_shard', default=None)
+
+
+def shard_index(shard_key: str, shard_count: int) -> int:
+    """The shard owning ``shard_key`` (stable across processes, unlike hash())."""
+    return zlib.crc32(shard_key.encode('utf-8')) % shard_count
+
+
+class ShardedDatabaseManager(DatabaseManager):
+    """
+    DatabaseManager routing each call to one of several shard managers.
+
+    Unlike DatabaseManager it is not a singleton. The shard managers are
+    connected by the caller (see build_database_manager).
+    """
+
+    def __new__(cls, shards: Sequence[DatabaseManager], fan_out_workers: int = 0) -> 'ShardedDatabaseManager':
+        return object.__new__(cls)
+
+    def __init__(self, shards: Sequence[DatabaseManager], fan_out_workers: int = 0):
+        if not shards:
+            raise ValueError("A sharded database needs at least one shard")
+        self.shards: List[DatabaseManager] = list(shards)
+        self.shard_count = len(self.shards)
+        self._pool = ThreadPoolExecutor(
+            max_workers=fan_out_workers or 4 * self.shard_count, thread_name_prefix="shard-fan-out"
+        )
+        # Unlocked counters: cheap, may miss an increment under contention
+        self.routed_calls = [0] * self.shard_count
+        self.fan_outs = 0
+
+    @property
+    def routed(self) -> bool:
+        """Whether the current call is routed to a shard."""
+        return _current_shard.get() is not None
+
+    @property
+    def current(self) -> DatabaseManager:
+        """The shard of the current call; shard 0 when unrouted."""
+        index = _current_shard.get()
+        return self.shards[index if index is not None else 0]
+
+    @property
+    def graph(self):
+        # In-memory shards: repositories reach the data through db_manager.graph
+        return self.current.graph
+
+    def shard_for(self, shard_key: str) -> int:
+        return shard_index(shard_key, self.shard_count)
+
+    @contextmanager
+    def route(self, shard_key: str):
+        """Route the calls made inside the block to the shard owning ``shard_key``."""
+        with self.route_to(self.shard_for(shard_key)):
+            yield
+
+    @contextmanager
+    def route_to(self, index: int):
+        """Route the calls made inside the block to shard ``index``."""
+        self.routed_calls[index] += 1
+        token = _current_shard.set(index)
+        try:
+            yield
+        finally:
+            _current_shard.reset(token)
+
+    def map_shards(self, function: Callable[[int], T], shards: Optional[Iterable[int]] = None) -> List[T]:
+        """
+        Call ``function(index)`` routed to each shard, in parallel.
+
+        Args:
+            function: Called once per shard with the shard index
+            shards: Shard indexes to call (default all)
+
+        Returns:
+            The results in the order of ``shards``
+
+        Raises:
+            Exception: The first failure, after every call has finished
+        """
+        indexes = list(range(self.shard_count)) if shards is None else list(shards)
+        self.fan_outs += 1
+        if self.routed or len(indexes) == 1:
+            # Already on a pool thread (or nothing to parallelize): waiting on
+            # the pool from inside it could exhaust it
+            return [self._on_shard(index, function) for index in indexes]
+        futures = [
+            self._pool.submit(contextvars.copy_context().run, self._on_shard, index, function)
+            for index in indexes
+        ]
+        errors = [future.exception() for future in futures]
+        for error in errors:
+            if error is not None:
+                raise error
+        return [future.result() for future in futures]
+
+    def fan_out(self, function: Callable[..., T], *args, **kwargs) -> List[T]:
+        """Call ``function(*args, **kwargs)`` on every shard; one result per shard."""
+        return self.map_shards(lambda index: function(*args, **kwargs))
+
+    def broadcast(self, function: Callable[..., T], *args, **kwargs) -> T:
+        """Call ``function`` on every shard (replicated writes); returns shard 0's result."""
+        return self.fan_out(function, *args, **kwargs)[0]
+
+    def _on_shard(self, index: int, function: Callable[[int], T]) -> T:
+        with self.route_to(index):
+            return function(index)
+
+    def initialize_connection(self, uri: str = "", username: str = "", password: str = "") -> None:
+        """Shards are connected when they are built (see build_database_manager)."""
+
+    def get_driver(self):
+        return self.current.get_driver()
+
+    def get_session(self):
+        return self.current.get_session()
+
+    def close_connection(self) -> None:
+        for shard in self.shards:
+            shard.close_connection()
+        self._pool.shutdown(wait=False)
+
+    def execute_transaction(self, transaction_function: Callable, *args, **kwargs) -> Any:
+        if self.routed:
+            return self.current.execute_transaction(transaction_function, *args, **kwargs)
+        return self.broadcast(lambda: self.current.execute_transaction(transaction_function, *args, **kwargs))
+
+    def execute_read_transaction(self, transaction_function: Callable, *args, **kwargs) -> Any:
+        return self.current.execute_read_transaction(transaction_function, *args, **kwargs)
+
+    def execute_write_query(self, query: str, parameters: dict = None, query_name: Optional[str] = None) -> Any:
+        if self.routed:
+            return self.current.execute_write_query(query, parameters, query_name)
+        return self.broadcast(lambda: self.current.execute_write_query(query, parameters, query_name))
+
+    def execute_read_query(self, query: str, parameters: dict = None, query_name: Optional[str] = None) -> list:
+        return self.current.execute_read_query(query, parameters, query_name)
+
+    def ping(self) -> float:
+        """Ping every shard; returns the slowest round trip."""
+        return max(self.fan_out(lambda: self.current.ping()))
+
+    def warm_pool(self, connections: int, timeout: float = 30.0) -> int:
+        """Open ``connections`` pool connections to every shard."""
+        return sum(self.fan_out(lambda: self.current.warm_pool(connections, timeout)))
+
+    def health_check(self) -> bool:
+        """Healthy only if every shard is."""
+        if self._health_monitor is not None:
+            return self._health_monitor.healthy
+        return all(shard.health_check() for shard in self.shards)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'shards': self.shard_count,
+            'routed_calls': list(self.routed_calls),
+            'fan_outs': self.fan_outs,
+        }
+
+
+def _split(value: str) -> List[str]:
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+def build_database_manager() -> DatabaseManager:
+    """
+    Connect to Neo4j as configured: the process-wide DatabaseManager, or a
+    ShardedDatabaseManager when SHARD_URIS / SHARD_DATABASES name more than
+    one shard.
+
+    Shard ``i`` uses the i-th URI (default NEO4J_URI) and the i-th database
+    (default: the server's default database); credentials are shared.
+
+    Raises:
+        DatabaseConnectionError: If a shard cannot be reached
+    """
+    from config.settings import db_config
+
+    uris, databases = _split(db_config.shard_uris), _split(db_config.shard_databases)
+    shard_count = max(len(uris), len(databases))
+    if shard_count <= 1:
+        db_manager = DatabaseManager()
+        if databases:
+            db_manager.database = databases[0]
+        db_manager.initialize_connection(uris[0] if uris else db_config.uri, db_config.username, db_config.password)
+        return db_manager
+
+    shards = []
+    try:
+        for i in range(shard_count):
+            shard = DatabaseManager.standalone(databases[i] if i < len(databases) else None)
+            shard.initialize_connection(uris[i] if i < len(uris) else db_config.uri,
+                                        db_config.username, db_config.password)
+            shards.append(shard)
+    except Exception:
+        for shard in shards:
+            shard.close_connection()
+        raise
+    logger.info(f"Students are sharded across {shard_count} databases")
+    return ShardedDatabaseManager(shards, db_config.shard_fan_out_workers)
@@ -0,0 +1,294 @@
+#core/tracing.py
+"""
+Span-based request tracing.
+
+A span times one step of a request; spans opened while another is active
+become its children (propagated through a ContextVar), so one recommendation
+yields a tree such as:
+
+    recommendation
+      student.lookup
+        query student.find_by_id   (driver.run, decode)
+      recommendation.compute
+        query question.find_unmastered_for_student
+        ranking.features
+        recommendation.rank
+
+Finished traces are written as JSON lines by a TraceExporter. Whether a
+trace is kept is decided per trace: a ``sample_rate`` fraction is kept at
+random, and with ``slow_ms`` every trace whose root took at least that long
+is kept as well (so all traces are recorded, and fast unsampled ones are
+discarded at the end). With tracing off, span() returns a shared no-op.
+"""
+import itertools
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _NoopSpan:
+    """Stands in for a span when the trace is not recorded."""
+
+    __slots__ = ()
+    recording = False
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# The innermost open span of the current thread/task; NOOP_SPAN inside an unrecorded trace
+_current_span: ContextVar[Optional[Any]] = ContextVar('fastwise_current_span', default=None)
+
+
+class _Trace:
+    __slots__ = ('trace_id', 'spans', 'sampled', 'span_ids', 'start_ns')
+
+    def __init__(self, sampled: bool):
+        self.trace_id = f"{random.getrandbits(64):016x}"
+        self.spans: List['Span'] = []
+        self.sampled = sampled
+        self.span_ids = itertools.count(1)
+        self.start_ns = time.perf_counter_ns()
+
+
+class Span:
+    """One timed step; use as a context manager, add attributes with set()."""
+
+    __slots__ = ('tracer', 'trace', 'span_id', 'parent_id', 'name', 'attributes',
+                 'start_ns', 'duration_ns', 'error', '_token')
+    recording = True
+
+    def __init__(
+        self,
+        tracer: 'Tracer',
+        trace: _Trace,
+        parent: Optional['Span'],
+        name: str,
+        attributes: Dict[str, Any]
+    ):
+        self.tracer = tracer
+        self.trace = trace
+        self.span_id = next(trace.span_ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = 0
+        self.duration_ns = 0
+        self.error: Optional[str] = None
+        self._token = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> 'Span':
+        self._token = _current_span.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.duration_ns = time.perf_counter_ns() - self.start_ns
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self.trace.spans.append(self)
+        if self.parent_id is None:
+            self.tracer._finish(self)
+        return False
+
+    def to_dict(self, trace_start_ns: int) -> Dict[str, Any]:
+        span = {
+            'id': self.span_id,
+            'parent': self.parent_id,
+            'name': self.name,
+            'start_ms': round((self.start_ns - trace_start_ns) / 1e6, 3),
+            'duration_ms': round(self.duration_ns / 1e6, 3),
+        }
+        if self.attributes:
+            span['attributes'] = self.attributes
+        if self.error is not None:
+            span['error'] = self.error
+        return span
+
+
+class _UnrecordedRoot:
+    """Marks the extent of an unsampled trace so nested span() calls stay no-ops."""
+
+    __slots__ = ('_token',)
+
+    def __enter__(self) -> _NoopSpan:
+        self._token = _current_span.set(NOOP_SPAN)
+        return NOOP_SPAN
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current_span.reset(self._token)
+        return False
+
+
+class TraceExporter:
+    """
+    Writes finished traces as JSON lines to a file or stdout ('-').
+
+    Traces are queued and written by a daemon thread, so the request thread
+    never waits on I/O; a full queue drops the trace and counts it.
+    """
+
+    def __init__(self, destination: str = '-', max_queue: int = 10_000):
+        self.destination = destination
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self.exported = 0
+        self.dropped = 0
+
+    def export(self, trace: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Write the queued traces and stop the writer thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        stream = sys.stdout if self.destination == '-' else open(self.destination, 'a', encoding='utf-8')
+        try:
+            while True:
+                trace = self._queue.get()
+                if trace is None:
+                    break
+                lines = [trace]
+                # Write whatever else is already queued in the same flush
+                while True:
+                    try:
+                        lines.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                done = lines[-1] is None
+                lines = [line for line in lines if line is not None]
+                stream.write(''.join(json.dumps(line, default=str) + '\n' for line in lines))
+                stream.flush()
+                self.exported += len(lines)
+                if done:
+                    break
+        except Exception as e:
+            logger.error(f"Trace exporter stopped: {e}")
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+
+
+class Tracer:
+    """Creates spans and hands finished traces to the exporter."""
+
+    def __init__(self):
+        self.exporter: Optional[TraceExporter] = None
+        self.sample_rate = 0.0
+        self.slow_ns = 0
+        self.traces = 0
+        self.kept = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, exporter: Optional[TraceExporter], sample_rate: float = 0.0, slow_ms: float = 0.0) -> None:
+        """
+        Enable tracing with ``exporter`` (None disables it).
+
+        Args:
+            exporter: Destination of kept traces
+            sample_rate: Fraction of traces kept regardless of duration
+            slow_ms: Also keep every trace whose root span took at least this long (0 = off)
+        """
+        self.sample_rate = sample_rate
+        self.slow_ns = int(slow_ms * 1e6)
+        self.exporter = exporter
+
+    def span(self, name: str, **attributes: Any):
+        """
+        Open a span, a child of the current one or the root of a new trace.
+
+        Returns:
+            Context manager yielding the span (or a no-op stand-in)
+        """
+        if self.exporter is None:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if parent is NOOP_SPAN:
+            return NOOP_SPAN
+        if parent is None:
+            self.traces += 1
+            sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+            if not sampled and not self.slow_ns:
+                return _UnrecordedRoot()
+            return Span(self, _Trace(sampled), None, name, attributes)
+        return Span(self, parent.trace, parent, name, attributes)
+
+    def current_span(self):
+        """The innermost open span, or the no-op stand-in."""
+        span = _current_span.get()
+        return span if span is not None else NOOP_SPAN
+
+    def _finish(self, root: Span) -> None:
+        trace = root.trace
+        slow = bool(self.slow_ns) and root.duration_ns >= self.slow_ns
+        if not (trace.sampled or slow) or self.exporter is None:
+            return
+        self.kept += 1
+        self.exporter.export({
+            'trace_id': trace.trace_id,
+            'root': root.name,
+            'duration_ms': round(root.duration_ns / 1e6, 3),
+            'kept': 'sampled' if trace.sampled else 'slow',
+            'spans': [span.to_dict(trace.start_ns) for span in sorted(trace.spans, key=lambda s: s.start_ns)],
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'traces': self.traces,
+            'kept': self.kept,
+            'exported': self.exporter.exported if self.exporter is not None else 0,
+            'dropped': self.exporter.dropped if self.exporter is not None else 0,
+        }
+
+
+def configure_from_settings() -> Optional[TraceExporter]:
+    """Enable tracing from the TRACE_* settings; returns the started exporter, if any."""
+    from config.settings import instrumentation_config
+
+    if not instrumentation_config.trace_export:
+        tracer.configure(None)
+        return None
+    exporter = TraceExporter(instrumentation_config.trace_export)
+    exporter.start()
+    tracer.configure(exporter, instrumentation_config.trace_sample_rate, instrumentation_config.trace_slow_ms)
+    return exporter
+
+
+# Process-wide tracer
+tracer = Tracer()
@@ -1,51 +1,86 @@
 # main.py
 import logging
-from core.database import DatabaseManager
+import time
+from core.sharding import build_database_manager
 from repositories.setup_repository import SetupRepository
 from repositories.student_repository import StudentRepository
 from repositories.question_repository import QuestionRepository
 from services.data_population_service import DataPopulationService
 from services.recommendation_service import RecommendationService
 from models.student import Student
-from core.exceptions import StudentNotFoundError, DataValidationError, DatabaseConnectionError
-from config.settings import db_config, app_config
-import sys
+from core.exceptions import StudentNotFoundError, DataValidationError, DatabaseConnectionError, SchemaError
+from config.settings import app_config, instrumentation_config
+from core.instrumentation import query_instrumentation, MetricsServer
+from core.logging_setup import configure_from_settings
+from core.profiling import configure_from_settings as configure_profiling, profiler
+from core.schema import SchemaManager, load_declarations
 from pathlib import Path
 import json
 
 # Configure logging
-logging.basicConfig(level=app_config.log_level, stream=sys.stdout,
-                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+configure_from_settings()
 logger = logging.getLogger(__name__)
 
+# Reference point for cold-start timing.
+_PROCESS_START = time.perf_counter()
+
 def main():
+    metrics_server = None
+    if instrumentation_config.metrics_port:
+        metrics_server = MetricsServer(query_instrumentation, port=instrumentation_config.metrics_port)
+        metrics_server.start()
+    configure_profiling()
+
+    db_manager = None
     try:
-        # Initialize database manager
-        db_manager = DatabaseManager()
-        db_manager.initialize_connection(
-            uri=db_config.uri, username=db_config.username, password=db_config.password
-        )
+        # Initialize database manager (sharded when SHARD_URIS / SHARD_DATABASES name several shards)
+        db_manager = build_database_manager()
+
+        connected_at = time.perf_counter()
 
         # Setup repositories
         setup_repo = SetupRepository(db_manager)
         student_repo = StudentRepository(db_manager)
 
-        # Create necessary constraints and indexes
-        setup_repo.create_constraints_and_indexes()
+        # Schema creation is an admin step (python admin.py schema); here we only
+        # wait until the declared indexes are ONLINE and index-backed, on every shard.
+        db_manager.fan_out(lambda: SchemaManager(db_manager, load_declarations()).ensure_ready(
+            timeout=app_config.index_wait_timeout, strict=app_config.schema_strict
+        ))
+        schema_ready_at = time.perf_counter()
 
-        # Populate initial data
+        # Ingest is an admin step too (python admin.py ingest); startup only checks the stamp
         data_population_service = DataPopulationService(db_manager, setup_repo)
-        data_population_service.populate_from_json_file(file_path=app_config.data_file_path)
+        try:
+            catalogue = data_population_service.get_catalogue_status(app_config.data_file_path)
+            if not catalogue['current']:
+                logger.warning(f"Question catalogue is out of date ({catalogue['reason']}); "
+                               f"run `python admin.py ingest` to load {app_config.data_file_path}")
+        except FileNotFoundError:
+            logger.warning(f"Data file not found: {app_config.data_file_path}; catalogue version not checked")
+        catalogue_checked_at = time.perf_counter()
+
+        logger.info(
+            f"Cold start completed in {(catalogue_checked_at - _PROCESS_START) * 1000:.1f} ms "
+            f"(connect {(connected_at - _PROCESS_START) * 1000:.1f} ms, "
+            f"schema {(schema_ready_at - connected_at) * 1000:.1f} ms, "
+            f"catalogue check {(catalogue_checked_at - schema_ready_at) * 1000:.1f} ms)"
+        )
 
-        
         student_id = "ashish_b"
         student = Student(student_id=student_id, name="Ashish Bhardwaj", email="ashish.bhardwaj@fastwise.com")
         student_repo.create_or_update_student(student)
 
-    except (StudentNotFoundError, DataValidationError, DatabaseConnectionError) as e:
+    except (StudentNotFoundError, DataValidationError, DatabaseConnectionError, SchemaError) as e:
         logger.error(f"Error occurred: {e}")
     finally:
-        db_manager.close_connection()
+        profiler.stop()
+        if db_manager is not None:
+            db_manager.close_connection()
+        if instrumentation_config.metrics_dump_file:
+            query_instrumentation.dump(instrumentation_config.metrics_dump_file)
+        if metrics_server is not None:
+            metrics_server.stop()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,13 @@
+#models/attempt.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+@dataclass
+class Attempt:
+    """One recorded attempt of a question by a student."""
+    student_id: str
+    question_id: str
+    timestamp: datetime
+    mastered: bool
+    duration_seconds: Optional[float] = None
@@ -2,12 +2,12 @@
 from dataclasses import dataclass
 from typing import List, Optional
 
-@dataclass
+@dataclass(slots=True)
 class SolutionApproach:
     name: str
     explanation: str
 
-@dataclass
+@dataclass(slots=True)
 class Question:
     id: str
     title: str
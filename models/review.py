@@ -0,0 +1,15 @@
+#models/review.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+@dataclass
+class Review:
+    """Spaced-repetition state of one mastered question for one student."""
+    student_id: str
+    question_id: str
+    due_at: datetime
+    interval_days: float = 1.0
+    repetitions: int = 0
+    easiness: float = 2.5
+    last_reviewed_at: Optional[datetime] = None
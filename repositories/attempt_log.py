@@ -0,0 +1,495 @@
+# repositories/attempt_log.py
+"""
+Append-only attempt history kept in files beside the graph.
+
+The graph keeps one ATTEMPTED edge per (student, question) for traversal;
+every individual attempt goes here instead, as a packed record
+(question ordinal, timestamp, outcome, duration), so history costs ~17
+bytes per attempt rather than a relationship.
+
+Layout of the log directory:
+
+    questions.txt            question id dictionary; line n is ordinal n
+    segments/*.active        per-process append-only segment being written
+    segments/*.log           sealed segments, waiting for compaction
+    attempts.col             compacted store: per student, four columns
+                             (ordinals, timestamps, durations, outcomes)
+                             sorted by time, plus a JSON footer index
+
+Reads merge the student's compacted block with the uncompacted tail of
+every segment. compact() folds the tail into a new attempts.col and
+deletes sealed segments; it is safe to run from any process (a file lock
+keeps it single) and from a background thread.
+"""
+import bisect
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import uuid
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from models.attempt import Attempt
+
+logger = logging.getLogger(__name__)
+
+# timestamp_ms, question ordinal, duration_ms (0 = unknown), outcome, student id length
+_RECORD = struct.Struct('<qIIBH')
+_MAGIC = b'ATTLOG1\n'
+_TRAILER = struct.Struct('<Q8s')
+_COLUMNS = (('ordinals', 'I'), ('timestamps', 'q'), ('durations', 'I'), ('outcomes', 'B'))
+
+ATTEMPTED = 0
+MASTERED = 1
+
+_Block = Tuple[array, array, array, array]
+
+
+class AttemptLog:
+    """Per-student attempt history in a compact columnar store."""
+
+    def __init__(self, directory: str, segment_max_bytes: int = 4 << 20, compact_interval: float = 300.0):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.compact_interval = compact_interval
+        self._segments_dir = os.path.join(directory, 'segments')
+        os.makedirs(self._segments_dir, exist_ok=True)
+        self._lock = threading.RLock()
+        # Writer state (this process's active segment)
+        self._fd: Optional[int] = None
+        self._fd_pid = 0
+        self._segment_path: Optional[str] = None
+        self._segment_size = 0
+        # Question dictionary
+        self._question_ids: List[str] = []
+        self._ordinals: Dict[str, int] = {}
+        self._dictionary_size = 0
+        # Compacted store and tail index
+        self._store_key: Optional[Tuple[int, int]] = None
+        self._store: Optional[mmap.mmap] = None
+        self._index: Dict[str, List[int]] = {}
+        self._consumed: Dict[str, int] = {}
+        self._tail: Dict[str, List[Tuple[int, int, int, int]]] = {}
+        self._tail_offsets: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.appended = 0
+        self.compactions = 0
+
+    def append(
+        self,
+        student_id: str,
+        question_id: str,
+        mastered: bool,
+        duration_seconds: Optional[float] = None,
+        timestamp: Optional[datetime] = None
+    ) -> None:
+        """
+        Record one attempt.
+
+        Args:
+            student_id: ID of the student
+            question_id: ID of the question
+            mastered: Outcome of the attempt
+            duration_seconds: Time spent on the attempt, if known
+            timestamp: When the attempt happened (default: now)
+        """
+        if '\n' in question_id:
+            raise ValueError("question ids in the attempt log cannot contain newlines")
+        when = timestamp or datetime.now(timezone.utc)
+        duration_ms = min(int(round(duration_seconds * 1000)), 0xFFFFFFFF) if duration_seconds else 0
+        student = student_id.encode('utf-8')
+        with self._lock:
+            record = _RECORD.pack(
+                int(when.timestamp() * 1000), self._ordinal(question_id), duration_ms,
+                MASTERED if mastered else ATTEMPTED, len(student)
+            ) + student
+            fd = self._writer()
+            # One write() per record on an O_APPEND fd, so a crash leaves at most a torn tail
+            os.write(fd, record)
+            self._segment_size += len(record)
+            self.appended += 1
+            if self._segment_size >= self.segment_max_bytes:
+                self._seal()
+
+    def history(
+        self,
+        student_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        question_id: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Attempt]:
+        """
+        A student's attempts, oldest first.
+
+        Args:
+            student_id: ID of the student
+            since: Only attempts at or after this time
+            until: Only attempts before this time
+            question_id: Only attempts of this question
+            limit: Only the most recent ``limit`` matching attempts
+
+        Returns:
+            List of attempts in chronological order
+        """
+        low = int(since.timestamp() * 1000) if since else -(1 << 63)
+        high = int(until.timestamp() * 1000) if until else (1 << 63) - 1
+        with self._lock:
+            self._refresh()
+            ordinal = None
+            if question_id is not None:
+                ordinal = self._ordinals.get(question_id)
+                if ordinal is None:
+                    return []
+            rows = []
+            block = self._read_block(student_id)
+            if block is not None:
+                ordinals, timestamps, durations, outcomes = block
+                # Blocks are sorted by time, so the range is two bisections
+                for i in range(bisect.bisect_left(timestamps, low), bisect.bisect_left(timestamps, high)):
+                    if ordinal is None or ordinals[i] == ordinal:
+                        rows.append((timestamps[i], ordinals[i], durations[i], outcomes[i]))
+            rows.extend(
+                row for row in self._tail.get(student_id, ())
+                if low <= row[0] < high and (ordinal is None or row[1] == ordinal)
+            )
+            rows.sort(key=lambda row: row[0])
+            if limit is not None:
+                rows = rows[-limit:] if limit > 0 else []
+            question_ids = self._question_ids
+            return [
+                Attempt(
+                    student_id=student_id,
+                    question_id=question_ids[row[1]],
+                    timestamp=datetime.fromtimestamp(row[0] / 1000, timezone.utc),
+                    mastered=row[3] == MASTERED,
+                    duration_seconds=row[2] / 1000 if row[2] else None,
+                )
+                for row in rows
+            ]
+
+    def compact(self) -> Dict[str, Any]:
+        """
+        Fold every uncompacted record into a new attempts.col.
+
+        Returns:
+            Report with students, compacted records and removed segments, or
+            {'skipped': True} when another process is compacting
+        """
+        with self._compaction_lock() as acquired:
+            if not acquired:
+                return {'skipped': True}
+            start = time.perf_counter()
+            with self._lock:
+                self._seal()
+                self._refresh()
+                segments = self._list_segments()
+                tail = {student: list(rows) for student, rows in self._tail.items()}
+                consumed = dict(self._consumed)
+                consumed.update(self._tail_offsets)
+                index = dict(self._index)
+                store = self._store
+
+            path = os.path.join(self.directory, 'attempts.col')
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            new_index: Dict[str, List[int]] = {}
+            records = 0
+            with open(tmp_path, 'wb') as out:
+                out.write(_MAGIC)
+                for student_id in sorted(set(index) | set(tail)):
+                    block = self._decode_block(store, index[student_id]) if student_id in index else None
+                    rows = tail.get(student_id)
+                    if rows:
+                        block = _merge_rows(block, rows)
+                    elif store is not None:
+                        # Untouched students are copied byte for byte
+                        offset, count = index[student_id]
+                        new_index[student_id] = [out.tell(), count]
+                        out.write(store[offset:offset + count * _BLOCK_ITEM_BYTES])
+                        records += count
+                        continue
+                    new_index[student_id] = [out.tell(), len(block[0])]
+                    for column in block:
+                        out.write(column.tobytes())
+                    records += len(block[0])
+                footer_offset = out.tell()
+                # Sealed segments that are fully compacted are deleted below; every
+                # other segment keeps growing or still has a tail past its offset
+                removable = []
+                for stem, segment_path, active in segments:
+                    if not active and stem in consumed and consumed[stem] >= _size(segment_path):
+                        removable.append(segment_path)
+                        consumed.pop(stem)
+                live = {stem for stem, _, _ in segments}
+                out.write(json.dumps({
+                    'students': new_index,
+                    'consumed': {stem: size for stem, size in consumed.items() if stem in live},
+                    'compacted_at': datetime.now(timezone.utc).isoformat(),
+                }).encode('utf-8'))
+                out.write(_TRAILER.pack(footer_offset, _MAGIC))
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp_path, path)
+
+            removed = 0
+            for segment_path in removable:
+                try:
+                    os.unlink(segment_path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+            with self._lock:
+                self._store_key = None
+                self._refresh()
+                self.compactions += 1
+            report = {
+                'students': len(new_index),
+                'records': records,
+                'segments_removed': removed,
+                'seconds': round(time.perf_counter() - start, 3),
+            }
+            logger.info(f"Compacted attempt log: {report}")
+            return report
+
+    def start(self) -> None:
+        """Compact every ``compact_interval`` seconds in a background thread."""
+        if self._thread is not None or self.compact_interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="attempt-log-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop background compaction and seal this process's segment."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=30)
+            self._thread = None
+        with self._lock:
+            self._seal()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'appended': self.appended,
+                'compactions': self.compactions,
+                'compacted_students': len(self._index),
+                'tail_records': sum(len(rows) for rows in self._tail.values()),
+                'segments': len(self._list_segments()),
+                'questions': len(self._question_ids),
+            }
+
+    # -- writer ---------------------------------------------------------------
+
+    def _writer(self) -> int:
+        if self._fd is None or self._fd_pid != os.getpid():
+            # A forked child must not share its parent's segment
+            self._fd_pid = os.getpid()
+            self._segment_path = os.path.join(
+                self._segments_dir, f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}.active"
+            )
+            self._fd = os.open(self._segment_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            self._segment_size = 0
+        return self._fd
+
+    def _seal(self) -> None:
+        if self._fd is None or self._fd_pid != os.getpid():
+            self._fd = None
+            return
+        os.close(self._fd)
+        self._fd = None
+        # Segments are tracked by stem, so renaming keeps their consumed offsets valid
+        os.replace(self._segment_path, self._segment_path[:-len('.active')] + '.log')
+
+    def _list_segments(self) -> List[Tuple[str, str, bool]]:
+        """(stem, path, still being written) of every segment, oldest first."""
+        segments = []
+        for name in sorted(os.listdir(self._segments_dir)):
+            stem, _, extension = name.rpartition('.')
+            if extension == 'log':
+                segments.append((stem, os.path.join(self._segments_dir, name), False))
+            elif extension == 'active':
+                segments.append((stem, os.path.join(self._segments_dir, name), _writer_alive(stem)))
+        return segments
+
+    # -- question dictionary --------------------------------------------------
+
+    def _ordinal(self, question_id: str) -> int:
+        ordinal = self._ordinals.get(question_id)
+        if ordinal is not None:
+            return ordinal
+        path = os.path.join(self.directory, 'questions.txt')
+        with open(path, 'a+', encoding='utf-8') as f:
+            # Other processes append too; assign under an exclusive lock after catching up
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                self._load_dictionary()
+                ordinal = self._ordinals.get(question_id)
+                if ordinal is None:
+                    f.write(question_id + '\n')
+                    f.flush()
+                    self._load_dictionary()
+                    ordinal = self._ordinals[question_id]
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return ordinal
+
+    def _load_dictionary(self) -> None:
+        path = os.path.join(self.directory, 'questions.txt')
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            return
+        if size == self._dictionary_size:
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            f.seek(self._dictionary_size)
+            chunk = f.read()
+        # Only whole lines; a line being appended right now is picked up next time
+        complete = chunk[:chunk.rfind('\n') + 1]
+        for question_id in complete.splitlines():
+            self._ordinals[question_id] = len(self._question_ids)
+            self._question_ids.append(question_id)
+        self._dictionary_size += len(complete.encode('utf-8'))
+
+    # -- readers --------------------------------------------------------------
+
+    def _refresh(self) -> None:
+        """Reload attempts.col if it changed and index new segment bytes."""
+        path = os.path.join(self.directory, 'attempts.col')
+        try:
+            stat = os.stat(path)
+            key = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            key = None
+        if key != self._store_key:
+            self._open_store(path if key else None)
+            self._store_key = key
+            # The tail is rebuilt from what the new store has not consumed
+            self._tail = {}
+            self._tail_offsets = {}
+
+        for stem, path, _ in self._list_segments():
+            offset = self._tail_offsets.get(stem, self._consumed.get(stem, 0))
+            try:
+                if os.path.getsize(path) <= offset:
+                    self._tail_offsets[stem] = offset
+                    continue
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            self._tail_offsets[stem] = offset + self._index_tail(data)
+        # Writers add a question to the dictionary before appending records that
+        # use it, so loading it last covers every ordinal read above
+        self._load_dictionary()
+
+    def _index_tail(self, data: bytes) -> int:
+        """Add the complete records in data to the tail index; return bytes consumed."""
+        position = 0
+        size = _RECORD.size
+        while position + size <= len(data):
+            timestamp, ordinal, duration, outcome, id_length = _RECORD.unpack_from(data, position)
+            end = position + size + id_length
+            if end > len(data):
+                break
+            student_id = data[position + size:end].decode('utf-8')
+            self._tail.setdefault(student_id, []).append((timestamp, ordinal, duration, outcome))
+            position = end
+        return position
+
+    def _open_store(self, path: Optional[str]) -> None:
+        self._store, self._index, self._consumed = None, {}, {}
+        if path is None:
+            return
+        with open(path, 'rb') as f:
+            store = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        footer_offset, magic = _TRAILER.unpack_from(store, len(store) - _TRAILER.size)
+        if magic != _MAGIC or store[:len(_MAGIC)] != _MAGIC:
+            raise ValueError(f"{path} is not an attempt log store")
+        footer = json.loads(store[footer_offset:len(store) - _TRAILER.size])
+        self._store, self._index, self._consumed = store, footer['students'], footer['consumed']
+
+    def _read_block(self, student_id: str) -> Optional[_Block]:
+        entry = self._index.get(student_id)
+        return self._decode_block(self._store, entry) if entry else None
+
+    @staticmethod
+    def _decode_block(store: mmap.mmap, entry: List[int]) -> _Block:
+        offset, count = entry
+        columns = []
+        for _, typecode in _COLUMNS:
+            column = array(typecode)
+            width = column.itemsize * count
+            column.frombytes(store[offset:offset + width])
+            columns.append(column)
+            offset += width
+        return tuple(columns)
+
+    # -- compaction -----------------------------------------------------------
+
+    @contextmanager
+    def _compaction_lock(self) -> Iterator[bool]:
+        with open(os.path.join(self.directory, 'compact.lock'), 'w') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.compact_interval):
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"Attempt log compaction failed: {e}")
+
+
+_BLOCK_ITEM_BYTES = sum(array(typecode).itemsize for _, typecode in _COLUMNS)
+
+
+def _merge_rows(block: Optional[_Block], rows: List[Tuple[int, int, int, int]]) -> _Block:
+    merged = []
+    if block is not None:
+        ordinals, timestamps, durations, outcomes = block
+        merged.extend(zip(timestamps, ordinals, durations, outcomes))
+    merged.extend(rows)
+    merged.sort(key=lambda row: row[0])
+    return (
+        array('I', (row[1] for row in merged)),
+        array('q', (row[0] for row in merged)),
+        array('I', (row[2] for row in merged)),
+        array('B', (row[3] for row in merged)),
+    )
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def _writer_alive(stem: str) -> bool:
+    """Whether the process that owns an .active segment is still running."""
+    try:
+        pid = int(stem.split('-')[1])
+        os.kill(pid, 0)
+    except (IndexError, ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -1,48 +1,232 @@
-#repositories/base_repository.py
+import functools
+import inspect
 import logging
 from abc import ABC
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence, Callable, Iterable, Optional, TypeVar
 from neo4j import Driver, Session
 
 from core.database import DatabaseManager
 from core.exceptions import DatabaseConnectionError
+from core.instrumentation import query_instrumentation, stable_query_name
+from core.query_plans import plan_capture
+from core.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+# Shard routing of repository methods (see core/sharding.py). The markers only
+# record how a method is routed; BaseRepository wraps every method carrying
+# one, and every override of such a method in a subclass (e.g. the in-memory
+# backend), so routing holds whichever implementation runs. With a single
+# database the wrappers call straight through.
+_ROUTING = '__shard_routing__'
+
+
+def by_student(key: Optional[Callable[[Any], str]] = None):
+    """
+    Route the method to the shard of the student in its first argument.
+
+    Args:
+        key: Maps the first argument to the student id (default: it is the id)
+    """
+    def mark(method):
+        setattr(method, _ROUTING, ('student', key, None))
+        return method
+    return mark
+
+
+def by_students(key: Optional[Callable[[Any], str]] = None, merge: Optional[Callable] = None):
+    """
+    Split the list in the method's first argument by shard and call each shard with its part.
+
+    Args:
+        key: Maps a list item to its student id (default: items are ids)
+        merge: ``merge(results, arguments)`` combining the per-shard results
+            (default: concatenate lists)
+    """
+    def mark(method):
+        setattr(method, _ROUTING, ('students', key, merge))
+        return method
+    return mark
+
+
+def across_shards(merge: Callable[[List[Any], Dict[str, Any]], Any]):
+    """
+    Call the method on every shard (cohort queries) and merge the results.
+
+    Args:
+        merge: ``merge(results, arguments)``; ``arguments`` are the call's
+            arguments by name, defaults applied (e.g. to re-apply a limit)
+    """
+    def mark(method):
+        setattr(method, _ROUTING, ('all', None, merge))
+        return method
+    return mark
+
+
+def replicated(method):
+    """Apply the method (a catalogue write) to every shard; returns shard 0's result."""
+    setattr(method, _ROUTING, ('replicated', None, None))
+    return method
+
+
+def _concatenate(results: List[Any], arguments: Dict[str, Any]) -> Any:
+    merged = []
+    for result in results:
+        merged.extend(result or [])
+    return merged
+
+
+def _routed(method: Callable, routing: tuple) -> Callable:
+    kind, key, merge = routing
+    signature = inspect.signature(method)
+    parameters = list(signature.parameters)
+    first = parameters[1] if len(parameters) > 1 else None
+    merge = merge or _concatenate
+
+    def arguments(self, args, kwargs) -> Dict[str, Any]:
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        return bound.arguments
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        db_manager = self.db_manager
+        if db_manager.shard_count == 1:
+            return method(self, *args, **kwargs)
+        if kind == 'student':
+            value = args[0] if args else kwargs[first]
+            with db_manager.route(key(value) if key else value):
+                return method(self, *args, **kwargs)
+        if kind == 'students':
+            items = args[0] if args else kwargs.pop(first)
+            rest = args[1:] if args else ()
+            parts: Dict[int, list] = {}
+            for item in items:
+                parts.setdefault(db_manager.shard_for(key(item) if key else item), []).append(item)
+            if not parts:
+                return method(self, items, *rest, **kwargs)
+            results = db_manager.map_shards(
+                lambda index: method(self, parts[index], *rest, **kwargs), sorted(parts)
+            )
+            return merge(results, arguments(self, (items,) + tuple(rest), kwargs))
+        results = db_manager.fan_out(method, self, *args, **kwargs)
+        if kind == 'replicated':
+            return results[0]
+        return merge(results, arguments(self, args, kwargs))
+
+    return wrapper
+
+
 class BaseRepository(ABC):
     """Base repository class with common database operations."""
-    
+
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
-    
-    def execute_query(self, query: str, parameters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, attribute in list(vars(cls).items()):
+            if not inspect.isfunction(attribute):
+                continue
+            # The method's own marker, else the one on the method it overrides
+            routing = getattr(attribute, _ROUTING, None)
+            for base in cls.__mro__[1:]:
+                if routing is not None:
+                    break
+                routing = getattr(base.__dict__.get(name), _ROUTING, None)
+            if routing is not None:
+                setattr(cls, name, _routed(attribute, routing))
+
+    def execute_query(
+        self,
+        query: str,
+        parameters: Dict[str, Any] = None,
+        query_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """Execute a read query and return results."""
         parameters = parameters or {}
-        
+        query_name = query_name or stable_query_name(query)
+
+        try:
+            with query_instrumentation.observe(query_name, query, parameters) as observation:
+                with self.db_manager.get_session() as session:
+                    # driver.run covers sending the query until the server starts streaming;
+                    # decode covers fetching and converting the records
+                    with tracer.span('driver.run'):
+                        result = session.run(plan_capture.prepare(query_name, query), parameters)
+                    with tracer.span('decode'):
+                        rows = [dict(record) for record in result]
+                    observation.rows = len(rows)
+                    observation.summary = result.consume()
+                    return rows
+        except Exception as e:
+            logger.error(f"Query execution failed: {e}")
+            raise DatabaseConnectionError(f"Query failed: {e}") from e
+
+    def execute_mapped_query(
+        self,
+        query: str,
+        parameters: Dict[str, Any] = None,
+        decode_all: Callable[[Sequence[str], Iterable[Any]], List[T]] = None,
+        query_name: Optional[str] = None
+    ) -> List[T]:
+        """
+        Execute a read query and decode the records directly.
+
+        Args:
+            query: Cypher query string
+            parameters: Query parameters
+            decode_all: Callable taking the result keys and the record stream
+            query_name: Stable name used for instrumentation
+
+        Returns:
+            List of decoded objects
+        """
+        parameters = parameters or {}
+        query_name = query_name or stable_query_name(query)
+
         try:
-            with self.db_manager.get_session() as session:
-                result = session.run(query, parameters)
-                return [dict(record) for record in result]
+            with query_instrumentation.observe(query_name, query, parameters) as observation:
+                with self.db_manager.get_session() as session:
+                    with tracer.span('driver.run'):
+                        result = session.run(plan_capture.prepare(query_name, query), parameters)
+                    with tracer.span('decode'):
+                        rows = decode_all(result.keys(), result)
+                    observation.rows = len(rows)
+                    observation.summary = result.consume()
+                    return rows
         except Exception as e:
             logger.error(f"Query execution failed: {e}")
             raise DatabaseConnectionError(f"Query failed: {e}") from e
-    
-    def execute_write_query(self, query: str, parameters: Dict[str, Any] = None) -> None:
+
+    def execute_write_query(
+        self,
+        query: str,
+        parameters: Dict[str, Any] = None,
+        query_name: Optional[str] = None
+    ) -> None:
         """Execute a write query."""
         parameters = parameters or {}
-        
+        query_name = query_name or stable_query_name(query)
+
         try:
-            with self.db_manager.get_session() as session:
-                session.run(query, parameters)
+            with query_instrumentation.observe(query_name, query, parameters) as observation:
+                with self.db_manager.get_session() as session:
+                    observation.summary = session.run(
+                        plan_capture.prepare(query_name, query), parameters
+                    ).consume()
         except Exception as e:
             logger.error(f"Write query execution failed: {e}")
             raise DatabaseConnectionError(f"Write query failed: {e}") from e
-    
+
     def execute_transaction(self, transaction_func, *args, **kwargs):
         """Execute a function within a transaction."""
         try:
-            with self.db_manager.get_session() as session:
-                return session.execute_write(transaction_func, *args, **kwargs)
+            with query_instrumentation.observe(f"tx:{transaction_func.__name__}", transaction_func.__qualname__):
+                with self.db_manager.get_session() as session:
+                    return session.execute_write(transaction_func, *args, **kwargs)
         except Exception as e:
             logger.error(f"Transaction execution failed: {e}")
-            raise DatabaseConnectionError(f"Transaction failed: {e}") from e
\ No newline at end of file
+            raise DatabaseConnectionError(f"Transaction failed: {e}") from e
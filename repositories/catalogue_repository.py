@@ -0,0 +1,69 @@
+# repositories/catalogue_repository.py
+from typing import Any, Dict, Optional
+import logging
+
+from .base_repository import BaseRepository, replicated
+from core.schema import schema_registry
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_KEY = 'questions'
+
+schema_registry.index('catalogue_version_key_unique', 'CatalogueVersion', 'key', unique=True)
+schema_registry.query('catalogue.get_version', 'CatalogueVersion', lookup=('key',))
+schema_registry.query('catalogue.stamp_version', 'CatalogueVersion', lookup=('key',))
+
+
+class CatalogueRepository(BaseRepository):
+    """Repository for the version stamp of the loaded question catalogue."""
+
+    def get_version(self, key: str = CATALOGUE_KEY) -> Optional[Dict[str, Any]]:
+        """
+        Get the stamp written by the last successful ingest.
+
+        Args:
+            key: Catalogue key
+
+        Returns:
+            Dictionary with source_hash, source_size, source_mtime, schema_version,
+            item_count and loaded_at, or None if nothing was loaded yet
+        """
+        query = """
+        MATCH (v:CatalogueVersion {key: $key})
+        RETURN v.source_hash as source_hash, v.source_size as source_size,
+               v.source_mtime as source_mtime, v.schema_version as schema_version,
+               v.item_count as item_count, toString(v.loaded_at) as loaded_at
+        """
+        results = self.execute_query(query, {'key': key}, query_name='catalogue.get_version')
+        return results[0] if results else None
+
+    @replicated
+    def stamp_version(
+        self,
+        source_hash: str,
+        source_size: int,
+        source_mtime: float,
+        schema_version: str,
+        item_count: int,
+        key: str = CATALOGUE_KEY
+    ) -> None:
+        """Record the source file and schema version the catalogue was loaded from."""
+        query = """
+        MERGE (v:CatalogueVersion {key: $key})
+        SET v.source_hash = $source_hash,
+            v.source_size = $source_size,
+            v.source_mtime = $source_mtime,
+            v.schema_version = $schema_version,
+            v.item_count = $item_count,
+            v.loaded_at = datetime()
+        """
+        parameters = {
+            'key': key,
+            'source_hash': source_hash,
+            'source_size': source_size,
+            'source_mtime': source_mtime,
+            'schema_version': schema_version,
+            'item_count': item_count,
+        }
+        logger.info(f"Stamping catalogue version {source_hash[:12]} (schema {schema_version})")
+        self.execute_write_query(query, parameters, query_name='catalogue.stamp_version')
@@ -0,0 +1,461 @@
+# repositories/in_memory.py
+"""
+In-process stand-in backend.
+
+Implements the repository interfaces over plain Python structures so the
+services, benchmarks and HTTP front-end can run without a Neo4j server:
+
+    graph = InMemoryGraph()
+    db_manager = InMemoryDatabaseManager(graph)
+    student_repo = InMemoryStudentRepository(db_manager)
+"""
+import bisect
+import heapq
+import logging
+import threading
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .catalogue_repository import CATALOGUE_KEY, CatalogueRepository
+from .question_repository import QuestionRepository
+from .review_repository import ReviewRepository
+from .setup_repository import SetupRepository
+from .student_repository import StudentRepository
+from core.database import DatabaseManager
+from core.exceptions import DatabaseConnectionError
+from core.instrumentation import query_instrumentation
+from models.question import Question, SolutionApproach
+from models.review import Review
+from models.student import Student
+
+logger = logging.getLogger(__name__)
+
+
+def _display_order(question: Question) -> tuple:
+    return question.display_order
+
+
+class InMemoryGraph:
+    """Question catalogue and student progress held in process memory."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.questions: Dict[str, Question] = {}
+        self.curriculum: List[Question] = []
+        self.students: Dict[str, Student] = {}
+        self.attempted: Dict[str, Dict[str, datetime]] = {}
+        self.mastered: Dict[str, Dict[str, datetime]] = {}
+        self.mastered_subconcepts: Dict[str, Set[str]] = {}
+        self.concepts: Set[str] = set()
+        self.subconcepts: Set[str] = set()
+        self.solution_approaches: Dict[str, str] = {}
+        self.catalogue_versions: Dict[str, Dict[str, Any]] = {}
+        # Review queue: reviews by key plus sorted (due_at, ...) tuples standing in for the indexes
+        self.reviews: Dict[Tuple[str, str], Review] = {}
+        self.review_queue: List[Tuple[datetime, str, str]] = []
+        self.student_review_queues: Dict[str, List[Tuple[datetime, str]]] = {}
+
+    def put_question(self, question: Question) -> None:
+        """Insert or replace a question and keep the curriculum order sorted."""
+        with self.lock:
+            previous = self.questions.get(question.id)
+            if previous is not None:
+                self.curriculum.remove(previous)
+            self.questions[question.id] = question
+            bisect.insort(self.curriculum, question, key=_display_order)
+
+    def clear(self) -> None:
+        """Drop all catalogue and student data."""
+        with self.lock:
+            self.__init__()
+
+
+class InMemoryDatabaseManager(DatabaseManager):
+    """
+    DatabaseManager stand-in bound to an InMemoryGraph.
+
+    Unlike DatabaseManager it is not a singleton, so several independent
+    backends can coexist in one process. Transaction functions are called
+    with ``tx=None``; in-memory repositories ignore it.
+    """
+
+    def __new__(cls, graph: Optional[InMemoryGraph] = None) -> 'InMemoryDatabaseManager':
+        return object.__new__(cls)
+
+    def __init__(self, graph: Optional[InMemoryGraph] = None):
+        self.graph = graph or InMemoryGraph()
+
+    def initialize_connection(self, uri: str = "", username: str = "", password: str = "") -> None:
+        """No connection is needed for the in-memory backend."""
+
+    def get_session(self):
+        raise DatabaseConnectionError("The in-memory backend has no Cypher sessions")
+
+    def close_connection(self) -> None:
+        """Nothing to close."""
+
+    def execute_transaction(self, transaction_function: Callable, *args, **kwargs) -> Any:
+        with query_instrumentation.observe(
+            f"tx:{transaction_function.__name__}", transaction_function.__qualname__
+        ), self.graph.lock:
+            return transaction_function(None, *args, **kwargs)
+
+    execute_read_transaction = execute_transaction
+
+    def ping(self) -> float:
+        return 0.0
+
+    def warm_pool(self, connections: int, timeout: float = 30.0) -> int:
+        """There is no connection pool to fill."""
+        return 0
+
+    def health_check(self) -> bool:
+        return True
+
+
+def _graph(repo) -> InMemoryGraph:
+    return repo.db_manager.graph
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class InMemoryStudentRepository(StudentRepository):
+    """StudentRepository over an InMemoryGraph."""
+
+    def create_or_update_student(self, student: Student) -> None:
+        graph = _graph(self)
+        with graph.lock:
+            existing = graph.students.get(student.student_id)
+            graph.students[student.student_id] = Student(
+                student_id=student.student_id,
+                name=student.name,
+                email=student.email,
+                created_at=existing.created_at if existing else _now(),
+                last_active=_now(),
+            )
+        self._notify_student_written(student.student_id)
+
+    def upsert_students(self, students: List[Student]) -> Dict[str, int]:
+        graph = _graph(self)
+        created = 0
+        with graph.lock:
+            for student in students:
+                existing = graph.students.get(student.student_id)
+                if existing is None:
+                    created += 1
+                    graph.students[student.student_id] = Student(
+                        student_id=student.student_id, name=student.name, email=student.email,
+                        created_at=_now(), last_active=_now(),
+                    )
+                else:
+                    graph.students[student.student_id] = replace(existing, name=student.name, email=student.email)
+        for student in students:
+            self._notify_student_written(student.student_id)
+        return {'created': created, 'updated': len(students) - created}
+
+    def find_student_by_id(self, student_id: str) -> Optional[Student]:
+        student = _graph(self).students.get(student_id)
+        if student is None:
+            return None
+        return Student(
+            student_id=student.student_id,
+            name=student.name,
+            email=student.email,
+            created_at=student.created_at,
+            last_active=student.last_active,
+        )
+
+    def find_active_student_ids(self, since: datetime, limit: int = 10000) -> List[str]:
+        graph = _graph(self)
+        with graph.lock:
+            active = [s for s in graph.students.values() if s.last_active and s.last_active >= since]
+        active.sort(key=lambda student: student.last_active, reverse=True)
+        return [student.student_id for student in active[:limit]]
+
+    def _touch(self, student_id: str, question_id: str) -> bool:
+        graph = _graph(self)
+        student = graph.students.get(student_id)
+        if student is None or question_id not in graph.questions:
+            return False
+        student.last_active = _now()
+        return True
+
+    def mark_question_as_attempted(self, student_id: str, question_id: str) -> bool:
+        graph = _graph(self)
+        with graph.lock:
+            if not self._touch(student_id, question_id):
+                return False
+            graph.attempted.setdefault(student_id, {})[question_id] = _now()
+            return True
+
+    def mark_question_as_mastered(self, student_id: str, question_id: str) -> None:
+        graph = _graph(self)
+        with graph.lock:
+            if self._touch(student_id, question_id):
+                graph.mastered.setdefault(student_id, {})[question_id] = _now()
+
+    def mark_subconcepts_as_mastered(self, student_id: str, question_id: str) -> None:
+        graph = _graph(self)
+        with graph.lock:
+            if self._touch(student_id, question_id):
+                names = [name for name in graph.questions[question_id].sub_concepts if name in graph.subconcepts]
+                graph.mastered_subconcepts.setdefault(student_id, set()).update(names)
+
+    def get_student_progress_summary(self, student_id: str, include_question_ids: bool = False) -> dict:
+        graph = _graph(self)
+        with graph.lock:
+            if student_id not in graph.students:
+                return {}
+            attempted = graph.attempted.get(student_id, {})
+            mastered = graph.mastered.get(student_id, {})
+            steps: Dict[Any, int] = {}
+            for question_id in mastered:
+                step_number = graph.questions[question_id].step_number
+                steps[step_number] = steps.get(step_number, 0) + 1
+            summary = {
+                'student_id': student_id,
+                'attempted_count': len(attempted),
+                'mastered_count': len(mastered),
+                'mastered_concepts_count': len(graph.mastered_subconcepts.get(student_id, ())),
+                'step_progress': [
+                    {'step_number': step_number, 'mastered': count}
+                    for step_number, count in sorted(steps.items(), key=lambda item: (item[0] is None, item[0]))
+                ],
+            }
+            if include_question_ids:
+                summary['attempted_questions'] = list(attempted)
+                summary['mastered_questions'] = list(mastered)
+            return summary
+
+    def get_concept_progress(self, student_id: str) -> dict:
+        graph = _graph(self)
+        with graph.lock:
+            concepts: Dict[str, int] = {}
+            for question_id in graph.mastered.get(student_id, {}):
+                for name in graph.questions[question_id].sub_concepts:
+                    concepts[name] = concepts.get(name, 0) + 1
+            return concepts
+
+    def get_ranking_features(self, student_id: str, window: int = 20) -> dict:
+        graph = _graph(self)
+        with graph.lock:
+            if student_id not in graph.students:
+                return {}
+            attempted = graph.attempted.get(student_id, {})
+            mastered = graph.mastered.get(student_id, {})
+            recent = heapq.nlargest(window, attempted, key=attempted.get)
+            return {
+                'recent_attempts': len(recent),
+                'recent_successes': sum(1 for question_id in recent if question_id in mastered),
+                'mastered_concepts': list(self.get_concept_progress(student_id)),
+            }
+
+    def repair_progress_counters(self, batch_size: int = 500, rebuild_all: bool = False) -> dict:
+        # Counts are derived from the edge maps on read, so they cannot drift.
+        checked = len(_graph(self).students)
+        return {'checked': checked, 'drifted': 0, 'rebuilt': checked if rebuild_all else 0, 'drifted_sample': []}
+
+
+class InMemoryQuestionRepository(QuestionRepository):
+    """QuestionRepository over an InMemoryGraph."""
+
+    def find_unmastered_questions_for_student(self, student_id: str, limit: int = 20) -> List[Question]:
+        graph = _graph(self)
+        mastered = graph.mastered.get(student_id, {})
+        results = []
+        for question in graph.curriculum:
+            if question.id not in mastered:
+                results.append(question)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def find_questions_by_concept_for_student(
+        self,
+        student_id: str,
+        concept_name: str,
+        limit: int = 10
+    ) -> List[Question]:
+        graph = _graph(self)
+        mastered = graph.mastered.get(student_id, {})
+        results = []
+        for question in graph.curriculum:
+            if question.id in mastered:
+                continue
+            if concept_name in question.standard_concepts or concept_name in question.sub_concepts:
+                results.append(question)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def find_question_by_id(self, question_id: str) -> Optional[Question]:
+        return _graph(self).questions.get(question_id)
+
+    def get_all_questions(self, limit: Optional[int] = None) -> List[Question]:
+        curriculum = _graph(self).curriculum
+        return list(curriculum[:limit] if limit else curriculum)
+
+    def create_question(self, question: Question) -> None:
+        _graph(self).put_question(question)
+
+
+class InMemorySetupRepository(SetupRepository):
+    """SetupRepository over an InMemoryGraph."""
+
+    def create_constraints_and_indexes(self) -> None:
+        """The in-memory backend has no schema."""
+
+    def create_vocabulary(self, vocabulary: Dict[str, Any], batch_size: int = 1000) -> Dict[str, int]:
+        graph = _graph(self)
+        with graph.lock:
+            graph.concepts.update(vocabulary['concepts'])
+            graph.subconcepts.update(vocabulary['concepts'])
+            for approach in vocabulary['approaches']:
+                graph.solution_approaches[approach['name']] = approach['explanation']
+        return {'concepts': len(vocabulary['concepts']), 'approaches': len(vocabulary['approaches'])}
+
+    def link_question_transaction(self, tx, item: Dict[str, Any]) -> None:
+        self._validate_question_data(item)
+        graph = _graph(self)
+        sub_concepts = [name.strip() for name in item.get('sub_concepts', []) if name and name.strip()]
+        with graph.lock:
+            # Like the Cypher version, only approaches created in phase one are linked
+            names = [approach.get('approach_name', '').strip() for approach in item.get('solution_approaches', [])]
+            approaches = [
+                SolutionApproach(name, graph.solution_approaches[name])
+                for name in dict.fromkeys(names) if name in graph.solution_approaches
+            ]
+            graph.put_question(Question(
+                id=item['id'],
+                title=item['question_title'],
+                content=item['question'],
+                difficulty=item['difficulty'],
+                step_number=item['step_no'],
+                sub_step_number=item['sub_step_no'],
+                sequence_number=item['sl_no'],
+                standard_concepts=list(item.get('standard_concepts', [])),
+                sub_concepts=sub_concepts,
+                solution_approaches=approaches,
+            ))
+
+    def populate_question_and_concepts_transaction(self, tx, item: Dict[str, Any]) -> None:
+        self._validate_question_data(item)
+        graph = _graph(self)
+        with graph.lock:
+            self.create_vocabulary(self.collect_vocabulary([item]))
+            self.link_question_transaction(tx, item)
+
+    def clear_all_data(self) -> None:
+        _graph(self).clear()
+
+    def get_database_statistics(self) -> Dict[str, Any]:
+        graph = _graph(self)
+        with graph.lock:
+            return {
+                'nodes': {
+                    'Question': len(graph.questions),
+                    'Student': len(graph.students),
+                    'Concept': len(graph.concepts),
+                    'SubConcept': len(graph.subconcepts),
+                    'SolutionApproach': len(graph.solution_approaches),
+                },
+                'relationships': {
+                    'ATTEMPTED': sum(len(v) for v in graph.attempted.values()),
+                    'MASTERED': sum(len(v) for v in graph.mastered.values())
+                                + sum(len(v) for v in graph.mastered_subconcepts.values()),
+                },
+            }
+
+
+class InMemoryReviewRepository(ReviewRepository):
+    """ReviewRepository over an InMemoryGraph, with bisect-maintained due queues."""
+
+    def get_review(self, student_id: str, question_id: str) -> Optional[Review]:
+        review = _graph(self).reviews.get((student_id, question_id))
+        return replace(review) if review else None
+
+    def upsert_review(self, review: Review) -> None:
+        graph = _graph(self)
+        with graph.lock:
+            if review.student_id not in graph.students or review.question_id not in graph.questions:
+                return
+            self._unqueue(graph, review.student_id, review.question_id)
+            stored = replace(review)
+            graph.reviews[(review.student_id, review.question_id)] = stored
+            self._queue(graph, stored)
+
+    def find_due_for_student(self, student_id: str, due_before: datetime, limit: int = 20) -> List[Review]:
+        graph = _graph(self)
+        with graph.lock:
+            queue = graph.student_review_queues.get(student_id, [])
+            end = bisect.bisect_right(queue, (due_before, '\uffff'))
+            return [replace(graph.reviews[(student_id, qid)]) for _, qid in queue[:min(end, limit)]]
+
+    def find_due(self, due_before: datetime, limit: int = 100) -> List[Review]:
+        graph = _graph(self)
+        with graph.lock:
+            end = bisect.bisect_right(graph.review_queue, (due_before, '\uffff', '\uffff'))
+            return [replace(graph.reviews[(sid, qid)]) for _, sid, qid in graph.review_queue[:min(end, limit)]]
+
+    def lease_due_for_students(
+        self,
+        student_ids: List[str],
+        due_before: datetime,
+        lease_until: datetime,
+        limit_per_student: int = 20
+    ) -> List[Review]:
+        graph = _graph(self)
+        taken = []
+        with graph.lock:
+            for student_id in student_ids:
+                for review in self.find_due_for_student(student_id, due_before, limit_per_student):
+                    taken.append(review)
+                    self.upsert_review(replace(review, due_at=lease_until))
+        return taken
+
+    @staticmethod
+    def _queue(graph: InMemoryGraph, review: Review) -> None:
+        bisect.insort(graph.review_queue, (review.due_at, review.student_id, review.question_id))
+        bisect.insort(graph.student_review_queues.setdefault(review.student_id, []), (review.due_at, review.question_id))
+
+    @staticmethod
+    def _unqueue(graph: InMemoryGraph, student_id: str, question_id: str) -> None:
+        previous = graph.reviews.get((student_id, question_id))
+        if previous is None:
+            return
+        for queue, entry in (
+            (graph.review_queue, (previous.due_at, student_id, question_id)),
+            (graph.student_review_queues[student_id], (previous.due_at, question_id)),
+        ):
+            index = bisect.bisect_left(queue, entry)
+            if index < len(queue) and queue[index] == entry:
+                del queue[index]
+
+
+class InMemoryCatalogueRepository(CatalogueRepository):
+    """CatalogueRepository over an InMemoryGraph."""
+
+    def get_version(self, key: str = CATALOGUE_KEY) -> Optional[Dict[str, Any]]:
+        stamp = _graph(self).catalogue_versions.get(key)
+        return dict(stamp) if stamp else None
+
+    def stamp_version(
+        self,
+        source_hash: str,
+        source_size: int,
+        source_mtime: float,
+        schema_version: str,
+        item_count: int,
+        key: str = CATALOGUE_KEY
+    ) -> None:
+        _graph(self).catalogue_versions[key] = {
+            'source_hash': source_hash,
+            'source_size': source_size,
+            'source_mtime': source_mtime,
+            'schema_version': schema_version,
+            'item_count': item_count,
+            'loaded_at': _now().isoformat(),
+        }
@@ -1,16 +1,50 @@
 # repositories/question_repository.py
-from typing import List, Dict, Any, Optional
+from typing import List, Optional
 import logging
 
-from .base_repository import BaseRepository
-from models.question import Question, SolutionApproach
+from .base_repository import BaseRepository, by_student, replicated
+from .record_decoder import question_decoder
+from models.question import Question
 from core.exceptions import QuestionNotFoundError
+from core.logging_setup import hot_path_logger
+from core.schema import schema_registry
 
 logger = logging.getLogger(__name__)
+# Per-call messages, sampled (see core/logging_setup.py)
+hot_logger = hot_path_logger(__name__)
+
+# Shared RETURN projection for Question reads; decoded by question_decoder.
+QUESTION_PROJECTION = """
+    q.id as id, q.title as title, q.content as content,
+    q.difficulty as difficulty, q.step_number as step_number,
+    q.sub_step_number as sub_step_number, q.sequence_number as sequence_number,
+    q.standard_concepts as standard_concepts, q.sub_concepts as sub_concepts,
+    [(q)-[:HAS_SOLUTION_APPROACH]->(sa) | {name: sa.name, explanation: sa.explanation}] as solution_approaches
+"""
+
+# Existence predicates that let the planner walk question_step_index in order,
+# so the curriculum ORDER BY is served by the index instead of a Sort.
+CURRICULUM_ORDER = ('step_number', 'sub_step_number', 'sequence_number')
+CURRICULUM_INDEX_PREDICATE = """
+    q.step_number IS NOT NULL AND q.sub_step_number IS NOT NULL AND q.sequence_number IS NOT NULL
+"""
+
+schema_registry.index('question_id_unique', 'Question', 'id', unique=True)
+# Superseded by question_id_unique, which is backed by its own index
+schema_registry.retire('question_id_index')
+schema_registry.index('question_step_index', 'Question', *CURRICULUM_ORDER)
+schema_registry.index('question_difficulty_index', 'Question', 'difficulty')
+schema_registry.query('question.find_unmastered_for_student', 'Question', order_by=CURRICULUM_ORDER)
+schema_registry.query('question.find_unmastered_for_student', 'Student', lookup=('student_id',))
+schema_registry.query('question.find_by_concept_for_student', 'Question', order_by=CURRICULUM_ORDER)
+schema_registry.query('question.find_by_concept_for_student', 'Student', lookup=('student_id',))
+schema_registry.query('question.find_by_id', 'Question', lookup=('id',))
+schema_registry.query('question.get_all', 'Question', order_by=CURRICULUM_ORDER)
 
 class QuestionRepository(BaseRepository):
     """Repository for question-related database operations."""
 
+    @by_student()
     def find_unmastered_questions_for_student(self, student_id: str, limit: int = 20) -> List[Question]:
         """
         Find questions that the student hasn't mastered yet, ordered by curriculum sequence.
@@ -20,26 +54,27 @@ class QuestionRepository(BaseRepository):
             limit: Maximum number of questions to return
             
         Returns:
-            List of question dictionaries
+            List of Question objects
         """
         query = """
         MATCH (q:Question)
-        WHERE NOT EXISTS {
+        WHERE """ + CURRICULUM_INDEX_PREDICATE + """
+        AND NOT EXISTS {
             MATCH (s:Student {student_id: $student_id})-[:MASTERED]->(q)
         }
-        RETURN q.id as id, q.title as title, q.content as content,
-               q.difficulty as difficulty, q.step_number as step_number,
-               q.substep_number as sub_step_number, q.sequence_number as sequence_number,
-               q.standard_concepts as standard_concepts, q.sub_concepts as sub_concepts,
-               q.solution_approaches as solution_approaches
-        ORDER BY q.step_number ASC, q.substep_number ASC, q.sequence_number ASC
+        RETURN """ + QUESTION_PROJECTION + """
+        ORDER BY q.step_number ASC, q.sub_step_number ASC, q.sequence_number ASC
         LIMIT $limit
         """
         
         parameters = {'student_id': student_id, 'limit': limit}
-        logger.info(f"Finding unmastered questions for student {student_id}")
-        return self.execute_query(query, parameters)
+        hot_logger.info("Finding unmastered questions for student %s", student_id)
+        return self.execute_mapped_query(
+            query, parameters, question_decoder.decode_all,
+            query_name='question.find_unmastered_for_student'
+        )
 
+    @by_student()
     def find_questions_by_concept_for_student(
         self, 
         student_id: str, 
@@ -55,20 +90,17 @@ class QuestionRepository(BaseRepository):
             limit: Maximum number of questions to return
             
         Returns:
-            List of question dictionaries
+            List of Question objects
         """
         query = """
         MATCH (q:Question)
-        WHERE (concept_name IN q.standard_concepts OR concept_name IN q.sub_concepts)
+        WHERE """ + CURRICULUM_INDEX_PREDICATE + """
+        AND ($concept_name IN q.standard_concepts OR $concept_name IN q.sub_concepts)
         AND NOT EXISTS {
             MATCH (s:Student {student_id: $student_id})-[:MASTERED]->(q)
         }
-        RETURN q.id as id, q.title as title, q.content as content,
-               q.difficulty as difficulty, q.step_number as step_number,
-               q.substep_number as sub_step_number, q.sequence_number as sequence_number,
-               q.standard_concepts as standard_concepts, q.sub_concepts as sub_concepts,
-               q.solution_approaches as solution_approaches
-        ORDER BY q.step_number ASC, q.substep_number ASC, q.sequence_number ASC
+        RETURN """ + QUESTION_PROJECTION + """
+        ORDER BY q.step_number ASC, q.sub_step_number ASC, q.sequence_number ASC
         LIMIT $limit
         """
         
@@ -78,8 +110,11 @@ class QuestionRepository(BaseRepository):
             'limit': limit
         }
         
-        logger.info(f"Finding questions for concept '{concept_name}' for student {student_id}")
-        return self.execute_query(query, parameters)
+        hot_logger.info("Finding questions for concept '%s' for student %s", concept_name, student_id)
+        return self.execute_mapped_query(
+            query, parameters, question_decoder.decode_all,
+            query_name='question.find_by_concept_for_student'
+        )
 
     def find_question_by_id(self, question_id: str) -> Optional[Question]:
         """
@@ -93,20 +128,14 @@ class QuestionRepository(BaseRepository):
         """
         query = """
         MATCH (q:Question {id: $question_id})
-        RETURN q.id as id, q.title as title, q.content as content,
-               q.difficulty as difficulty, q.step_number as step_number,
-               q.substep_number as sub_step_number, q.sequence_number as sequence_number,
-               q.standard_concepts as standard_concepts, q.sub_concepts as sub_concepts,
-               q.solution_approaches as solution_approaches
+        RETURN """ + QUESTION_PROJECTION + """
         """
         
-        results = self.execute_query(query, {'question_id': question_id})
-        
-        if not results:
-            return None
-        
-        data = results[0]
-        return self._build_question_from_data(data)
+        results = self.execute_mapped_query(
+            query, {'question_id': question_id}, question_decoder.decode_all,
+            query_name='question.find_by_id'
+        )
+        return results[0] if results else None
 
     def get_all_questions(self, limit: Optional[int] = None) -> List[Question]:
         """
@@ -120,20 +149,19 @@ class QuestionRepository(BaseRepository):
         """
         query = """
         MATCH (q:Question)
-        RETURN q.id as id, q.title as title, q.content as content,
-               q.difficulty as difficulty, q.step_number as step_number,
-               q.substep_number as sub_step_number, q.sequence_number as sequence_number,
-               q.standard_concepts as standard_concepts, q.sub_concepts as sub_concepts,
-               q.solution_approaches as solution_approaches
-        ORDER BY q.step_number ASC, q.substep_number ASC, q.sequence_number ASC
+        WHERE """ + CURRICULUM_INDEX_PREDICATE + """
+        RETURN """ + QUESTION_PROJECTION + """
+        ORDER BY q.step_number ASC, q.sub_step_number ASC, q.sequence_number ASC
         """
         
         if limit:
             query += f" LIMIT {limit}"
         
-        results = self.execute_query(query)
-        return [self._build_question_from_data(data) for data in results]
+        return self.execute_mapped_query(
+            query, None, question_decoder.decode_all, query_name='question.get_all'
+        )
 
+    @replicated
     def create_question(self, question: Question) -> None:
         """
         Create a new question in the database.
@@ -148,12 +176,16 @@ class QuestionRepository(BaseRepository):
             content: $content,
             difficulty: $difficulty,
             step_number: $step_number,
-            substep_number: $sub_step_number,
+            sub_step_number: $sub_step_number,
             sequence_number: $sequence_number,
             standard_concepts: $standard_concepts,
-            sub_concepts: $sub_concepts,
-            solution_approaches: $solution_approaches
+            sub_concepts: $sub_concepts
         })
+        WITH q
+        UNWIND $solution_approaches AS approach
+        MERGE (sa:SolutionApproach {name: approach.name})
+        SET sa.explanation = approach.explanation
+        MERGE (q)-[:HAS_SOLUTION_APPROACH]->(sa)
         """
         
         parameters = {
@@ -173,36 +205,4 @@ class QuestionRepository(BaseRepository):
         }
         
         logger.info(f"Creating question: {question.id}")
-        self.execute_write_query(query, parameters)
-
-    def _build_question_from_data(self, data: Dict[str, Any]) -> Question:
-        """
-        Build a Question object from database result data.
-        
-        Args:
-            data: Database result dictionary
-            
-        Returns:
-            Question object
-        """
-        solution_approaches = []
-        if data.get('solution_approaches'):
-            for approach_data in data['solution_approaches']:
-                if isinstance(approach_data, dict):
-                    solution_approaches.append(SolutionApproach(
-                        name=approach_data.get('name', ''),
-                        explanation=approach_data.get('explanation', '')
-                    ))
-        
-        return Question(
-            id=data['id'],
-            title=data['title'],
-            content=data['content'],
-            difficulty=data['difficulty'],
-            step_number=data['step_number'],
-            sub_step_number=data['sub_step_number'],
-            sequence_number=data['sequence_number'],
-            standard_concepts=data.get('standard_concepts', []),
-            sub_concepts=data.get('sub_concepts', []),
-            solution_approaches=solution_approaches
-        )
\ No newline at end of file
+        self.execute_write_query(query, parameters, query_name='question.create')
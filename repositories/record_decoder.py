@@ -0,0 +1,83 @@
+# repositories/record_decoder.py
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from models.question import Question, SolutionApproach
+
+# Column order of the Question constructor; every question projection must
+# return these aliases (in any order).
+QUESTION_COLUMNS: Tuple[str, ...] = (
+    'id', 'title', 'content', 'difficulty', 'step_number', 'sub_step_number',
+    'sequence_number', 'standard_concepts', 'sub_concepts', 'solution_approaches',
+)
+
+
+def _decode_approaches(raw: Any) -> List[SolutionApproach]:
+    """Convert a stored list of approach maps into SolutionApproach objects."""
+    if not raw:
+        return []
+    return [
+        SolutionApproach(approach.get('name', ''), approach.get('explanation', ''))
+        for approach in raw
+        if isinstance(approach, dict)
+    ]
+
+
+class QuestionDecoder:
+    """
+    Decodes Bolt records straight into Question objects.
+
+    A projection (the tuple of column names a query returns) is compiled once
+    into an ``itemgetter`` that pulls the Question fields by position, so rows
+    are decoded without building an intermediate ``dict(record)``.
+    """
+
+    def __init__(self):
+        self._compiled: Dict[Tuple[str, ...], Callable[[Sequence[Any]], Question]] = {}
+
+    def compile(self, keys: Sequence[str]) -> Callable[[Sequence[Any]], Question]:
+        """
+        Return the row decoder for a projection, compiling it on first use.
+
+        Args:
+            keys: Column names in the order the query returns them
+
+        Returns:
+            Function mapping one record to a Question
+        """
+        keys = tuple(keys)
+        decoder = self._compiled.get(keys)
+        if decoder is None:
+            decoder = self._build(keys)
+            self._compiled[keys] = decoder
+        return decoder
+
+    def decode_all(self, keys: Sequence[str], records: Iterable[Sequence[Any]]) -> List[Question]:
+        """Decode every record of a result with the projection's compiled decoder."""
+        decode = self.compile(keys)
+        return [decode(record) for record in records]
+
+    @staticmethod
+    def _build(keys: Tuple[str, ...]) -> Callable[[Sequence[Any]], Question]:
+        missing = [column for column in QUESTION_COLUMNS if column not in keys]
+        if missing:
+            raise ValueError(f"Question projection is missing columns: {missing}")
+
+        position = {key: index for index, key in enumerate(keys)}
+        fetch = itemgetter(*(position[column] for column in QUESTION_COLUMNS))
+        decode_approaches = _decode_approaches
+
+        def decode(record: Sequence[Any]) -> Question:
+            (id_, title, content, difficulty, step_number, sub_step_number,
+             sequence_number, standard_concepts, sub_concepts, approaches) = fetch(record)
+            return Question(
+                id_, title, content, difficulty, step_number, sub_step_number,
+                sequence_number, standard_concepts or [], sub_concepts or [],
+                decode_approaches(approaches),
+            )
+
+        return decode
+
+
+# Shared decoder; compiled projections are cached for the life of the process.
+question_decoder = QuestionDecoder()
@@ -0,0 +1,189 @@
+# repositories/review_repository.py
+from datetime import datetime
+from itertools import chain
+from operator import attrgetter
+from typing import Any, Dict, List, Optional
+import logging
+
+from .base_repository import BaseRepository, across_shards, by_student, by_students
+from core.schema import schema_registry
+from models.review import Review
+
+logger = logging.getLogger(__name__)
+
+# Review nodes are the due queue: every read is an index seek on due_at
+# (optionally behind an equality on student_id) instead of a relationship scan.
+schema_registry.index('review_student_question_unique', 'Review', 'student_id', 'question_id', unique=True)
+schema_registry.index('review_student_due_index', 'Review', 'student_id', 'due_at')
+schema_registry.index('review_due_index', 'Review', 'due_at')
+schema_registry.query('review.get', 'Review', lookup=('student_id',))
+schema_registry.query('review.upsert', 'Review', lookup=('student_id',))
+schema_registry.query('review.upsert', 'Student', lookup=('student_id',))
+schema_registry.query('review.upsert', 'Question', lookup=('id',))
+# student_id is an equality, so ORDER BY due_at is served by (student_id, due_at)
+schema_registry.query('review.find_due_for_student', 'Review', lookup=('student_id',), order_by=('student_id', 'due_at'))
+schema_registry.query('review.find_due', 'Review', order_by=('due_at',))
+schema_registry.query('review.lease_due_for_students', 'Review', lookup=('student_id',), order_by=('student_id', 'due_at'))
+
+REVIEW_PROJECTION = """
+r.student_id as student_id, r.question_id as question_id, r.due_at as due_at,
+r.interval_days as interval_days, r.repetitions as repetitions,
+r.easiness as easiness, r.last_reviewed_at as last_reviewed_at
+"""
+
+
+def _native(value: Any) -> Any:
+    """Convert a driver temporal value to a Python datetime."""
+    return value.to_native() if hasattr(value, 'to_native') else value
+
+
+def _to_review(data: Dict[str, Any]) -> Review:
+    return Review(
+        student_id=data['student_id'],
+        question_id=data['question_id'],
+        due_at=_native(data['due_at']),
+        interval_days=data['interval_days'],
+        repetitions=data['repetitions'],
+        easiness=data['easiness'],
+        last_reviewed_at=_native(data.get('last_reviewed_at'))
+    )
+
+
+def _earliest_due(results: List[List[Review]], arguments: Dict[str, Any]) -> List[Review]:
+    # Merge of the per-shard queues (see core/sharding.py)
+    return sorted(chain.from_iterable(results), key=lambda review: review.due_at)[:arguments['limit']]
+
+
+class ReviewRepository(BaseRepository):
+    """Repository for the spaced-repetition review queue."""
+
+    @by_student()
+    def get_review(self, student_id: str, question_id: str) -> Optional[Review]:
+        """Get the review state of one question for one student, if scheduled."""
+        query = f"""
+        MATCH (r:Review {{student_id: $student_id, question_id: $question_id}})
+        RETURN {REVIEW_PROJECTION}
+        """
+        parameters = {'student_id': student_id, 'question_id': question_id}
+        results = self.execute_query(query, parameters, query_name='review.get')
+        return _to_review(results[0]) if results else None
+
+    @by_student(attrgetter('student_id'))
+    def upsert_review(self, review: Review) -> None:
+        """Create or update a review and link it to its student and question."""
+        query = """
+        MATCH (s:Student {student_id: $student_id})
+        MATCH (q:Question {id: $question_id})
+        MERGE (r:Review {student_id: $student_id, question_id: $question_id})
+        ON CREATE SET r.created_at = datetime()
+        SET r.due_at = $due_at,
+            r.interval_days = $interval_days,
+            r.repetitions = $repetitions,
+            r.easiness = $easiness,
+            r.last_reviewed_at = $last_reviewed_at
+        MERGE (s)-[:HAS_REVIEW]->(r)
+        MERGE (r)-[:REVIEWS]->(q)
+        """
+        parameters = {
+            'student_id': review.student_id,
+            'question_id': review.question_id,
+            'due_at': review.due_at,
+            'interval_days': review.interval_days,
+            'repetitions': review.repetitions,
+            'easiness': review.easiness,
+            'last_reviewed_at': review.last_reviewed_at,
+        }
+        self.execute_write_query(query, parameters, query_name='review.upsert')
+
+    @by_student()
+    def find_due_for_student(self, student_id: str, due_before: datetime, limit: int = 20) -> List[Review]:
+        """
+        Get a student's reviews that are due, earliest first.
+
+        Args:
+            student_id: ID of the student
+            due_before: Reviews due at or before this time are returned
+            limit: Maximum number of reviews
+
+        Returns:
+            List of Review objects ordered by due time
+        """
+        query = f"""
+        MATCH (r:Review)
+        WHERE r.student_id = $student_id AND r.due_at <= $due_before
+        RETURN {REVIEW_PROJECTION}
+        ORDER BY r.due_at
+        LIMIT $limit
+        """
+        parameters = {'student_id': student_id, 'due_before': due_before, 'limit': limit}
+        results = self.execute_query(query, parameters, query_name='review.find_due_for_student')
+        return [_to_review(row) for row in results]
+
+    @across_shards(_earliest_due)
+    def find_due(self, due_before: datetime, limit: int = 100) -> List[Review]:
+        """
+        Get reviews due at or before a time across all students, earliest first.
+
+        Args:
+            due_before: Reviews due at or before this time are returned
+            limit: Maximum number of reviews
+
+        Returns:
+            List of Review objects ordered by due time
+        """
+        query = f"""
+        MATCH (r:Review)
+        WHERE r.due_at <= $due_before
+        RETURN {REVIEW_PROJECTION}
+        ORDER BY r.due_at
+        LIMIT $limit
+        """
+        parameters = {'due_before': due_before, 'limit': limit}
+        results = self.execute_query(query, parameters, query_name='review.find_due')
+        return [_to_review(row) for row in results]
+
+    @by_students()
+    def lease_due_for_students(
+        self,
+        student_ids: List[str],
+        due_before: datetime,
+        lease_until: datetime,
+        limit_per_student: int = 20
+    ) -> List[Review]:
+        """
+        Take the due reviews of many students in one round trip.
+
+        Taken reviews are pushed to ``lease_until`` so the next drain does not
+        hand them out again; grading a review reschedules it normally.
+
+        Args:
+            student_ids: Students in the cohort
+            due_before: Reviews due at or before this time are taken
+            lease_until: New due time of the taken reviews
+            limit_per_student: Maximum reviews taken per student
+
+        Returns:
+            Taken reviews with their original due times
+        """
+        query = f"""
+        UNWIND $student_ids AS student_id
+        CALL {{
+            WITH student_id
+            MATCH (r:Review)
+            WHERE r.student_id = student_id AND r.due_at <= $due_before
+            WITH r ORDER BY r.due_at LIMIT $limit_per_student
+            RETURN r
+        }}
+        WITH r, {REVIEW_PROJECTION}
+        SET r.due_at = $lease_until
+        RETURN student_id, question_id, due_at, interval_days, repetitions, easiness, last_reviewed_at
+        """
+        parameters = {
+            'student_ids': student_ids,
+            'due_before': due_before,
+            'lease_until': lease_until,
+            'limit_per_student': limit_per_student,
+        }
+        # Auto-commit like every other query here, but the taken rows are needed back
+        results = self.execute_query(query, parameters, query_name='review.lease_due_for_students')
+        return [_to_review(row) for row in results]
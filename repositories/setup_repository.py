@@ -1,51 +1,205 @@
 # repositories/setup_repository.py
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 
-from .base_repository import BaseRepository
+from .base_repository import BaseRepository, across_shards, replicated
 from core.exceptions import DataValidationError
+from core.schema import SchemaManager, load_declarations, schema_registry
+from config.settings import app_config
+from utils.ingest_validator import question_item_validator
 
 from neo4j import Transaction
 
 logger = logging.getLogger(__name__)
 
+schema_registry.index('concept_name_unique', 'Concept', 'name', unique=True)
+# Superseded by concept_name_unique, which is backed by its own index
+schema_registry.retire('concept_name_index')
+schema_registry.index('subconcept_name_unique', 'SubConcept', 'name', unique=True)
+schema_registry.index('solution_approach_name_unique', 'SolutionApproach', 'name', unique=True)
+schema_registry.query('setup.populate_question', 'Question', lookup=('id',))
+schema_registry.query('setup.populate_question', 'Concept', lookup=('name',))
+schema_registry.query('setup.populate_question', 'SubConcept', lookup=('name',))
+schema_registry.query('setup.populate_question', 'SolutionApproach', lookup=('name',))
+schema_registry.query('setup.create_vocabulary', 'Concept', lookup=('name',))
+schema_registry.query('setup.create_vocabulary', 'SubConcept', lookup=('name',))
+schema_registry.query('setup.create_solution_approaches', 'SolutionApproach', lookup=('name',))
+
+# Earlier loaders wrote question_title/question/substep_number and kept concepts
+# only as relationships; align existing nodes with the properties reads use.
+schema_registry.migration('question_property_names', """
+MATCH (q:Question)
+WHERE q.question_title IS NOT NULL OR q.question IS NOT NULL OR q.substep_number IS NOT NULL
+SET q.title = coalesce(q.title, q.question_title),
+    q.content = coalesce(q.content, q.question),
+    q.sub_step_number = coalesce(q.sub_step_number, q.substep_number)
+REMOVE q.question_title, q.question, q.substep_number
+""")
+schema_registry.migration('question_concept_lists', """
+MATCH (q:Question)
+WHERE q.sub_concepts IS NULL OR q.standard_concepts IS NULL
+SET q.sub_concepts = coalesce(q.sub_concepts, [(q)-[:INVOLVES_SUBCONCEPT]->(sc) | sc.name]),
+    q.standard_concepts = coalesce(q.standard_concepts, [(q)-[:INVOLVES_CONCEPT]->(c) | c.name])
+""")
+
+# Vocabulary MERGEs only write on create (and when an approach's explanation
+# changed), so re-running a load takes no write locks on existing nodes.
+_MERGE_CONCEPTS_QUERY = """
+UNWIND $names AS name
+MERGE (c:Concept {name: name})
+ON CREATE SET c.created_at = datetime(), c.updated_at = datetime()
+MERGE (sc:SubConcept {name: name})
+ON CREATE SET sc.created_at = datetime(), sc.updated_at = datetime()
+"""
+
+_MERGE_APPROACHES_QUERY = """
+UNWIND $approaches AS approach
+MERGE (sa:SolutionApproach {name: approach.name})
+ON CREATE SET sa.explanation = approach.explanation,
+    sa.created_at = datetime(),
+    sa.updated_at = datetime()
+WITH sa, approach
+WHERE sa.explanation IS NULL OR sa.explanation <> approach.explanation
+SET sa.explanation = approach.explanation,
+    sa.updated_at = datetime()
+"""
+
+# Per-item warnings beyond this are summarized; the full list is in the report
+_LOGGED_INVALID_ITEMS = 100
+
+def _concept_names(item: Dict[str, Any]) -> List[str]:
+    """Stripped sub-concept names of an item; they name both its Concept and SubConcept nodes."""
+    return [name.strip() for name in item.get('sub_concepts', []) if name and name.strip()]
+
+def _approaches(item: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(name, explanation) of an item's named solution approaches."""
+    approaches = []
+    for approach in item.get('solution_approaches', []):
+        name = approach.get('approach_name', '').strip()
+        if name:
+            approaches.append((name, approach.get('explanation', '').strip()))
+    return approaches
+
+def _quote_identifier(name: str) -> str:
+    """Backtick-quote a label or relationship type for use in Cypher text."""
+    return "`" + name.replace("`", "``") + "`"
+
+
+# Labels and relationship types of student data, which is partitioned across
+# shards; everything else is catalogue data, replicated to every shard
+SHARDED_LABELS = frozenset({'Student', 'Review', 'StepProgress', 'ConceptProgress'})
+SHARDED_RELATIONSHIPS = frozenset({
+    'ATTEMPTED', 'MASTERED', 'HAS_STEP_PROGRESS', 'HAS_CONCEPT_PROGRESS', 'HAS_REVIEW', 'REVIEWS'
+})
+
+
+def _merge_statistics(results: List[Dict[str, Any]], arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Sum partitioned counts across shards; replicated counts are the same on each."""
+    merged = {}
+    for section, sharded in (('nodes', SHARDED_LABELS), ('relationships', SHARDED_RELATIONSHIPS)):
+        counts: Dict[str, int] = {}
+        for result in results:
+            for name, count in result[section].items():
+                counts[name] = counts.get(name, 0) + count if name in sharded else max(counts.get(name, 0), count)
+        merged[section] = dict(sorted(counts.items(), key=lambda item: item[1], reverse=True))
+    return merged
+
 class SetupRepository(BaseRepository):
     """Repository for database schema setup and data population."""
 
+    @replicated
     def create_constraints_and_indexes(self) -> None:
         """
-        Create all necessary constraints and indexes for optimal performance.
+        Create all declared constraints and indexes and migrate legacy properties.
+        Declarations live next to the queries that use them (see core.schema).
         """
         logger.info("Setting up database constraints and indexes...")
-        
-        constraints_and_indexes = [
-            # Unique constraints
-            "CREATE CONSTRAINT student_id_unique IF NOT EXISTS FOR (s:Student) REQUIRE s.student_id IS UNIQUE",
-            "CREATE CONSTRAINT question_id_unique IF NOT EXISTS FOR (q:Question) REQUIRE q.id IS UNIQUE",
-            "CREATE CONSTRAINT concept_name_unique IF NOT EXISTS FOR (c:Concept) REQUIRE c.name IS UNIQUE",
-            "CREATE CONSTRAINT subconcept_name_unique IF NOT EXISTS FOR (sc:SubConcept) REQUIRE sc.name IS UNIQUE",
-            "CREATE CONSTRAINT solution_approach_name_unique IF NOT EXISTS FOR (sa:solution_approach) REQUIRE sa.name IS UNIQUE",
-            
-            # Performance indexes
-            "CREATE INDEX student_id_index IF NOT EXISTS FOR (s:Student) ON (s.student_id)",
-            "CREATE INDEX question_id_index IF NOT EXISTS FOR (q:Question) ON (q.id)",
-            "CREATE INDEX concept_name_index IF NOT EXISTS FOR (c:Concept) ON (c.name)",
-            "CREATE INDEX question_difficulty_index IF NOT EXISTS FOR (q:Question) ON (q.difficulty)",
-            "CREATE INDEX question_step_index IF NOT EXISTS FOR (q:Question) ON (q.step_number, q.sub_step_number, q.sequence_number)",
-            "CREATE INDEX student_last_active_index IF NOT EXISTS FOR (s:Student) ON (s.last_active)",
-        ]
-        
-        for query in constraints_and_indexes:
-            try:
-                self.execute_write_query(query)
-                logger.info(f"Successfully executed: {query[:50]}...")
-            except Exception as e:
-                logger.warning(f"Could not execute setup query: {e}")
+        SchemaManager(self.db_manager, load_declarations()).apply()
+
+    def collect_vocabulary(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Extract the distinct concept and solution-approach vocabulary of a load.
+
+        Args:
+            items: Validated question items
+
+        Returns:
+            {'concepts': sorted concept names, 'approaches': [{'name', 'explanation'}]}.
+            An approach named by several items keeps the last explanation, as a
+            question-by-question load would.
+        """
+        concepts = set()
+        approaches: Dict[str, str] = {}
+        for item in items:
+            concepts.update(_concept_names(item))
+            for name, explanation in _approaches(item):
+                approaches[name] = explanation
+        return {
+            'concepts': sorted(concepts),
+            'approaches': [{'name': name, 'explanation': approaches[name]} for name in sorted(approaches)],
+        }
+
+    @replicated
+    def create_vocabulary(self, vocabulary: Dict[str, Any], batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Phase one of a load: MERGE every vocabulary node exactly once.
+
+        Names are written in sorted order so concurrent loaders take node locks
+        in the same order. Existing nodes are left untouched unless an
+        approach's explanation changed.
+
+        Args:
+            vocabulary: Output of collect_vocabulary()
+            batch_size: Names per UNWIND round trip
+
+        Returns:
+            Number of concept names and approaches written
+        """
+        concepts = vocabulary['concepts']
+        approaches = vocabulary['approaches']
+        for i in range(0, len(concepts), batch_size):
+            self.execute_write_query(
+                _MERGE_CONCEPTS_QUERY, {'names': concepts[i:i + batch_size]},
+                query_name="setup.create_vocabulary"
+            )
+        for i in range(0, len(approaches), batch_size):
+            self.execute_write_query(
+                _MERGE_APPROACHES_QUERY, {'approaches': approaches[i:i + batch_size]},
+                query_name="setup.create_solution_approaches"
+            )
+        logger.info(f"Created vocabulary: {len(concepts)} concepts, {len(approaches)} solution approaches")
+        return {'concepts': len(concepts), 'approaches': len(approaches)}
+
+    def link_question_transaction(self, tx: Transaction, item: Dict[str, Any]) -> None:
+        """
+        Phase two of a load: write one question and link it to existing vocabulary.
+
+        Vocabulary nodes are only matched through their unique name indexes,
+        never written, so questions sharing a concept do not contend for it.
+        Call create_vocabulary() with the load's vocabulary first.
+
+        Args:
+            tx: Neo4j transaction object
+            item: Dictionary containing question data
+        """
+        try:
+            self._validate_question_data(item)
+            self._create_question_node(tx, item)
+            self._link_vocabulary(tx, item)
+            logger.debug(f"Successfully linked question: {item['id']}")
+
+        except Exception as e:
+            logger.error(f"Failed to link question {item.get('id', 'N/A')}: {e}")
+            raise
 
     def populate_question_and_concepts_transaction(self, tx: Transaction, item: Dict[str, Any]) -> None:
         """
         Transaction function to create a question and its related concepts.
         This method is designed to be used with execute_transaction.
+
+        Bulk loads should use create_vocabulary() followed by
+        link_question_transaction() instead; this writes the item's own
+        vocabulary in the same transaction.
         
         Args:
             tx: Neo4j transaction object
@@ -53,19 +207,11 @@ class SetupRepository(BaseRepository):
         """
         try:
             self._validate_question_data(item)
-            
-            # Create the main question node
+            vocabulary = self.collect_vocabulary([item])
+            tx.run(_MERGE_CONCEPTS_QUERY, {'names': vocabulary['concepts']})
+            tx.run(_MERGE_APPROACHES_QUERY, {'approaches': vocabulary['approaches']})
             self._create_question_node(tx, item)
-            
-            # Create and link standard concepts
-            self._create_standard_concepts(tx, item)
-            
-            # Create and link subconcepts
-            self._create_subconcepts(tx, item)
-            
-            # Create solution approaches
-            self._create_solution_approaches(tx, item)
-            
+            self._link_vocabulary(tx, item)
             logger.debug(f"Successfully populated question: {item['id']}")
             
         except Exception as e:
@@ -74,27 +220,26 @@ class SetupRepository(BaseRepository):
         
     def _validate_question_data(self, item: Dict[str, Any]) -> None:
         """
-        Validate that the question data contains all required fields.
+        Validate a question item's fields (presence, types and values).
         """
-        required_fields = ['id', 'question_title', 'question', 'difficulty', 
-                          'step_no', 'sub_step_no', 'sl_no']
-        
-        missing_fields = [field for field in required_fields if field not in item]
-        if missing_fields:
-            raise DataValidationError(f"Missing required fields: {missing_fields}")
+        errors = question_item_validator.check_item(item)
+        if errors:
+            raise DataValidationError(f"Invalid fields: {'; '.join(errors)}")
 
 
     def _create_question_node(self, tx: Transaction, item: Dict[str, Any]) -> None:
         """Create the main question node."""
         query = """
         MERGE (q:Question {id: $id})
-        SET q.question_title = $question_title,
-            q.question = $question,
+        SET q.title = $question_title,
+            q.content = $question,
             q.difficulty = $difficulty,
             q.step_number = $step_no,
             q.sub_step_number = $sub_step_no,
             q.sequence_number = $sl_no,
-            q.created_at = datetime(),
+            q.standard_concepts = $standard_concepts,
+            q.sub_concepts = $sub_concepts,
+            q.created_at = coalesce(q.created_at, datetime()),
             q.updated_at = datetime()
         """
         
@@ -105,105 +250,46 @@ class SetupRepository(BaseRepository):
             'difficulty': item['difficulty'],
             'step_no': item['step_no'],
             'sub_step_no': item['sub_step_no'],
-            'sl_no': item['sl_no']
+            'sl_no': item['sl_no'],
+            'standard_concepts': [name.strip() for name in item.get('standard_concepts', []) if name and name.strip()],
+            'sub_concepts': _concept_names(item)
         }
         
         tx.run(query, parameters)
         logger.debug(f"Created question node: {item['id']}")
 
-    def _create_standard_concepts(self, tx: Transaction, item: Dict[str, Any]) -> None:
-        """Create and link standard concepts to the question."""
-        concepts = item.get('sub_concepts', [])
-        if not concepts:
-            return
-            
-        for concept_name in concepts:
-            if concept_name and concept_name.strip():
-                # Create concept if it doesn't exist
-                concept_query = """
-                MERGE (c:Concept {name: $concept_name})
-                SET c.created_at = coalesce(c.created_at, datetime()),
-                    c.updated_at = datetime()
-                """
-                tx.run(concept_query, {'concept_name': concept_name.strip()})
-                
-                # Link question to concept
-                link_query = """
-                MATCH (q:Question {id: $question_id})
-                MATCH (c:Concept {name: $concept_name})
-                MERGE (q)-[:INVOLVES_CONCEPT]->(c)
-                """
-                tx.run(link_query, {
-                    'question_id': item['id'],
-                    'concept_name': concept_name.strip()
-                })
-                
-        logger.debug(f"Created {len(concepts)} concept links for question: {item['id']}")
-
-    def _create_subconcepts(self, tx: Transaction, item: Dict[str, Any]) -> None:
-        """Create and link subconcepts to the question."""
-        subconcepts = item.get('sub_concepts', [])
-        if not subconcepts:
-            return
-            
-        for subconcept_name in subconcepts:
-            if subconcept_name and subconcept_name.strip():
-                # Create subconcept if it doesn't exist
-                subconcept_query = """
-                MERGE (sc:SubConcept {name: $subconcept_name})
-                SET sc.created_at = coalesce(sc.created_at, datetime()),
-                    sc.updated_at = datetime()
-                """
-                tx.run(subconcept_query, {'subconcept_name': subconcept_name.strip()})
-                
-                # Link question to subconcept
-                link_query = """
-                MATCH (q:Question {id: $question_id})
-                MATCH (sc:SubConcept {name: $subconcept_name})
-                MERGE (q)-[:INVOLVES_SUBCONCEPT]->(sc)
-                """
-                tx.run(link_query, {
-                    'question_id': item['id'],
-                    'subconcept_name': subconcept_name.strip()
-                })
-                
-        logger.debug(f"Created {len(subconcepts)} subconcept links for question: {item['id']}")
-
-    def _create_solution_approaches(self, tx: Transaction, item: Dict[str, Any]) -> None:
-        """Create and link solution approaches to the question."""
-        approaches = item.get('solution_approaches', [])
-        if not approaches:
-            return
-
-        for approach in approaches:
-            approach_name = approach.get('approach_name', '').strip()
-            explanation = approach.get('explanation', '').strip()
-
-            if approach_name:
-                # Create or update the SolutionApproach node with name and explanation
-                approach_query = """
-                MERGE (sa:SolutionApproach {name: $approach_name})
-                SET sa.explanation = $explanation,
-                    sa.created_at = coalesce(sa.created_at, datetime()),
-                    sa.updated_at = datetime()
-                """
-                tx.run(approach_query, {
-                    'approach_name': approach_name,
-                    'explanation': explanation
-                })
-
-                # Link the question to the solution approach
-                link_query = """
-                MATCH (q:Question {id: $question_id})
-                MATCH (sa:SolutionApproach {name: $approach_name})
-                MERGE (q)-[:HAS_SOLUTION_APPROACH]->(sa)
-                """
-                tx.run(link_query, {
-                    'question_id': item['id'],
-                    'approach_name': approach_name
-                })
-
-        logger.debug(f"Created {len(approaches)} solution approach links for question: {item['id']}")
+    def _link_vocabulary(self, tx: Transaction, item: Dict[str, Any]) -> None:
+        """Link a question to its concepts, subconcepts and solution approaches."""
+        query = """
+        MATCH (q:Question {id: $question_id})
+        CALL {
+            WITH q
+            UNWIND $concepts AS name
+            MATCH (c:Concept {name: name})
+            MERGE (q)-[:INVOLVES_CONCEPT]->(c)
+            RETURN count(*) AS concepts
+        }
+        CALL {
+            WITH q
+            UNWIND $concepts AS name
+            MATCH (sc:SubConcept {name: name})
+            MERGE (q)-[:INVOLVES_SUBCONCEPT]->(sc)
+            RETURN count(*) AS subconcepts
+        }
+        CALL {
+            WITH q
+            UNWIND $approaches AS name
+            MATCH (sa:SolutionApproach {name: name})
+            MERGE (q)-[:HAS_SOLUTION_APPROACH]->(sa)
+            RETURN count(*) AS approaches
+        }
+        RETURN concepts, subconcepts, approaches
+        """
+        concepts = _concept_names(item)
+        approaches = [name for name, _ in _approaches(item)]
+        tx.run(query, {'question_id': item['id'], 'concepts': concepts, 'approaches': approaches})
+        logger.debug(f"Linked {len(concepts)} concepts and {len(approaches)} solution approaches "
+                     f"to question: {item['id']}")
 
     def _validate_data_items(self, data: List[Dict[str, Any]], validate_only: bool = False) -> Dict[str, Any]:
         """
@@ -214,27 +300,17 @@ class SetupRepository(BaseRepository):
             validate_only: If True, only validate structure without processing
             
         Returns:
-            Dictionary containing validation results
+            Dictionary containing validation results, including a per-item
+            'errors' list of {'index', 'id', 'errors'}
         """
-        valid_items = []
-        invalid_items = []
-        invalid_item_ids = []
-        
-        for item in data:
-            try:
-                self._validate_question_data(item)
-                valid_items.append(item)
-            except DataValidationError as e:
-                invalid_items.append(item)
-                invalid_item_ids.append(item.get('id', 'N/A'))
-                logger.warning(f"Invalid item {item.get('id', 'N/A')}: {e}")
-        
-        return {
-            'valid_items': valid_items,
-            'invalid_items': invalid_items,
-            'invalid_item_ids': invalid_item_ids
-        }
+        report = question_item_validator.validate(data, workers=app_config.ingest_validation_workers)
+        for entry in report['errors'][:_LOGGED_INVALID_ITEMS]:
+            logger.warning(f"Invalid item {entry['id']} (#{entry['index']}): {'; '.join(entry['errors'])}")
+        if len(report['errors']) > _LOGGED_INVALID_ITEMS:
+            logger.warning(f"... and {len(report['errors']) - _LOGGED_INVALID_ITEMS} more invalid items")
+        return report
 
+    @replicated
     def clear_all_data(self) -> None:
         """
         Clear all data from the database. Use with caution!
@@ -246,32 +322,56 @@ class SetupRepository(BaseRepository):
         ]
         
         for query in clear_queries:
-            self.execute_write_query(query)
+            self.execute_write_query(query, query_name='setup.clear_all_data')
             
         logger.info("Database cleared successfully")
 
+    @across_shards(_merge_statistics)
     def get_database_statistics(self) -> Dict[str, Any]:
         """
-        Get comprehensive statistics about the database contents.
-        """
-        stats_query = """
-        MATCH (n)
-        WITH labels(n) AS nodeLabels
-        UNWIND nodeLabels AS label
-        RETURN label, count(*) AS count
-        ORDER BY count DESC
-        """
-        
-        relationship_query = """
-        MATCH ()-[r]->()
-        RETURN type(r) AS relationship_type, count(r) AS count
-        ORDER BY count DESC
+        Get node counts per label and relationship counts per type.
+
+        Every count is a single-label or single-type aggregate with no
+        grouping keys, which Neo4j answers from its count store
+        (NodeCountFromCountStore / RelationshipCountFromCountStore) instead of
+        scanning the graph, so the cost depends on the number of labels and
+        types, not on the data.
         """
-        
-        node_stats = self.execute_query(stats_query)
-        relationship_stats = self.execute_query(relationship_query)
-        
+        labels = [row['label'] for row in self.execute_query(
+            "CALL db.labels() YIELD label RETURN label", query_name='setup.labels'
+        )]
+        relationship_types = [row['relationshipType'] for row in self.execute_query(
+            "CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType",
+            query_name='setup.relationship_types'
+        )]
+        if not labels and not relationship_types:
+            return {'nodes': {}, 'relationships': {}}
+
+        # Labels and types cannot be parameters, so each gets its own branch;
+        # the names come back as parameters so they are only quoted once.
+        # Counting before projecting them keeps the aggregation free of
+        # grouping keys, which the count-store operators require.
+        branches = []
+        parameters = {}
+        for i, label in enumerate(labels):
+            parameters[f'label_{i}'] = label
+            branches.append(
+                f"MATCH (n:{_quote_identifier(label)}) "
+                f"WITH count(n) AS count RETURN 'node' AS kind, $label_{i} AS name, count"
+            )
+        for i, relationship_type in enumerate(relationship_types):
+            parameters[f'type_{i}'] = relationship_type
+            branches.append(
+                f"MATCH ()-[r:{_quote_identifier(relationship_type)}]->() "
+                f"WITH count(r) AS count RETURN 'relationship' AS kind, $type_{i} AS name, count"
+            )
+        counts = self.execute_query(
+            "\nUNION ALL\n".join(branches), parameters, query_name='setup.count_store_statistics'
+        )
+
+        nodes = {row['name']: row['count'] for row in counts if row['kind'] == 'node'}
+        relationships = {row['name']: row['count'] for row in counts if row['kind'] == 'relationship'}
         return {
-            'nodes': {stat['label']: stat['count'] for stat in node_stats},
-            'relationships': {stat['relationship_type']: stat['count'] for stat in relationship_stats}
-        }
\ No newline at end of file
+            'nodes': dict(sorted(nodes.items(), key=lambda item: item[1], reverse=True)),
+            'relationships': dict(sorted(relationships.items(), key=lambda item: item[1], reverse=True))
+        }
@@ -1,16 +1,90 @@
 # repositories/student_repository.py
-from typing import Optional, List
+from datetime import datetime
+from itertools import chain, zip_longest
+from operator import attrgetter
+from typing import Any, Callable, Dict, Optional, List
 import logging
 
-from .base_repository import BaseRepository
+from .base_repository import BaseRepository, across_shards, by_student, by_students
 from models.student import Student
 from core.exceptions import StudentNotFoundError
+from core.invalidation_bus import STUDENT, invalidation_bus
+from core.logging_setup import hot_path_logger
+from core.schema import schema_registry
 
 logger = logging.getLogger(__name__)
+# Per-call messages, sampled (see core/logging_setup.py)
+hot_logger = hot_path_logger(__name__)
+
+schema_registry.index('student_id_unique', 'Student', 'student_id', unique=True)
+schema_registry.index('student_last_active_index', 'Student', 'last_active')
+# Superseded by student_id_unique, which is backed by its own index
+schema_registry.retire('student_id_index')
+schema_registry.query('student.create_or_update', 'Student', lookup=('student_id',))
+schema_registry.query('student.find_by_id', 'Student', lookup=('student_id',))
+schema_registry.query('student.upsert_batch', 'Student', lookup=('student_id',))
+for _query_name in ('student.mark_attempted', 'student.mark_mastered', 'student.mark_subconcepts_mastered'):
+    schema_registry.query(_query_name, 'Student', lookup=('student_id',))
+    schema_registry.query(_query_name, 'Question', lookup=('id',))
+schema_registry.query('student.mark_subconcepts_mastered', 'SubConcept', lookup=('name',))
+for _query_name in ('student.progress_summary', 'student.progress_summary_with_ids',
+                    'student.concept_progress', 'student.rebuild_progress', 'student.ranking_features'):
+    schema_registry.query(_query_name, 'Student', lookup=('student_id',))
+schema_registry.query('student.progress_drift', 'Student', order_by=('student_id',))
+schema_registry.query('student.find_active', 'Student', order_by=('last_active',))
+# Per-student aggregates are keyed by student_id so concurrent MERGEs cannot duplicate them
+schema_registry.index('step_progress_key', 'StepProgress', 'student_id', 'step_number', unique=True)
+schema_registry.index('concept_progress_key', 'ConceptProgress', 'student_id', 'concept', unique=True)
+schema_registry.query('student.mark_mastered', 'StepProgress', lookup=('student_id',))
+schema_registry.query('student.mark_mastered', 'ConceptProgress', lookup=('student_id',))
+
+
+# Merging per-shard results (see core/sharding.py)
+
+def _sum_counts(results: List[Dict[str, int]], arguments: Dict[str, Any]) -> Dict[str, int]:
+    return {key: sum(result[key] for result in results) for key in results[0]}
+
+
+def _interleave(results: List[List[str]], arguments: Dict[str, Any]) -> List[str]:
+    # Each shard's ids are most recent first; taking them in turns keeps that roughly across shards
+    merged = [student_id for student_id in chain.from_iterable(zip_longest(*results)) if student_id is not None]
+    return merged[:arguments['limit']]
+
+
+def _first_page(results: List[List[dict]], arguments: Dict[str, Any]) -> List[dict]:
+    rows = sorted(chain.from_iterable(results), key=lambda row: row['student_id'])
+    return rows[:arguments['limit']]
+
+
+def _nothing(results: List[None], arguments: Dict[str, Any]) -> None:
+    return None
 
 class StudentRepository(BaseRepository):
     """Repository for student-related database operations."""
 
+    def __init__(self, db_manager):
+        super().__init__(db_manager)
+        self._student_listeners: List[Callable[[str], None]] = []
+
+    def add_student_listener(self, listener: Callable[[str], None]) -> None:
+        """Register a callback invoked with the student_id after a student is written."""
+        self._student_listeners.append(listener)
+
+    def remove_student_listener(self, listener: Callable[[str], None]) -> None:
+        """Unregister a previously added student listener."""
+        if listener in self._student_listeners:
+            self._student_listeners.remove(listener)
+
+    def _notify_student_written(self, student_id: str) -> None:
+        for listener in self._student_listeners:
+            try:
+                listener(student_id)
+            except Exception as e:
+                logger.warning(f"Student listener failed for {student_id}: {e}")
+        # Listeners in other worker processes on this host
+        invalidation_bus.publish(STUDENT, student_id=student_id)
+
+    @by_student(attrgetter('student_id'))
     def create_or_update_student(self, student: Student) -> None:
         """Create a new student or update existing one."""
         query = """
@@ -33,8 +107,46 @@ class StudentRepository(BaseRepository):
         }
         
         logger.info(f"Creating/updating student: {student.student_id}")
-        self.execute_write_query(query, parameters)
+        self.execute_write_query(query, parameters, query_name='student.create_or_update')
+        self._notify_student_written(student.student_id)
+
+    @by_students(attrgetter('student_id'), merge=_sum_counts)
+    def upsert_students(self, students: List[Student]) -> Dict[str, int]:
+        """
+        Create or update a batch of students in one set-based write.
+
+        Unlike create_or_update_student, last_active is only set for new
+        students: a roster import says nothing about activity, and bumping it
+        would make every imported student look recently active.
+
+        Args:
+            students: Students to write; student ids must be unique within the batch
+
+        Returns:
+            Dictionary with 'created' and 'updated' counts
+        """
+        if not students:
+            return {'created': 0, 'updated': 0}
+        query = """
+        UNWIND $students AS row
+        OPTIONAL MATCH (existing:Student {student_id: row.student_id})
+        WITH row, existing IS NULL AS is_new
+        MERGE (s:Student {student_id: row.student_id})
+        ON CREATE SET
+            s.created_at = datetime(),
+            s.last_active = datetime()
+        SET s.name = row.name,
+            s.email = row.email
+        RETURN sum(CASE WHEN is_new THEN 1 ELSE 0 END) AS created, count(*) AS written
+        """
+        rows = [{'student_id': s.student_id, 'name': s.name, 'email': s.email} for s in students]
+        results = self.execute_query(query, {'students': rows}, query_name='student.upsert_batch')
+        created = results[0]['created'] if results else 0
+        for student in students:
+            self._notify_student_written(student.student_id)
+        return {'created': created, 'updated': len(students) - created}
 
+    @by_student()
     def find_student_by_id(self, student_id: str) -> Optional[Student]:
         """Retrieve student by ID."""
         query = """
@@ -43,8 +155,8 @@ class StudentRepository(BaseRepository):
                s.created_at as created_at, s.last_active as last_active
         """
         
-        logger.info(f"Finding student by ID: {student_id}")
-        results = self.execute_query(query, {'student_id': student_id})
+        hot_logger.info("Finding student by ID: %s", student_id)
+        results = self.execute_query(query, {'student_id': student_id}, query_name='student.find_by_id')
         
         if not results:
             return None
@@ -58,32 +170,90 @@ class StudentRepository(BaseRepository):
             last_active=data.get('last_active')
         )
 
-    def mark_question_as_attempted(self, student_id: str, question_id: str) -> None:
-        """Record that a student has attempted a question."""
+    @across_shards(_interleave)
+    def find_active_student_ids(self, since: datetime, limit: int = 10000) -> List[str]:
+        """
+        Get the ids of students active since a point in time, most recent first.
+
+        Args:
+            since: Lower bound on last_active
+            limit: Maximum number of ids
+
+        Returns:
+            List of student ids
+        """
+        query = """
+        MATCH (s:Student)
+        WHERE s.last_active >= $since
+        RETURN s.student_id as student_id
+        ORDER BY s.last_active DESC
+        LIMIT $limit
+        """
+        results = self.execute_query(query, {'since': since, 'limit': limit}, query_name='student.find_active')
+        return [row['student_id'] for row in results]
+
+    @by_student()
+    def mark_question_as_attempted(self, student_id: str, question_id: str) -> bool:
+        """
+        Record that a student has attempted a question.
+
+        Returns:
+            False if the student or the question does not exist (nothing is written)
+        """
+        # The counter only moves when the MERGE creates the edge, so repeated
+        # attempts of the same question are not double counted.
         query = """
         MATCH (s:Student {student_id: $student_id})
         MATCH (q:Question {id: $question_id})
         MERGE (s)-[r:ATTEMPTED]->(q)
+        ON CREATE SET s.attempted_count = coalesce(s.attempted_count, 0) + 1
         SET r.timestamp = datetime(), s.last_active = datetime()
+        RETURN true AS matched
         """
         
         parameters = {'student_id': student_id, 'question_id': question_id}
-        logger.info(f"Marking question {question_id} as attempted by student {student_id}")
-        self.execute_write_query(query, parameters)
+        hot_logger.info("Marking question %s as attempted by student %s", question_id, student_id)
+        # Auto-commit like the other writes, but whether the MATCHes found anything is needed back
+        return bool(self.execute_query(query, parameters, query_name='student.mark_attempted'))
 
+    @by_student()
     def mark_question_as_mastered(self, student_id: str, question_id: str) -> None:
-        """Record that a student has mastered a question."""
+        """
+        Record that a student has mastered a question.
+
+        The first mastery of a question also bumps the student's mastered
+        counter and the per-step and per-concept aggregates read by
+        get_student_progress_summary().
+        """
+        # Like mark_question_as_attempted, the counters only move when the MERGE
+        # creates the edge (a marker set ON CREATE), not on a separate existence
+        # check that two concurrent first masteries could both pass.
         query = """
         MATCH (s:Student {student_id: $student_id})
         MATCH (q:Question {id: $question_id})
         MERGE (s)-[r:MASTERED]->(q)
+        ON CREATE SET r.first_mastery = true
         SET r.timestamp = datetime(), s.last_active = datetime()
+        WITH s, q, r, coalesce(r.first_mastery, false) AS first_mastery
+        REMOVE r.first_mastery
+        WITH s, q, first_mastery
+        WHERE first_mastery
+        SET s.mastered_count = coalesce(s.mastered_count, 0) + 1
+        MERGE (step:StepProgress {student_id: s.student_id, step_number: q.step_number})
+        MERGE (s)-[:HAS_STEP_PROGRESS]->(step)
+        SET step.mastered = coalesce(step.mastered, 0) + 1
+        WITH s, q
+        UNWIND coalesce(q.sub_concepts, []) AS concept_name
+        MERGE (concept:ConceptProgress {student_id: s.student_id, concept: concept_name})
+        MERGE (s)-[:HAS_CONCEPT_PROGRESS]->(concept)
+        SET concept.mastered = coalesce(concept.mastered, 0) + 1
         """
         
         parameters = {'student_id': student_id, 'question_id': question_id}
-        logger.info(f"Marking question {question_id} as mastered by student {student_id}")
-        self.execute_write_query(query, parameters)
+        hot_logger.info("Marking question %s as mastered by student %s", question_id, student_id)
+        self.execute_write_query(query, parameters, query_name='student.mark_mastered')
 
+    @by_student()
     def mark_subconcepts_as_mastered(self, student_id: str, question_id: str) -> None:
         """Mark all subconcepts of a question as mastered by the student."""
         query = """
@@ -93,27 +263,222 @@ class StudentRepository(BaseRepository):
         UNWIND subconcept_names AS subconcept_name
         MATCH (sc:SubConcept {name: subconcept_name})
         MERGE (s)-[:MASTERED]->(sc)
+        ON CREATE SET s.mastered_concepts_count = coalesce(s.mastered_concepts_count, 0) + 1
         SET s.last_active = datetime()
         """
         
         parameters = {'student_id': student_id, 'question_id': question_id}
-        logger.info(f"Marking subconcepts of question {question_id} as mastered by student {student_id}")
-        self.execute_write_query(query, parameters)
+        hot_logger.info("Marking subconcepts of question %s as mastered by student %s", question_id, student_id)
+        self.execute_write_query(query, parameters, query_name='student.mark_subconcepts_mastered')
+
+    @by_student()
+    def get_student_progress_summary(self, student_id: str, include_question_ids: bool = False) -> dict:
+        """
+        Get the progress summary for a student.
 
-    def get_student_progress_summary(self, student_id: str) -> dict:
-        """Get comprehensive progress summary for a student."""
+        Counts and per-step aggregates are read from counters maintained by the
+        mark_* methods, so the cost does not grow with the student's history.
+
+        Args:
+            student_id: ID of the student
+            include_question_ids: Also list the attempted and mastered question ids
+                (linear in the number of attempts)
+
+        Returns:
+            Summary dict, or an empty dict if the student does not exist
+        """
         query = """
         MATCH (s:Student {student_id: $student_id})
-        OPTIONAL MATCH (s)-[:ATTEMPTED]->(attempted:Question)
-        OPTIONAL MATCH (s)-[:MASTERED]->(mastered:Question)
-        OPTIONAL MATCH (s)-[:MASTERED]->(mastered_concepts:Concept)
         RETURN s.student_id as student_id,
-               count(DISTINCT attempted) as attempted_count,
-               count(DISTINCT mastered) as mastered_count,
-               count(DISTINCT mastered_concepts) as mastered_concepts_count,
-               collect(DISTINCT attempted.id) as attempted_questions,
-               collect(DISTINCT mastered.id) as mastered_questions
+               coalesce(s.attempted_count, 0) as attempted_count,
+               coalesce(s.mastered_count, 0) as mastered_count,
+               coalesce(s.mastered_concepts_count, 0) as mastered_concepts_count,
+               [(s)-[:HAS_STEP_PROGRESS]->(p:StepProgress) |
+                   {step_number: p.step_number, mastered: p.mastered}] as step_progress
         """
-        
-        results = self.execute_query(query, {'student_id': student_id})
-        return results[0] if results else {}
\ No newline at end of file
+        query_name = 'student.progress_summary'
+        if include_question_ids:
+            query += """,
+               [(s)-[:ATTEMPTED]->(a:Question) | a.id] as attempted_questions,
+               [(s)-[:MASTERED]->(m:Question) | m.id] as mastered_questions
+        """
+            query_name = 'student.progress_summary_with_ids'
+
+        results = self.execute_query(query, {'student_id': student_id}, query_name=query_name)
+        if not results:
+            return {}
+        summary = dict(results[0])
+        summary['step_progress'] = sorted(
+            summary['step_progress'], key=lambda step: (step['step_number'] is None, step['step_number'])
+        )
+        return summary
+
+    @by_student()
+    def get_concept_progress(self, student_id: str) -> dict:
+        """
+        Get the number of mastered questions per sub-concept for a student.
+
+        Args:
+            student_id: ID of the student
+
+        Returns:
+            Mapping of concept name to mastered question count
+        """
+        query = """
+        MATCH (s:Student {student_id: $student_id})-[:HAS_CONCEPT_PROGRESS]->(c:ConceptProgress)
+        RETURN c.concept as concept, c.mastered as mastered
+        """
+        results = self.execute_query(query, {'student_id': student_id}, query_name='student.concept_progress')
+        return {row['concept']: row['mastered'] for row in results}
+
+    @by_student()
+    def get_ranking_features(self, student_id: str, window: int = 20) -> dict:
+        """
+        Get the inputs of the difficulty-adaptive ranking in one round trip.
+
+        Args:
+            student_id: ID of the student
+            window: Number of most recent attempts the success rate is taken over
+
+        Returns:
+            Dict with 'recent_attempts', 'recent_successes' and 'mastered_concepts',
+            or an empty dict if the student does not exist
+        """
+        query = """
+        MATCH (s:Student {student_id: $student_id})
+        CALL {
+            WITH s
+            OPTIONAL MATCH (s)-[a:ATTEMPTED]->(q:Question)
+            WITH s, q, a ORDER BY a.timestamp DESC LIMIT $window
+            RETURN count(q) AS recent_attempts,
+                   sum(CASE WHEN q IS NOT NULL AND EXISTS { (s)-[:MASTERED]->(q) } THEN 1 ELSE 0 END)
+                       AS recent_successes
+        }
+        RETURN recent_attempts, recent_successes,
+               [(s)-[:HAS_CONCEPT_PROGRESS]->(c:ConceptProgress) | c.concept] AS mastered_concepts
+        """
+        parameters = {'student_id': student_id, 'window': window}
+        results = self.execute_query(query, parameters, query_name='student.ranking_features')
+        return results[0] if results else {}
+
+    @across_shards(_first_page)
+    def find_progress_counter_drift(self, after_student_id: str = "", limit: int = 500) -> List[dict]:
+        """
+        Compare stored progress counters with the edges they summarize.
+
+        Students are paged in student_id order so the whole population can be
+        verified in bounded batches.
+
+        Args:
+            after_student_id: Exclusive lower bound of the page
+            limit: Page size
+
+        Returns:
+            One row per student in the page with 'student_id' and a 'drifted' flag
+        """
+        query = """
+        MATCH (s:Student)
+        WHERE s.student_id > $after_student_id
+        WITH s ORDER BY s.student_id LIMIT $limit
+        WITH s,
+             COUNT { (s)-[:ATTEMPTED]->(:Question) } AS attempted,
+             COUNT { (s)-[:MASTERED]->(:Question) } AS mastered,
+             COUNT { (s)-[:MASTERED]->(:SubConcept) } AS mastered_concepts,
+             reduce(total = 0, step IN [(s)-[:HAS_STEP_PROGRESS]->(p:StepProgress) | p.mastered] |
+                    total + step) AS step_total,
+             reduce(total = 0, concept IN [(s)-[:HAS_CONCEPT_PROGRESS]->(c:ConceptProgress) | c.mastered] |
+                    total + concept) AS concept_total,
+             reduce(total = 0, concepts IN [(s)-[:MASTERED]->(q:Question) | size(coalesce(q.sub_concepts, []))] |
+                    total + concepts) AS concept_expected,
+             [(s)-[:HAS_STEP_PROGRESS]->(p:StepProgress) | p.step_number] AS steps,
+             [(s)-[:HAS_CONCEPT_PROGRESS]->(c:ConceptProgress) | c.concept] AS concepts
+        // Duplicate aggregate nodes can split a correct total, so compare node and key counts too
+        WITH s, attempted, mastered, mastered_concepts, step_total, concept_total, concept_expected,
+             size(steps) <> size(reduce(seen = [], key IN steps | CASE WHEN key IN seen THEN seen ELSE seen + key END))
+               OR size(concepts) <> size(reduce(seen = [], key IN concepts |
+                                                CASE WHEN key IN seen THEN seen ELSE seen + key END)) AS duplicated
+        RETURN s.student_id as student_id,
+               coalesce(s.attempted_count, 0) <> attempted
+                 OR coalesce(s.mastered_count, 0) <> mastered
+                 OR coalesce(s.mastered_concepts_count, 0) <> mastered_concepts
+                 OR step_total <> mastered
+                 OR concept_total <> concept_expected
+                 OR duplicated as drifted
+        ORDER BY student_id
+        """
+        parameters = {'after_student_id': after_student_id, 'limit': limit}
+        return self.execute_query(query, parameters, query_name='student.progress_drift')
+
+    @by_students(merge=_nothing)
+    def rebuild_progress_counters(self, student_ids: List[str]) -> None:
+        """
+        Recompute progress counters and aggregates from the student's edges.
+
+        Args:
+            student_ids: Students whose counters should be rebuilt
+        """
+        query = """
+        UNWIND $student_ids AS student_id
+        MATCH (s:Student {student_id: student_id})
+        SET s.attempted_count = COUNT { (s)-[:ATTEMPTED]->(:Question) },
+            s.mastered_count = COUNT { (s)-[:MASTERED]->(:Question) },
+            s.mastered_concepts_count = COUNT { (s)-[:MASTERED]->(:SubConcept) }
+        WITH s
+        CALL {
+            WITH s
+            OPTIONAL MATCH (s)-[:HAS_STEP_PROGRESS|HAS_CONCEPT_PROGRESS]->(old)
+            DETACH DELETE old
+        }
+        CALL {
+            WITH s
+            MATCH (s)-[:MASTERED]->(q:Question)
+            WITH s, q.step_number AS step_number, count(q) AS mastered
+            CREATE (s)-[:HAS_STEP_PROGRESS]->(:StepProgress {
+                student_id: s.student_id, step_number: step_number, mastered: mastered
+            })
+        }
+        CALL {
+            WITH s
+            MATCH (s)-[:MASTERED]->(q:Question)
+            UNWIND coalesce(q.sub_concepts, []) AS concept_name
+            WITH s, concept_name, count(q) AS mastered
+            CREATE (s)-[:HAS_CONCEPT_PROGRESS]->(:ConceptProgress {
+                student_id: s.student_id, concept: concept_name, mastered: mastered
+            })
+        }
+        """
+        self.execute_write_query(query, {'student_ids': student_ids}, query_name='student.rebuild_progress')
+
+    def repair_progress_counters(self, batch_size: int = 500, rebuild_all: bool = False) -> dict:
+        """
+        Verify every student's progress counters and rebuild the ones that drifted.
+
+        Args:
+            batch_size: Students checked per query
+            rebuild_all: Rebuild every student instead of only drifted ones
+
+        Returns:
+            Dict with 'checked', 'drifted' and 'rebuilt' counts and a sample of drifted ids
+        """
+        report = {'checked': 0, 'drifted': 0, 'rebuilt': 0, 'drifted_sample': []}
+        after = ""
+        while True:
+            rows = self.find_progress_counter_drift(after, batch_size)
+            if not rows:
+                break
+            after = rows[-1]['student_id']
+            drifted = [row['student_id'] for row in rows if row['drifted']]
+            report['checked'] += len(rows)
+            report['drifted'] += len(drifted)
+            report['drifted_sample'].extend(drifted[:max(0, 20 - len(report['drifted_sample']))])
+            to_rebuild = [row['student_id'] for row in rows] if rebuild_all else drifted
+            if to_rebuild:
+                self.rebuild_progress_counters(to_rebuild)
+                report['rebuilt'] += len(to_rebuild)
+            if len(rows) < batch_size:
+                break
+        logger.info(
+            f"Progress counter repair checked {report['checked']} students, "
+            f"{report['drifted']} drifted, {report['rebuilt']} rebuilt"
+        )
+        return report
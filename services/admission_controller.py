@@ -0,0 +1,178 @@
+#services/admission_controller.py
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from core.exceptions import ServiceOverloadedError
+from core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """
+    Bounds the concurrent database work of the recommendation path.
+
+    At most ``max_concurrent`` admitted calls run at once; up to
+    ``max_queue`` more wait for a slot. A call is shed instead of queued
+    when the queue is full, when its deadline has already passed (e.g. it
+    sat in the API's executor queue), or when the expected wait (its queue
+    position times the recent mean service time) would overrun the
+    deadline. Waiting calls give up at their deadline.
+
+    The controller also tracks database health: report_failure() marks
+    the database down for ``unhealthy_cooldown`` seconds, after which one
+    caller probes ``health_check`` before traffic is let through again.
+    """
+
+    # Weight of the newest sample in the mean service time
+    _SMOOTHING = 0.2
+
+    def __init__(
+        self,
+        max_concurrent: int = 16,
+        max_queue: int = 64,
+        timeout_seconds: float = 2.0,
+        health_check: Optional[Callable[[], bool]] = None,
+        unhealthy_cooldown: float = 5.0
+    ):
+        if max_concurrent < 1 or max_queue < 0:
+            raise ValueError("max_concurrent must be at least 1 and max_queue at least 0")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.health_check = health_check
+        self.unhealthy_cooldown = unhealthy_cooldown
+        self._slots = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._service_time = 0.0
+        self._unhealthy_until = 0.0
+        self._unhealthy = False
+        self._probing = False
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_deadline = 0
+        self.degraded = 0
+        self.failures = 0
+        self.max_wait = 0.0
+
+    def deadline(self) -> float:
+        """A time.monotonic() deadline ``timeout_seconds`` from now."""
+        return time.monotonic() + self.timeout_seconds
+
+    @contextmanager
+    def admit(self, deadline: Optional[float] = None) -> Iterator[None]:
+        """
+        Hold one concurrency slot for the duration of the block.
+
+        Args:
+            deadline: time.monotonic() value after which the caller no longer
+                wants an answer; defaults to ``timeout_seconds`` from now
+
+        Raises:
+            ServiceOverloadedError: If the call is shed
+        """
+        if deadline is None:
+            deadline = self.deadline()
+        arrived = time.monotonic()
+        with self._slots:
+            if arrived >= deadline:
+                self.shed_deadline += 1
+                raise ServiceOverloadedError("Request deadline passed before it was admitted")
+            if self._active >= self.max_concurrent:
+                if self._waiting >= self.max_queue:
+                    self.shed_queue_full += 1
+                    raise ServiceOverloadedError("Admission queue is full")
+                expected_wait = (self._waiting + 1) / self.max_concurrent * self._service_time
+                if arrived + expected_wait > deadline:
+                    self.shed_deadline += 1
+                    raise ServiceOverloadedError(f"Expected wait of {expected_wait * 1000:.0f}ms exceeds the deadline")
+                self._waiting += 1
+                try:
+                    with tracer.span('admission.wait', queued=self._waiting):
+                        while self._active >= self.max_concurrent:
+                            remaining = deadline - time.monotonic()
+                            if remaining <= 0:
+                                self.shed_deadline += 1
+                                raise ServiceOverloadedError("Request deadline passed while queued")
+                            self._slots.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._active += 1
+            self.admitted += 1
+            started = time.monotonic()
+            self.max_wait = max(self.max_wait, started - arrived)
+
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            with self._slots:
+                self._active -= 1
+                if self._service_time:
+                    self._service_time += self._SMOOTHING * (elapsed - self._service_time)
+                else:
+                    self._service_time = elapsed
+                self._slots.notify()
+
+    def available(self) -> bool:
+        """
+        Whether the database should be used, per the last failure and probe.
+
+        Once the cooldown after a failure has passed, exactly one caller runs
+        ``health_check``; the others keep answering False until it succeeds.
+        """
+        with self._slots:
+            if not self._unhealthy:
+                return True
+            if self._probing or time.monotonic() < self._unhealthy_until:
+                return False
+            self._probing = True
+        healthy = False
+        try:
+            healthy = self.health_check() if self.health_check is not None else True
+        except Exception as e:
+            logger.warning(f"Database health probe failed: {e}")
+        with self._slots:
+            self._probing = False
+            if healthy:
+                self._unhealthy = False
+                logger.info("Database is healthy again; leaving degraded mode")
+            else:
+                self._unhealthy_until = time.monotonic() + self.unhealthy_cooldown
+        return healthy
+
+    def report_failure(self, error: Exception) -> None:
+        """Mark the database down for ``unhealthy_cooldown`` seconds."""
+        with self._slots:
+            self.failures += 1
+            if not self._unhealthy:
+                logger.warning(f"Database call failed, degrading for {self.unhealthy_cooldown}s: {error}")
+            self._unhealthy = True
+            self._unhealthy_until = time.monotonic() + self.unhealthy_cooldown
+
+    def record_degraded(self) -> None:
+        """Count a response served from the fallback."""
+        with self._slots:
+            self.degraded += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._slots:
+            return {
+                'in_flight': self._active,
+                'queued': self._waiting,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'admitted': self.admitted,
+                'shed': self.shed_queue_full + self.shed_deadline,
+                'shed_queue_full': self.shed_queue_full,
+                'shed_deadline': self.shed_deadline,
+                'degraded': self.degraded,
+                'failures': self.failures,
+                'database_available': not self._unhealthy,
+                'mean_service_ms': round(self._service_time * 1000, 2),
+                'max_wait_ms': round(self.max_wait * 1000, 2),
+            }
@@ -0,0 +1,136 @@
+#services/curriculum_fallback.py
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from core.invalidation_bus import CATALOGUE, invalidation_bus
+from repositories.question_repository import QuestionRepository
+from models.question import Question
+
+logger = logging.getLogger(__name__)
+
+# Seconds between reload attempts while the list is stale (e.g. the database is down)
+_RETRY_SECONDS = 5.0
+
+
+class CurriculumFallback:
+    """
+    The opening of the curriculum, cached for degraded recommendations.
+
+    Holds the first ``size`` questions in curriculum order. When the
+    database is saturated or down, a student is offered the first of them
+    they are not known to have mastered, which needs no database access.
+    Between start() and stop() a background thread reloads the list after
+    ``ttl_seconds`` or a catalogue change, off the request path; a failed
+    reload keeps the previous list.
+    """
+
+    def __init__(self, question_repo: QuestionRepository, size: int = 200, ttl_seconds: float = 300.0):
+        self.question_repo = question_repo
+        self.size = size
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._questions: Tuple[Question, ...] = ()
+        self._loaded_at: Optional[float] = None
+        self._refreshing = False
+        self.refreshes = 0
+        self.failed_refreshes = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background reloader and follow catalogue changes from other workers."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        invalidation_bus.subscribe(CATALOGUE, self._on_catalogue_change)
+        self._thread = threading.Thread(target=self._run, name="curriculum-fallback", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background reloader and unsubscribe from the invalidation bus."""
+        invalidation_bus.unsubscribe(CATALOGUE, self._on_catalogue_change)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _on_catalogue_change(self, event: Dict[str, Any]) -> None:
+        self.invalidate()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh_if_stale()
+            loaded_at = self._loaded_at
+            if loaded_at is None:
+                delay = min(self.ttl_seconds, _RETRY_SECONDS)
+            else:
+                delay = self.ttl_seconds - (time.monotonic() - loaded_at)
+            self._wake.wait(max(delay, 0.1))
+            self._wake.clear()
+
+    def refresh(self) -> bool:
+        """
+        Reload the list from the database.
+
+        Returns:
+            True if the list was reloaded
+        """
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+        try:
+            questions = self.question_repo.get_all_questions(limit=self.size)
+        except Exception as e:
+            logger.warning(f"Could not reload the curriculum fallback, keeping {len(self._questions)} questions: {e}")
+            with self._lock:
+                self.failed_refreshes += 1
+                self._refreshing = False
+            return False
+        with self._lock:
+            self._questions = tuple(questions)
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+            self._refreshing = False
+        return True
+
+    def refresh_if_stale(self) -> None:
+        """Reload the list if it was never loaded or is older than the TTL."""
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > self.ttl_seconds:
+            self.refresh()
+
+    def invalidate(self) -> None:
+        """Reload soon (the current list stays usable until then)."""
+        with self._lock:
+            self._loaded_at = None
+        self._wake.set()
+
+    def __len__(self) -> int:
+        return len(self._questions)
+
+    def next_question(self, mastered_question_ids: Iterable[str] = ()) -> Optional[Question]:
+        """
+        The first cached question not in ``mastered_question_ids``.
+
+        Returns:
+            The question, or None if the list is empty or entirely mastered
+        """
+        excluded = set(mastered_question_ids)
+        for question in self._questions:
+            if question.id not in excluded:
+                return question
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'questions': len(self._questions),
+                'age_seconds': round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+                'refreshes': self.refreshes,
+                'failed_refreshes': self.failed_refreshes,
+            }
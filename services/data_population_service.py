@@ -1,24 +1,127 @@
 # services/data_population_service.py
+import hashlib
 import json
 import logging
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Optional
 from pathlib import Path
 
 from core.database import DatabaseManager
+from core.invalidation_bus import CATALOGUE, invalidation_bus
+from core.profiling import profiled
+from core.schema import load_declarations
+from repositories.catalogue_repository import CatalogueRepository
 from repositories.setup_repository import SetupRepository
+from services.statistics_service import StatisticsService
+from config.settings import app_config
 from core.exceptions import DataValidationError
+from utils.ingest_validator import question_item_validator
 
 logger = logging.getLogger(__name__)
 
+@profiled
 class DataPopulationService:
     """
     Service for populating the graph database from external data sources.
     Handles data loading, validation, and batch processing.
     """
     
-    def __init__(self, db_manager: DatabaseManager, setup_repo: SetupRepository):
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        setup_repo: SetupRepository,
+        catalogue_repo: Optional[CatalogueRepository] = None,
+        statistics: Optional[StatisticsService] = None
+    ):
         self.db_manager = db_manager
         self.setup_repo = setup_repo
+        self.catalogue_repo = catalogue_repo or CatalogueRepository(db_manager)
+        self.statistics = statistics or StatisticsService(
+            setup_repo, app_config.stats_cache_ttl, app_config.stats_refresh_interval
+        )
+
+    def get_catalogue_status(self, file_path: str) -> Dict[str, Any]:
+        """
+        Compare the loaded catalogue's version stamp with the source file and schema.
+
+        The file is only hashed when its size or modification time differ from
+        the stamp, so an unchanged deployment checks in one round trip.
+        
+        Args:
+            file_path: Path to the JSON file containing question data
+            
+        Returns:
+            Dictionary with 'current' (bool), 'reason' and the stored stamp
+        """
+        stamp = self.catalogue_repo.get_version()
+        schema_version = load_declarations().version()
+        status = {'current': False, 'stamp': stamp, 'schema_version': schema_version}
+
+        if stamp is None:
+            status['reason'] = "no catalogue has been loaded"
+            return status
+        if stamp.get('schema_version') != schema_version:
+            status['reason'] = f"schema changed ({stamp.get('schema_version')} -> {schema_version})"
+            return status
+
+        stat = os.stat(file_path)
+        if stamp.get('source_size') == stat.st_size and stamp.get('source_mtime') == stat.st_mtime:
+            status.update(current=True, reason="source size and mtime match")
+            return status
+
+        source_hash = self._hash_file(file_path)
+        status['source_hash'] = source_hash
+        if source_hash == stamp.get('source_hash'):
+            status.update(current=True, reason="source hash matches")
+        else:
+            status['reason'] = "source file changed"
+        return status
+
+    def populate_if_changed(self, file_path: str, batch_size: int = 100, force: bool = False) -> Dict[str, Any]:
+        """
+        Ingest the file only if the catalogue stamp says it changed, then re-stamp.
+        
+        Args:
+            file_path: Path to the JSON file containing question data
+            batch_size: Number of items to process in each batch
+            force: Ingest even when the catalogue is current
+            
+        Returns:
+            Processing statistics, or {'skipped': True, ...} when nothing changed
+        """
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"Data file not found: {file_path}")
+
+        status = self.get_catalogue_status(file_path)
+        if status['current'] and not force:
+            logger.info(f"Catalogue is current ({status['reason']}); skipping ingest")
+            return {'skipped': True, 'reason': status['reason']}
+
+        logger.info(f"Catalogue needs ingest: {status.get('reason', 'forced')}")
+        stats = self.populate_from_json_file(file_path, batch_size)
+
+        if stats['failed_items']:
+            logger.warning(f"{stats['failed_items']} items failed; catalogue version not stamped")
+            return stats
+
+        stat = os.stat(file_path)
+        self.catalogue_repo.stamp_version(
+            source_hash=status.get('source_hash') or self._hash_file(file_path),
+            source_size=stat.st_size,
+            source_mtime=stat.st_mtime,
+            schema_version=status['schema_version'],
+            item_count=stats['processed_items'],
+        )
+        return stats
+
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        """SHA-256 of a file, read in chunks."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
 
     def populate_from_json_file(self, file_path: str, batch_size: int = 100) -> Dict[str, Any]:
         """
@@ -124,6 +227,11 @@ class DataPopulationService:
         
         # Process valid items in batches
         valid_data = validation_result['valid_items']
+
+        # Phase one: every distinct concept/approach is written once, up front,
+        # so the per-question transactions below only match vocabulary nodes
+        vocabulary = self.setup_repo.collect_vocabulary(valid_data)
+        vocabulary_counts = self.setup_repo.create_vocabulary(vocabulary)
         
         for i in range(0, len(valid_data), batch_size):
             batch = valid_data[i:i + batch_size]
@@ -136,13 +244,18 @@ class DataPopulationService:
             logger.info(f"Processed batch {i//batch_size + 1}: "
                        f"{batch_stats['processed']}/{len(batch)} items successful")
 
+        self.statistics.invalidate()
+        if processed_items:
+            invalidation_bus.publish(CATALOGUE, processed_items=processed_items)
+
         return {
             'total_items': total_items,
             'processed_items': processed_items,
             'failed_items': failed_items,
             'invalid_items': len(validation_result['invalid_items']),
             'failed_item_ids': failed_item_ids,
-            'invalid_item_ids': validation_result['invalid_item_ids']
+            'invalid_item_ids': validation_result['invalid_item_ids'],
+            'vocabulary': vocabulary_counts
         }
 
     def _process_batch(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -153,9 +266,9 @@ class DataPopulationService:
         
         for item in batch:
             try:
-                # Process each item in its own transaction
+                # Phase two: each item in its own transaction, linking to the vocabulary
                 self.db_manager.execute_transaction(
-                    self.setup_repo.populate_question_and_concepts_transaction,
+                    self.setup_repo.link_question_transaction,
                     item
                 )
                 processed += 1
@@ -188,37 +301,19 @@ class DataPopulationService:
 
     def _validate_item_fields(self, item: Dict[str, Any]) -> None:
         """Validate individual item fields for correct types and values."""
-        
-        # Validate ID is not empty
-        if not item.get('id') or not str(item['id']).strip():
-            raise DataValidationError("ID cannot be empty")
-        
-        # Validate numeric fields
-        numeric_fields = ['step_no', 'sub_step_no', 'sl_no']
-        for field in numeric_fields:
-            if not isinstance(item.get(field), (int, float)) or item[field] < 0:
-                raise DataValidationError(f"Field {field} must be a non-negative number")
-        
-        # Validate string fields are not empty
-        string_fields = ['question_title', 'question']
-        for field in string_fields:
-            if not item.get(field) or not str(item[field]).strip():
-                raise DataValidationError(f"Field {field} cannot be empty")
-        
-        # Validate list fields if present
-        list_fields = ['standard_concepts', 'sub_concepts', 'solution_approaches']
-        for field in list_fields:
-            if field in item and not isinstance(item[field], list):
-                raise DataValidationError(f"Field {field} must be a list")
-        
-        # Validate solution approaches structure
-        if 'solution_approaches' in item:
-            for i, approach in enumerate(item['solution_approaches']):
-                if not isinstance(approach, dict):
-                    raise DataValidationError(f"Solution approach {i} must be a dictionary")
-                if 'approach_name' not in approach:
-                    raise DataValidationError(f"Solution approach {i} missing 'approach_name'")
-
-    def get_population_summary(self) -> Dict[str, Any]:
-        """Get a summary of the current database population."""
-        return self.setup_repo.get_database_statistics()
\ No newline at end of file
+        errors = question_item_validator.check_item(item)
+        if errors:
+            raise DataValidationError(f"Invalid fields: {'; '.join(errors)}")
+
+    def get_population_summary(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get a summary of the current database population.
+
+        Args:
+            max_age: Maximum acceptable age of cached counts in seconds
+                (defaults to STATS_CACHE_TTL; 0 forces a fresh read)
+
+        Returns:
+            Dictionary with per-label node and per-type relationship counts
+        """
+        return self.statistics.get(max_age)
\ No newline at end of file
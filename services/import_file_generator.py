@@ -0,0 +1,247 @@
+# services/import_file_generator.py
+import csv
+import hashlib
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from core.exceptions import DataValidationError
+from core.schema import load_declarations
+from repositories.catalogue_repository import CATALOGUE_KEY
+from utils.ingest_validator import question_item_validator
+from utils.json_stream import iter_json_items
+
+logger = logging.getLogger(__name__)
+
+# Separates the elements of array columns (standard_concepts/sub_concepts)
+ARRAY_DELIMITER = '|'
+
+# file name -> (label or relationship type, header)
+NODE_FILES = {
+    'questions.csv': ('Question', [
+        'id:ID(Question)', 'title', 'content', 'difficulty', 'step_number:long', 'sub_step_number:long',
+        'sequence_number:long', 'standard_concepts:string[]', 'sub_concepts:string[]',
+        'created_at:datetime', 'updated_at:datetime',
+    ]),
+    'concepts.csv': ('Concept', ['name:ID(Concept)', 'created_at:datetime', 'updated_at:datetime']),
+    'subconcepts.csv': ('SubConcept', ['name:ID(SubConcept)', 'created_at:datetime', 'updated_at:datetime']),
+    'solution_approaches.csv': ('SolutionApproach', [
+        'name:ID(SolutionApproach)', 'explanation', 'created_at:datetime', 'updated_at:datetime',
+    ]),
+    'catalogue_version.csv': ('CatalogueVersion', [
+        'key:ID(CatalogueVersion)', 'source_hash', 'source_size:long', 'source_mtime:double',
+        'schema_version', 'item_count:long', 'loaded_at:datetime',
+    ]),
+}
+RELATIONSHIP_FILES = {
+    'question_concepts.csv': ('INVOLVES_CONCEPT', [':START_ID(Question)', ':END_ID(Concept)']),
+    'question_subconcepts.csv': ('INVOLVES_SUBCONCEPT', [':START_ID(Question)', ':END_ID(SubConcept)']),
+    'question_approaches.csv': ('HAS_SOLUTION_APPROACH', [':START_ID(Question)', ':END_ID(SolutionApproach)']),
+    'concept_prerequisites.csv': ('HAS_PREREQUISITE', [':START_ID(Concept)', ':END_ID(Concept)']),
+}
+
+
+class ImportFileGenerator:
+    """
+    Converts the questions JSON into CSV files for ``neo4j-admin database import``.
+
+    Questions are streamed in two passes: the first validates the items and
+    finds the last occurrence of each question id (like an ingest, where a
+    repeated id overwrites the earlier version), the second writes those.
+    Memory is bounded by the question ids and the vocabulary (concept and
+    approach names), not by the questions themselves. Vocabulary nodes are
+    deduplicated and written once at the end. The graph matches what
+    DataPopulationService loads, including the catalogue version stamp, so a
+    later ``admin.py ingest`` of the same file is a no-op.
+
+    One difference: neo4j-admin ID columns are strings, so question ids are
+    imported as strings even where the JSON has numbers (an ingest keeps the
+    JSON type). Ids that only differ in type (``1`` and ``"1"``) are the same
+    question here.
+    """
+
+    def __init__(self, output_dir: str, database: str = 'neo4j'):
+        self.output_dir = Path(output_dir)
+        self.database = database
+
+    def generate(self, file_path: str, prereq_map_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Write the node and relationship CSV files.
+
+        Args:
+            file_path: Questions JSON array (or JSON Lines) file
+            prereq_map_path: Optional concept -> prerequisite concepts map
+                (data/prereq_map.json), written as Concept-[:HAS_PREREQUISITE]->Concept
+
+        Returns:
+            Counts per file, invalid and repeated item ids and the neo4j-admin
+            command to run
+        """
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"Data file not found: {file_path}")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        now = datetime.now(timezone.utc).isoformat()
+        concepts: Dict[str, None] = {}
+        approaches: Dict[str, str] = {}
+        counts = {name: 0 for name in list(NODE_FILES) + list(RELATIONSHIP_FILES)}
+        invalid_item_ids: List[Any] = []
+        duplicate_item_ids: Dict[str, None] = {}
+        digest = hashlib.sha256()
+
+        # Pass one: validate, and keep the position of each id's last valid occurrence
+        last_position: Dict[str, int] = {}
+        with open(file_path, 'rb') as source:
+            for position, item in enumerate(iter_json_items(source, on_chunk=digest.update)):
+                errors = question_item_validator.check_item(item) or _import_errors(item)
+                if errors:
+                    invalid_item_ids.append(item.get('id', 'N/A') if isinstance(item, dict) else 'N/A')
+                    logger.warning(f"Skipping invalid item {invalid_item_ids[-1]}: {'; '.join(errors)}")
+                    continue
+                question_id = str(item['id'])
+                if question_id in last_position:
+                    duplicate_item_ids[question_id] = None
+                last_position[question_id] = position
+            # Hash any trailing bytes after the array too, to match the ingest stamp
+            for chunk in iter(lambda: source.read(1 << 20), b''):
+                digest.update(chunk)
+        if duplicate_item_ids:
+            logger.warning(f"{len(duplicate_item_ids)} question ids repeat; keeping the last version of each")
+
+        # Pass two: write each question's last version
+        with self._writer('questions.csv') as questions, \
+                self._writer('question_concepts.csv') as concept_links, \
+                self._writer('question_subconcepts.csv') as subconcept_links, \
+                self._writer('question_approaches.csv') as approach_links, \
+                open(file_path, 'rb') as source:
+            for position, item in enumerate(iter_json_items(source)):
+                if not isinstance(item, dict) or last_position.get(str(item.get('id'))) != position:
+                    continue
+
+                question_id = str(item['id'])
+                names = list(dict.fromkeys(_names(item.get('sub_concepts', []))))
+                questions.writerow([
+                    question_id, item['question_title'], item['question'], item['difficulty'],
+                    int(item['step_no']), int(item['sub_step_no']), int(item['sl_no']),
+                    ARRAY_DELIMITER.join(_names(item.get('standard_concepts', []))),
+                    ARRAY_DELIMITER.join(_names(item.get('sub_concepts', []))),
+                    now, now,
+                ])
+                counts['questions.csv'] += 1
+                for name in names:
+                    concepts[name] = None
+                    concept_links.writerow([question_id, name])
+                    subconcept_links.writerow([question_id, name])
+                counts['question_concepts.csv'] += len(names)
+                counts['question_subconcepts.csv'] += len(names)
+
+                approach_names: Dict[str, None] = {}
+                for approach in item.get('solution_approaches', []):
+                    name = approach.get('approach_name', '').strip()
+                    if name:
+                        # Like a question-by-question load, the last explanation wins
+                        approaches[name] = approach.get('explanation', '').strip()
+                        approach_names[name] = None
+                for name in approach_names:
+                    approach_links.writerow([question_id, name])
+                counts['question_approaches.csv'] += len(approach_names)
+
+        subconcepts = list(concepts)
+        with self._writer('concept_prerequisites.csv') as prerequisites:
+            for concept, required in self._load_prereq_map(prereq_map_path).items():
+                concepts[concept] = None
+                for name in dict.fromkeys(required):
+                    concepts[name] = None
+                    prerequisites.writerow([concept, name])
+                    counts['concept_prerequisites.csv'] += 1
+
+        with self._writer('concepts.csv') as writer:
+            writer.writerows([name, now, now] for name in concepts)
+        with self._writer('subconcepts.csv') as writer:
+            writer.writerows([name, now, now] for name in subconcepts)
+        with self._writer('solution_approaches.csv') as writer:
+            writer.writerows([name, explanation, now, now] for name, explanation in approaches.items())
+        counts['concepts.csv'] = len(concepts)
+        counts['subconcepts.csv'] = len(subconcepts)
+        counts['solution_approaches.csv'] = len(approaches)
+
+        stat = os.stat(file_path)
+        with self._writer('catalogue_version.csv') as writer:
+            writer.writerow([
+                CATALOGUE_KEY, digest.hexdigest(), stat.st_size, stat.st_mtime,
+                load_declarations().version(), counts['questions.csv'], now,
+            ])
+        counts['catalogue_version.csv'] = 1
+
+        logger.info(f"Wrote import files to {self.output_dir}: {counts}")
+        return {
+            'output_dir': str(self.output_dir),
+            'files': counts,
+            'invalid_items': len(invalid_item_ids),
+            'invalid_item_ids': invalid_item_ids,
+            'duplicate_item_ids': list(duplicate_item_ids),
+            'command': self.import_command(),
+        }
+
+    def import_command(self) -> str:
+        """The neo4j-admin invocation that loads the generated files into an empty database."""
+        parts = ['neo4j-admin database import full']
+        parts.extend(f"--nodes={label}={self.output_dir / name}" for name, (label, _) in NODE_FILES.items())
+        parts.extend(
+            f"--relationships={rel_type}={self.output_dir / name}"
+            for name, (rel_type, _) in RELATIONSHIP_FILES.items()
+        )
+        # Ids and names are deduplicated above; don't fail a long import if one still repeats
+        parts.extend([
+            f"--array-delimiter='{ARRAY_DELIMITER}'", '--multiline-fields=true',
+            '--skip-duplicate-nodes=true', self.database,
+        ])
+        return ' \\\n    '.join(parts)
+
+    def _writer(self, name: str):
+        _, header = NODE_FILES.get(name) or RELATIONSHIP_FILES[name]
+        return _csv_writer(self.output_dir / name, header)
+
+    @staticmethod
+    def _load_prereq_map(path: Optional[str]) -> Dict[str, List[str]]:
+        if not path:
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            prereq_map = json.load(f)
+        if not isinstance(prereq_map, dict):
+            raise DataValidationError("Prerequisite map must be an object of concept -> [prerequisites]")
+        cleaned = {}
+        for concept, required in prereq_map.items():
+            if not isinstance(required, list) or not all(isinstance(name, str) for name in required):
+                raise DataValidationError(f"Prerequisites of {concept!r} must be a list of names")
+            if concept.strip():
+                cleaned[concept.strip()] = _names(required)
+        return cleaned
+
+
+@contextmanager
+def _csv_writer(path: Path, header: List[str]) -> Iterator[Any]:
+    """csv.writer over a new file whose first row is the neo4j-admin header."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        yield writer
+
+
+def _names(values: List[Any]) -> List[str]:
+    return [name.strip() for name in values if name and name.strip()]
+
+
+def _import_errors(item: Dict[str, Any]) -> List[str]:
+    """Checks the CSV layout adds on top of the ingest validator."""
+    errors = []
+    for field in ('step_no', 'sub_step_no', 'sl_no'):
+        if not float(item[field]).is_integer():
+            errors.append(f"{field}: must be a whole number")
+    for field in ('standard_concepts', 'sub_concepts'):
+        if any(ARRAY_DELIMITER in name for name in item.get(field, [])):
+            errors.append(f"{field}: names cannot contain {ARRAY_DELIMITER!r}")
+    return errors
@@ -0,0 +1,233 @@
+#services/ranking_engine.py
+"""
+Vectorized difficulty-adaptive ranking.
+
+Every candidate question is scored in one NumPy pass over column arrays:
+
+    score = w_curriculum * (1 - curriculum_position)
+          + w_difficulty * (1 - |difficulty - target_difficulty|)
+          + w_coverage   * mastered share of the question's sub-concepts
+
+where curriculum_position and difficulty are normalized to [0, 1] and the
+target difficulty is the student's smoothed recent success rate, so students
+who keep succeeding are steered towards harder questions. A negative
+coverage weight prefers questions that introduce new concepts instead.
+
+The same arrays score a students x questions matrix for cohort jobs.
+"""
+import logging
+from dataclasses import dataclass, field
+from itertools import chain, repeat
+from typing import Collection, Dict, List, Optional, Sequence, Set, Union
+
+import numpy as np
+
+from models.question import Question
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTY_LEVELS = {'easy': 0.0, 'medium': 0.5, 'hard': 1.0}
+UNKNOWN_DIFFICULTY = 0.5
+
+
+@dataclass(frozen=True)
+class RankingWeights:
+    curriculum: float = 1.0
+    difficulty: float = 0.5
+    coverage: float = 0.3
+
+    @classmethod
+    def from_config(cls, config) -> 'RankingWeights':
+        return cls(
+            curriculum=config.curriculum_weight,
+            difficulty=config.difficulty_weight,
+            coverage=config.coverage_weight
+        )
+
+
+@dataclass
+class StudentFeatures:
+    """Per-student inputs to the ranking."""
+    student_id: str
+    recent_attempts: int = 0
+    recent_successes: int = 0
+    mastered_concepts: Set[str] = field(default_factory=set)
+
+    @property
+    def success_rate(self) -> float:
+        """Laplace-smoothed success rate, 0.5 for a student with no history."""
+        return (self.recent_successes + 1) / (self.recent_attempts + 2)
+
+
+class CandidateSet:
+    """
+    Column-oriented view of candidate questions.
+
+    Built once per candidate list (or once for the whole catalogue in cohort
+    jobs) and reused for every student scored against it.
+    """
+
+    def __init__(self, questions: Sequence[Question]):
+        self.questions = list(questions)
+        count = len(self.questions)
+
+        order = sorted(range(count), key=lambda i: self.questions[i].display_order)
+        position = np.empty(count, dtype=np.float32)
+        position[order] = np.arange(count, dtype=np.float32)
+        self.position = position / max(count - 1, 1)
+
+        self.difficulty = np.fromiter(
+            (DIFFICULTY_LEVELS.get(str(q.difficulty).lower(), UNKNOWN_DIFFICULTY) for q in self.questions),
+            dtype=np.float32, count=count
+        )
+
+        self.concept_index: Dict[str, int] = {}
+        rows, columns = [], []
+        for column, question in enumerate(self.questions):
+            for name in set(question.sub_concepts):
+                rows.append(self.concept_index.setdefault(name, len(self.concept_index)))
+                columns.append(column)
+        # Dense concepts x questions matrix (the concept vocabulary is small) holding
+        # each concept's share of a question's concepts, so that
+        # mastery @ coverage_weights is the mastered fraction of every question
+        incidence = np.zeros((len(self.concept_index), count), dtype=np.float32)
+        incidence[rows, columns] = 1.0
+        self.coverage_weights = incidence / np.maximum(incidence.sum(axis=0), 1.0)
+        self.question_index = {question.id: i for i, question in enumerate(self.questions)}
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def mastery_matrix(self, students: Sequence[StudentFeatures]) -> np.ndarray:
+        """students x concepts 0/1 matrix of mastered concepts known to this set."""
+        matrix = np.zeros((len(students), len(self.concept_index)), dtype=np.float32)
+        for row, features in enumerate(students):
+            columns = [self.concept_index[name] for name in features.mastered_concepts if name in self.concept_index]
+            matrix[row, columns] = 1.0
+        return matrix
+
+    def exclusion_mask(self, excluded: Sequence[Collection[str]]) -> np.ndarray:
+        """students x questions boolean matrix, True where a question is excluded."""
+        mask = np.zeros((len(excluded), len(self.questions)), dtype=bool)
+        # Resolve all ids with C-level map() calls; cohorts exclude millions of ids
+        columns = np.fromiter(
+            map(self.question_index.get, chain.from_iterable(excluded), repeat(-1)), dtype=np.int64
+        )
+        rows = np.repeat(np.arange(len(excluded)), [len(question_ids) for question_ids in excluded])
+        known = columns >= 0
+        mask[rows[known], columns[known]] = True
+        return mask
+
+
+class RankingEngine:
+    """Scores candidate questions for one student or a whole cohort."""
+
+    def __init__(self, weights: Optional[RankingWeights] = None):
+        self.weights = weights or RankingWeights()
+
+    def score_matrix(
+        self,
+        candidates: CandidateSet,
+        students: Sequence[StudentFeatures],
+        excluded: Union[Sequence[Collection[str]], np.ndarray, None] = None
+    ) -> np.ndarray:
+        """
+        Score every candidate for every student.
+
+        Args:
+            candidates: Candidate questions
+            students: Features of each student (one row each)
+            excluded: Per-student question ids to exclude (e.g. already mastered), or a
+                mask from CandidateSet.exclusion_mask() when it is reused
+
+        Returns:
+            float32 array of shape (students, questions); excluded entries are -inf
+        """
+        weights = self.weights
+        target = np.fromiter((s.success_rate for s in students), dtype=np.float32, count=len(students))
+
+        # Per-question terms are folded into one vector so the students x
+        # questions matrix is only touched a few times.
+        question_terms = weights.curriculum * (1.0 - candidates.position) + weights.difficulty
+        scores = np.abs(candidates.difficulty[np.newaxis, :] - target[:, np.newaxis])
+        scores *= -weights.difficulty
+        scores += question_terms
+        if weights.coverage and len(candidates.concept_index):
+            mastery = candidates.mastery_matrix(students)
+            mastery *= weights.coverage
+            scores += mastery @ candidates.coverage_weights
+        if excluded is not None:
+            mask = excluded if isinstance(excluded, np.ndarray) else candidates.exclusion_mask(excluded)
+            scores[mask] = -np.inf
+        return scores
+
+    @staticmethod
+    def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """
+        Column indices of the k best scores in each row, best first.
+
+        Uses argpartition so only the selected k are sorted.
+        """
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return np.empty((scores.shape[0], 0), dtype=np.int64)
+        if k < scores.shape[1]:
+            part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            part = np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+        order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1, kind='stable')
+        return np.take_along_axis(part, order, axis=1)
+
+    def rank(self, questions: Sequence[Question], features: StudentFeatures, limit: Optional[int] = None) -> List[Question]:
+        """
+        Rank one student's candidate questions, best first.
+
+        Args:
+            questions: Candidate questions
+            features: The student's features
+            limit: Return at most this many questions
+
+        Returns:
+            Questions ordered by descending score
+        """
+        if not questions:
+            return []
+        candidates = CandidateSet(questions)
+        scores = self.score_matrix(candidates, [features])
+        indices = self.top_k(scores, limit or len(candidates))[0]
+        return [candidates.questions[i] for i in indices]
+
+    def rank_cohort(
+        self,
+        candidates: CandidateSet,
+        students: Sequence[StudentFeatures],
+        k: int = 10,
+        excluded: Optional[Sequence[Collection[str]]] = None,
+        batch_size: int = 1024
+    ) -> Dict[str, List[Question]]:
+        """
+        Top-k questions for every student in a cohort.
+
+        Students are scored in batches so memory stays at batch_size x questions.
+
+        Args:
+            candidates: Candidate questions shared by the cohort
+            students: Features of each student
+            k: Questions per student
+            excluded: Per-student question ids to exclude, aligned with students
+            batch_size: Students scored per matrix
+
+        Returns:
+            Mapping of student_id to their top-k questions
+        """
+        ranked: Dict[str, List[Question]] = {}
+        for start in range(0, len(students), batch_size):
+            batch = students[start:start + batch_size]
+            batch_excluded = excluded[start:start + batch_size] if excluded is not None else None
+            scores = self.score_matrix(candidates, batch, batch_excluded)
+            top = self.top_k(scores, k)
+            for row, features in enumerate(batch):
+                ranked[features.student_id] = [
+                    candidates.questions[i] for i in top[row] if np.isfinite(scores[row, i])
+                ]
+        return ranked
@@ -0,0 +1,257 @@
+#services/recommendation_cache.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from models.question import Question
+
+logger = logging.getLogger(__name__)
+
+
+class RecommendationCache:
+    """
+    Materialized top-K recommendation list per student, held in process.
+
+    Reads are served from the list while it is younger than the TTL; a
+    completion patches the list (the mastered question is dropped) instead of
+    discarding it, and a list that runs low is refilled by a background
+    worker. Every entry carries a per-student version so a refresh that
+    raced a completion is discarded rather than stored. Versions are only
+    kept for students with a cached list or a refresh in flight, so they are
+    bounded by ``max_entries`` plus the refreshes running.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], List[Question]],
+        ttl_seconds: float = 600.0,
+        max_entries: int = 100_000,
+        refill_below: int = 3,
+        batch_size: int = 100
+    ):
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.refill_below = refill_below
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        # Refreshes between version() and put()/abandon(), per student
+        self._in_flight: Dict[str, int] = {}
+        self._pending: 'OrderedDict[str, None]' = OrderedDict()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.patches = 0
+        self.invalidations = 0
+        self.background_refreshes = 0
+        self.discarded_refreshes = 0
+        self._served_age_total = 0.0
+        self._served_age_max = 0.0
+
+    def get(self, student_id: str) -> Optional[List[Question]]:
+        """
+        Return the materialized list, or None if it is missing or expired.
+
+        An empty list is a valid entry: the student has nothing left to do.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(student_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            questions, computed_at = entry
+            age = now - computed_at
+            if age > self.ttl_seconds:
+                del self._entries[student_id]
+                self._forget_if_idle(student_id)
+                self.expired += 1
+                self.misses += 1
+                self._enqueue(student_id)
+                return None
+            self._entries.move_to_end(student_id)
+            self.hits += 1
+            self._served_age_total += age
+            self._served_age_max = max(self._served_age_max, age)
+            return list(questions)
+
+    def version(self, student_id: str) -> int:
+        """
+        Start a refresh: the current version of a student's entry.
+
+        Pass it back to put(), or call abandon() if the list is not computed.
+        """
+        with self._lock:
+            return self._begin(student_id)
+
+    def put(self, student_id: str, questions: List[Question], version: int) -> bool:
+        """
+        Finish a refresh: store the list unless the student changed since ``version``.
+
+        Returns:
+            True if the list was stored
+        """
+        with self._lock:
+            self._end(student_id)
+            if self._versions.get(student_id, 0) != version:
+                self.discarded_refreshes += 1
+                self._forget_if_idle(student_id)
+                return False
+            self._entries[student_id] = (tuple(questions), time.monotonic())
+            self._entries.move_to_end(student_id)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._forget_if_idle(evicted)
+            return True
+
+    def abandon(self, student_id: str) -> None:
+        """Finish a refresh started with version() without storing a list."""
+        with self._lock:
+            self._end(student_id)
+            self._forget_if_idle(student_id)
+
+    def record_completion(self, student_id: str, question_id: str, is_mastered: bool) -> None:
+        """
+        Patch a student's list after a completion.
+
+        A mastered question is removed in place; the list keeps its age, so
+        the TTL still bounds how long ranking inputs may lag behind. A list
+        that drops below ``refill_below`` is queued for a background refresh.
+        """
+        with self._lock:
+            self._bump(student_id)
+            entry = self._entries.get(student_id)
+            if entry is None or not is_mastered:
+                return
+            questions, computed_at = entry
+            remaining = tuple(q for q in questions if q.id != question_id)
+            if len(remaining) != len(questions):
+                self.patches += 1
+            if remaining:
+                self._entries[student_id] = (remaining, computed_at)
+            else:
+                del self._entries[student_id]
+                self._forget_if_idle(student_id)
+            if len(remaining) < self.refill_below:
+                self._enqueue(student_id)
+
+    def invalidate(self, student_id: str) -> None:
+        """Drop a student's list."""
+        with self._lock:
+            self._bump(student_id)
+            if self._entries.pop(student_id, None) is not None:
+                self.invalidations += 1
+            self._forget_if_idle(student_id)
+
+    def clear(self) -> None:
+        """Drop every list, e.g. after the catalogue changed."""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            for student_id in list(self._in_flight):
+                self._bump(student_id)
+            for student_id in list(self._versions):
+                self._forget_if_idle(student_id)
+
+    def schedule_refresh(self, student_ids: Iterable[str]) -> None:
+        """Queue students for a background (re)computation, e.g. to warm the cache."""
+        with self._lock:
+            for student_id in student_ids:
+                self._enqueue(student_id)
+
+    def start(self) -> None:
+        """Start the background refresh worker."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="recommendation-refresher", daemon=True)
+        self._thread.start()
+        logger.info("Recommendation refresh worker started")
+
+    def stop(self) -> None:
+        """Stop the background refresh worker."""
+        with self._lock:
+            self._running = False
+            self._wakeup.notify_all()
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate (reads not falling back to live computation) and freshness of served lists."""
+        with self._lock:
+            reads = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'hit_rate': round(self.hits / reads, 4) if reads else 0.0,
+                'patches': self.patches,
+                'invalidations': self.invalidations,
+                'background_refreshes': self.background_refreshes,
+                'discarded_refreshes': self.discarded_refreshes,
+                'mean_served_age_seconds': round(self._served_age_total / self.hits, 3) if self.hits else 0.0,
+                'max_served_age_seconds': round(self._served_age_max, 3),
+                'cached_students': len(self._entries),
+                'pending_refreshes': len(self._pending),
+            }
+
+    def _begin(self, student_id: str) -> int:
+        # Caller holds the lock
+        self._in_flight[student_id] = self._in_flight.get(student_id, 0) + 1
+        return self._versions.get(student_id, 0)
+
+    def _end(self, student_id: str) -> None:
+        # Caller holds the lock
+        count = self._in_flight.get(student_id, 0) - 1
+        if count > 0:
+            self._in_flight[student_id] = count
+        else:
+            self._in_flight.pop(student_id, None)
+
+    def _bump(self, student_id: str) -> None:
+        # Caller holds the lock. Only a cached list or a running refresh can go stale
+        if student_id in self._entries or student_id in self._in_flight:
+            self._versions[student_id] = self._versions.get(student_id, 0) + 1
+
+    def _forget_if_idle(self, student_id: str) -> None:
+        # Caller holds the lock. Nothing holds the version any more, so it can restart at 0
+        if student_id not in self._entries and student_id not in self._in_flight:
+            self._versions.pop(student_id, None)
+
+    def _enqueue(self, student_id: str) -> None:
+        # Caller holds the lock. Without a worker the next read recomputes live.
+        if self._running:
+            self._pending[student_id] = None
+            self._wakeup.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while self._running and not self._pending:
+                    self._wakeup.wait()
+                if not self._running:
+                    return
+                batch = []
+                while self._pending and len(batch) < self.batch_size:
+                    student_id, _ = self._pending.popitem(last=False)
+                    batch.append((student_id, self._begin(student_id)))
+
+            for student_id, version in batch:
+                try:
+                    questions = self.loader(student_id)
+                except Exception as e:
+                    logger.warning(f"Background recommendation refresh failed for {student_id}: {e}")
+                    self.abandon(student_id)
+                    continue
+                if self.put(student_id, questions, version):
+                    with self._lock:
+                        self.background_refreshes += 1
@@ -1,15 +1,38 @@
 #services/recommendation_service.py
 import logging
-from typing import Optional, List, Dict, Any
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Tuple
 
+from config.settings import app_config, ranking_config
 from core.database import DatabaseManager
+from core.invalidation_bus import CATALOGUE, PROGRESS, STUDENT, invalidation_bus
+from core.logging_setup import hot_path_logger
+from core.tracing import tracer
+from core.profiling import profiled
 from repositories.student_repository import StudentRepository
 from repositories.question_repository import QuestionRepository
+from repositories.attempt_log import AttemptLog
+from services.student_directory import StudentDirectory
+from services.review_scheduler import ReviewScheduler
+from services.ranking_engine import RankingEngine, RankingWeights, StudentFeatures
+from services.recommendation_cache import RecommendationCache
+from services.admission_controller import AdmissionController
+from services.curriculum_fallback import CurriculumFallback
+from models.attempt import Attempt
 from models.question import Question
-from core.exceptions import StudentNotFoundError
+from models.review import Review
+from models.student import Student
+from core.exceptions import (
+    DatabaseConnectionError, DataValidationError, QuestionNotFoundError, ServiceOverloadedError,
+    StudentNotFoundError,
+)
 
 logger = logging.getLogger(__name__)
+# Per-call messages, sampled (see core/logging_setup.py)
+hot_logger = hot_path_logger(__name__)
 
+@profiled
 class RecommendationService:
     """Service for generating personalized question recommendations."""
     
@@ -17,93 +40,437 @@ class RecommendationService:
         self, 
         db_manager: DatabaseManager,
         student_repo: StudentRepository,
-        question_repo: QuestionRepository
+        question_repo: QuestionRepository,
+        student_directory: Optional[StudentDirectory] = None,
+        review_scheduler: Optional[ReviewScheduler] = None,
+        ranking_engine: Optional[RankingEngine] = None,
+        recommendation_cache: Optional[RecommendationCache] = None,
+        attempt_log: Optional[AttemptLog] = None,
+        admission_controller: Optional[AdmissionController] = None,
+        curriculum_fallback: Optional[CurriculumFallback] = None
     ):
         self.db_manager = db_manager
         self.student_repo = student_repo
         self.question_repo = question_repo
+        if student_directory is None and app_config.student_cache_ttl > 0:
+            student_directory = StudentDirectory(
+                student_repo,
+                ttl_seconds=app_config.student_cache_ttl,
+                negative_ttl_seconds=app_config.student_negative_cache_ttl,
+                max_entries=app_config.student_cache_size
+            )
+        self.student_directory = student_directory
+        self.review_scheduler = review_scheduler
+        self.attempt_log = attempt_log
+        if ranking_engine is None and ranking_config.enabled:
+            ranking_engine = RankingEngine(RankingWeights.from_config(ranking_config))
+        self.ranking_engine = ranking_engine
+        if recommendation_cache is None and app_config.recommendation_cache_size > 0:
+            recommendation_cache = RecommendationCache(
+                self._load_recommendations,
+                ttl_seconds=app_config.recommendation_cache_ttl,
+                max_entries=app_config.recommendation_cache_size,
+                refill_below=app_config.recommendation_refill_below
+            )
+        if admission_controller is None and app_config.admission_max_concurrent > 0:
+            admission_controller = AdmissionController(
+                max_concurrent=app_config.admission_max_concurrent,
+                max_queue=app_config.admission_max_queue,
+                timeout_seconds=app_config.admission_timeout,
+                health_check=db_manager.health_check,
+                unhealthy_cooldown=app_config.degraded_cooldown
+            )
+        self.admission_controller = admission_controller
+        if curriculum_fallback is None and app_config.degraded_fallback_size > 0:
+            curriculum_fallback = CurriculumFallback(
+                question_repo, size=app_config.degraded_fallback_size, ttl_seconds=app_config.degraded_fallback_ttl
+            )
+        self.curriculum_fallback = curriculum_fallback
+        self.recommendation_cache = recommendation_cache
+        if recommendation_cache is not None:
+            # Changes recorded by other workers on this host
+            invalidation_bus.subscribe(PROGRESS, self._on_progress_event)
+            invalidation_bus.subscribe(STUDENT, self._on_student_event)
+            invalidation_bus.subscribe(CATALOGUE, self._on_catalogue_event)
 
-    def get_next_recommended_question(self, student_id: str, limit: int = 1) -> Optional[Dict[str, Any]]:
+    def close(self) -> None:
+        """Stop following changes made elsewhere (invalidation bus, student writes); call when discarding."""
+        if self.recommendation_cache is not None:
+            invalidation_bus.unsubscribe(PROGRESS, self._on_progress_event)
+            invalidation_bus.unsubscribe(STUDENT, self._on_student_event)
+            invalidation_bus.unsubscribe(CATALOGUE, self._on_catalogue_event)
+        if self.student_directory is not None:
+            self.student_directory.close()
+
+    def _on_progress_event(self, event: Dict[str, Any]) -> None:
+        self.recommendation_cache.record_completion(event['student_id'], event['question_id'], event['is_mastered'])
+
+    def _on_student_event(self, event: Dict[str, Any]) -> None:
+        self.recommendation_cache.invalidate(event['student_id'])
+
+    def _on_catalogue_event(self, event: Dict[str, Any]) -> None:
+        self.recommendation_cache.clear()
+
+    def _require_student(self, student_id: str) -> Student:
         """
-        Get the next recommended question for a student based on their progress.
+        Return the student or raise StudentNotFoundError.
+        Served from the student directory cache when one is configured.
         """
-        logger.info(f"Generating recommendation for student: {student_id}")
-        
-        # Verify student exists
-        student = self.student_repo.find_student_by_id(student_id)
+        with tracer.span('student.lookup', cached=self.student_directory is not None):
+            if self.student_directory is not None:
+                student = self.student_directory.get(student_id)
+            else:
+                student = self.student_repo.find_student_by_id(student_id)
         if not student:
             raise StudentNotFoundError(f"Student with ID {student_id} not found")
+        return student
 
-        # Get unmastered questions ordered by curriculum sequence
-        questions = self.question_repo.find_unmastered_questions_for_student(
-            student_id, limit=20
-        )
-        
-        if not questions:
-            logger.info(f"No new questions available for student {student_id}")
-            return None
+    def get_next_recommended_question(
+        self,
+        student_id: str,
+        limit: int = 1,
+        deadline: Optional[float] = None
+    ) -> Optional[Question]:
+        """
+        Get the next recommended question for a student based on their progress.
+        Served from the student's materialized list when one is cached.
+        """
+        return self.recommend(student_id, deadline)[0]
+
+    def recommend(self, student_id: str, deadline: Optional[float] = None) -> Tuple[Optional[Question], bool]:
+        """
+        Get the next recommended question through admission control.
+
+        Cached lists are served without admission. Computing a list takes an
+        admission slot; when the call is shed or the database is failing, the
+        first unmastered question of the cached curriculum opening is served
+        instead (mastery known from the attempt log only, and the student is
+        not looked up).
+
+        Args:
+            student_id: ID of the student
+            deadline: time.monotonic() value after which the answer is no longer
+                wanted; defaults to the admission timeout from now
+
+        Returns:
+            Tuple of (question or None, whether the answer is degraded)
 
-        # Apply recommendation logic (currently just returns first question)
-        recommended = self._apply_recommendation_logic(questions, student)
+        Raises:
+            ServiceOverloadedError: If the call was shed and there is no fallback
+            DatabaseConnectionError: If the database failed and there is no fallback
+        """
+        hot_logger.info("Generating recommendation for student: %s", student_id)
+        with tracer.span('recommendation', student_id=student_id) as span:
+            question, degraded = self._recommend(student_id, deadline, span)
+            span.set(degraded=degraded)
+        return question, degraded
+
+    def _recommend(self, student_id: str, deadline: Optional[float], span) -> Tuple[Optional[Question], bool]:
+        if self.recommendation_cache is not None:
+            cached = self.recommendation_cache.get(student_id)
+            span.set(cache='hit' if cached is not None else 'miss')
+            if cached is not None:
+                return (cached[0] if cached else None), False
+
+        admission = self.admission_controller
+        if admission is None:
+            return self._recommend_from_database(student_id), False
+        if not admission.available():
+            return self._degraded_recommendation(
+                student_id, DatabaseConnectionError("Database is marked unavailable")
+            ), True
+        try:
+            with admission.admit(deadline):
+                question = self._recommend_from_database(student_id)
+        except ServiceOverloadedError as e:
+            return self._degraded_recommendation(student_id, e), True
+        except DatabaseConnectionError as e:
+            admission.report_failure(e)
+            return self._degraded_recommendation(student_id, e), True
+        return question, False
+
+    def _recommend_from_database(self, student_id: str) -> Optional[Question]:
+        # Verify student exists
+        student = self._require_student(student_id)
+
+        cache = self.recommendation_cache
+        if cache is None:
+            recommended = self._compute_recommendations(student)
+            return recommended[0] if recommended else None
+        version = cache.version(student_id)
+        try:
+            recommended = self._compute_recommendations(student)
+        except Exception:
+            cache.abandon(student_id)
+            raise
+        cache.put(student_id, recommended, version)
         return recommended[0] if recommended else None
 
+    def _degraded_recommendation(self, student_id: str, error: Exception) -> Optional[Question]:
+        """Answer from the curriculum fallback, or re-raise ``error`` if there is none."""
+        fallback = self.curriculum_fallback
+        if fallback is None or not len(fallback):
+            raise error
+        mastered = ()
+        if self.attempt_log is not None:
+            mastered = {attempt.question_id for attempt in self.attempt_log.history(student_id) if attempt.mastered}
+        self.admission_controller.record_degraded()
+        hot_logger.debug("Serving degraded recommendation to %s: %s", student_id, error)
+        return fallback.next_question(mastered)
+
+    def _compute_recommendations(self, student: Student) -> List[Question]:
+        """Compute a student's ranked next-K list from the database."""
+        # Get unmastered questions ordered by curriculum sequence; with ranking
+        # enabled a wider window is fetched and re-ordered by score
+        pool_size = ranking_config.candidate_pool if self.ranking_engine is not None else 20
+        with tracer.span('recommendation.compute', pool_size=pool_size) as span:
+            questions = self.question_repo.find_unmastered_questions_for_student(
+                student.student_id, limit=pool_size
+            )
+            span.set(candidates=len(questions))
+
+            if not questions:
+                hot_logger.info("No new questions available for student %s", student.student_id)
+                return []
+
+            # Apply recommendation logic (difficulty-adaptive ranking when enabled)
+            recommended = self._apply_recommendation_logic(questions, student)
+            return recommended[:app_config.recommendation_cache_k]
+
+    def warm_recommendations(self, active_within_hours: float = 24.0, limit: int = 100_000) -> int:
+        """
+        Queue recently active students for background computation of their lists.
+
+        Args:
+            active_within_hours: Students active within this window are warmed
+            limit: Maximum number of students
+
+        Returns:
+            Number of students queued
+        """
+        if self.recommendation_cache is None or active_within_hours <= 0:
+            return 0
+        since = datetime.now(timezone.utc) - timedelta(hours=active_within_hours)
+        student_ids = self.student_repo.find_active_student_ids(since, limit)
+        self.recommendation_cache.schedule_refresh(student_ids)
+        logger.info(f"Queued {len(student_ids)} recently active students for recommendation warm-up")
+        return len(student_ids)
+
+    def preload_student(self, student_id: str) -> None:
+        """
+        Load a student into the student directory and compute their
+        materialized recommendation list, so their first request is a cache hit.
+        """
+        if self.recommendation_cache is not None:
+            self._recommend_from_database(student_id)
+        else:
+            self._require_student(student_id)
+
+    def _load_recommendations(self, student_id: str) -> List[Question]:
+        """Loader used by the recommendation cache's background worker."""
+        return self._compute_recommendations(self._require_student(student_id))
+
     def get_questions_by_concept(
         self, 
         student_id: str, 
         concept_name: str,
         limit: int = 10
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Question]:
         """
         Get questions related to a specific concept that the student hasn't mastered.
         """
-        logger.info(f"Finding questions for concept '{concept_name}' for student '{student_id}'")
+        hot_logger.info("Finding questions for concept '%s' for student '%s'", concept_name, student_id)
         
         # Verify student exists
-        student = self.student_repo.find_student_by_id(student_id)
-        if not student:
-            raise StudentNotFoundError(f"Student with ID {student_id} not found")
+        self._require_student(student_id)
 
         return self.question_repo.find_questions_by_concept_for_student(
             student_id, concept_name, limit
         )
 
-    def complete_question(self, student_id: str, question_id: str, is_mastered: bool = True) -> None:
+    def get_student_progress(self, student_id: str, include_question_ids: bool = False) -> Dict[str, Any]:
+        """
+        Get the progress summary for a student.
+
+        Args:
+            student_id: ID of the student
+            include_question_ids: Also list attempted and mastered question ids
+
+        Returns:
+            Progress summary with counters and per-step mastery
+        """
+        summary = self.student_repo.get_student_progress_summary(student_id, include_question_ids)
+        if not summary:
+            raise StudentNotFoundError(f"Student with ID {student_id} not found")
+        return summary
+
+    def complete_question(
+        self,
+        student_id: str,
+        question_id: str,
+        is_mastered: bool = True,
+        quality: Optional[int] = None,
+        duration_seconds: Optional[float] = None
+    ) -> None:
         """
         Mark a question as completed by a student.
-        Updates both attempt and mastery status if specified.
+        Updates both attempt and mastery status if specified, grades the
+        question's spaced-repetition review when a review scheduler is configured,
+        and appends the attempt to the attempt log when one is configured.
+        A completion for an unknown student or question records nothing.
+
+        Args:
+            student_id: ID of the student
+            question_id: ID of the question
+            is_mastered: Whether the student mastered the question
+            quality: Optional SM-2 recall quality 0-5 for the review schedule
+            duration_seconds: Optional time the student spent on the attempt
+
+        Raises:
+            DataValidationError: If the quality or the duration is out of range
+            StudentNotFoundError: If the student does not exist
+            QuestionNotFoundError: If the question does not exist
         """
-        logger.info(f"Recording completion of question {question_id} by student {student_id}")
+        if duration_seconds is not None and not (math.isfinite(duration_seconds) and duration_seconds >= 0):
+            raise DataValidationError(f"Attempt duration must be a finite, non-negative number, got {duration_seconds}")
+        if quality is not None and not 0 <= quality <= 5:
+            raise DataValidationError(f"Review quality must be between 0 and 5, got {quality}")
+        hot_logger.info("Recording completion of question %s by student %s", question_id, student_id)
+        with tracer.span('completion', student_id=student_id, question_id=question_id, mastered=is_mastered):
         
-        def complete_question_transaction(tx, student_id: str, question_id: str, is_mastered: bool):
-            # Always mark as attempted
-            self.student_repo.mark_question_as_attempted(student_id, question_id)
+            def complete_question_transaction(tx, student_id: str, question_id: str, is_mastered: bool) -> bool:
+                # Always mark as attempted; nothing else to record if the student or question is unknown
+                if not self.student_repo.mark_question_as_attempted(student_id, question_id):
+                    return False
             
-            if is_mastered:
-                # Mark question as mastered
-                self.student_repo.mark_question_as_mastered(student_id, question_id)
-                # Mark related subconcepts as mastered
-                self.student_repo.mark_subconcepts_as_mastered(student_id, question_id)
-
-        self.db_manager.execute_transaction(
-            complete_question_transaction, 
-            student_id, 
-            question_id, 
-            is_mastered
+                if is_mastered:
+                    # Mark question as mastered
+                    self.student_repo.mark_question_as_mastered(student_id, question_id)
+                    # Mark related subconcepts as mastered
+                    self.student_repo.mark_subconcepts_as_mastered(student_id, question_id)
+
+                if self.review_scheduler is not None:
+                    self.review_scheduler.record_completion(student_id, question_id, is_mastered, quality)
+                return True
+
+            with self.db_manager.route(student_id):
+                recorded = self.db_manager.execute_transaction(
+                    complete_question_transaction,
+                    student_id,
+                    question_id,
+                    is_mastered
+                )
+
+            if not recorded:
+                # The MATCH-based writes found nothing; say which side is missing
+                self._require_student(student_id)
+                raise QuestionNotFoundError(f"Question with ID {question_id} not found")
+            if self.attempt_log is not None:
+                # Written only after the graph recorded the attempt, so history never shows one the graph lacks
+                self.attempt_log.append(student_id, question_id, is_mastered, duration_seconds)
+            if self.recommendation_cache is not None:
+                self.recommendation_cache.record_completion(student_id, question_id, is_mastered)
+            invalidation_bus.publish(PROGRESS, student_id=student_id, question_id=question_id, is_mastered=is_mastered)
+
+    def get_due_reviews(self, student_id: str, limit: int = 20, within_seconds: float = 0.0) -> List[Review]:
+        """
+        Get the student's mastered questions that are due for review, earliest first.
+
+        Args:
+            student_id: ID of the student
+            limit: Maximum number of reviews
+            within_seconds: Also include reviews due within this window
+
+        Returns:
+            List of due reviews (empty when no review scheduler is configured)
+        """
+        self._require_student(student_id)
+        if self.review_scheduler is None:
+            return []
+        return self.review_scheduler.due_for_student(student_id, within_seconds, limit)
+
+    def get_reviews_due_within(self, within_seconds: float = 3600.0, limit: int = 100) -> List[Review]:
+        """Get reviews of all students due within the given window, earliest first."""
+        if self.review_scheduler is None:
+            return []
+        return self.review_scheduler.due_within(within_seconds, limit)
+
+    def drain_due_reviews(
+        self,
+        student_ids: List[str],
+        within_seconds: float = 0.0,
+        limit_per_student: int = 20
+    ) -> Dict[str, List[Review]]:
+        """
+        Take the due reviews of a cohort in bulk; see ReviewScheduler.drain_cohort.
+        """
+        if self.review_scheduler is None:
+            return {}
+        return self.review_scheduler.drain_cohort(student_ids, within_seconds, limit_per_student)
+
+    def get_attempt_history(
+        self,
+        student_id: str,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        question_id: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Attempt]:
+        """
+        Get every recorded attempt of a student, oldest first.
+
+        Args:
+            student_id: ID of the student
+            since: Only attempts at or after this time
+            until: Only attempts before this time
+            question_id: Only attempts of this question
+            limit: Only the most recent attempts
+
+        Returns:
+            List of attempts (empty when no attempt log is configured)
+        """
+        self._require_student(student_id)
+        if self.attempt_log is None:
+            return []
+        return self.attempt_log.history(student_id, since, until, question_id, limit)
+
+    def get_student_features(self, student_id: str) -> StudentFeatures:
+        """
+        Load the ranking inputs (recent success rate, mastered concepts) for a student.
+
+        With an attempt log the success rate covers the last attempts including
+        retries; the graph only keeps the latest attempt of each question.
+        """
+        with tracer.span('ranking.features'):
+            data = self.student_repo.get_ranking_features(student_id, ranking_config.success_window)
+            recent_attempts = data.get('recent_attempts') or 0
+            recent_successes = data.get('recent_successes') or 0
+            if self.attempt_log is not None:
+                attempts = self.attempt_log.history(student_id, limit=ranking_config.success_window)
+                if attempts:
+                    recent_attempts = len(attempts)
+                    recent_successes = sum(1 for attempt in attempts if attempt.mastered)
+        return StudentFeatures(
+            student_id=student_id,
+            recent_attempts=recent_attempts,
+            recent_successes=recent_successes,
+            mastered_concepts=set(data.get('mastered_concepts') or ())
         )
 
     def _apply_recommendation_logic(
         self, 
-        questions: List[Dict[str, Any]], 
+        questions: List[Question], 
         student
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Question]:
         """
         Apply recommendation algorithm to rank questions.
-        Currently implements basic sequential ordering.
+        Scores the candidates with the ranking engine (curriculum position,
+        difficulty against the student's recent success rate and concept
+        coverage); without an engine the curriculum order is kept.
         """
-        # Basic implementation: return questions in curriculum order
-        # TODO: Implement more sophisticated recommendation logic
-        # - Difficulty matching based on student performance
-        # - Concept prerequisite checking
-        # - Learning path optimization
+        if self.ranking_engine is None or len(questions) < 2:
+            return questions
         
-        return questions
\ No newline at end of file
+        features = self.get_student_features(student.student_id)
+        with tracer.span('recommendation.rank', candidates=len(questions)):
+            return self.ranking_engine.rank(questions, features)
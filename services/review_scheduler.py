@@ -0,0 +1,147 @@
+#services/review_scheduler.py
+import logging
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from repositories.review_repository import ReviewRepository
+from models.review import Review
+from core.exceptions import DataValidationError
+
+logger = logging.getLogger(__name__)
+
+MIN_EASINESS = 1.3
+MASTERED_QUALITY = 4
+NOT_MASTERED_QUALITY = 2
+
+
+def sm2_next(review: Review, quality: int, now: datetime) -> Review:
+    """
+    Apply one SM-2 grading step to a review.
+
+    Args:
+        review: Current review state
+        quality: Recall quality from 0 (blackout) to 5 (perfect)
+        now: Time of the review
+
+    Returns:
+        New review state with the next due time
+    """
+    if quality < 3:
+        repetitions = 0
+        interval_days = 1.0
+    else:
+        repetitions = review.repetitions + 1
+        if repetitions == 1:
+            interval_days = 1.0
+        elif repetitions == 2:
+            interval_days = 6.0
+        else:
+            interval_days = round(review.interval_days * review.easiness, 2)
+    easiness = review.easiness + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return replace(
+        review,
+        repetitions=repetitions,
+        interval_days=interval_days,
+        easiness=round(max(MIN_EASINESS, easiness), 4),
+        due_at=now + timedelta(days=interval_days),
+        last_reviewed_at=now
+    )
+
+
+class ReviewScheduler:
+    """
+    Schedules mastered questions for spaced-repetition review.
+
+    The first mastery of a question creates its review; every later
+    completion grades it and moves its due time with SM-2. Failing a review
+    resets it to a one-day interval instead of un-mastering the question.
+    """
+
+    def __init__(self, review_repo: ReviewRepository, lease_seconds: float = 900.0):
+        self.review_repo = review_repo
+        self.lease_seconds = lease_seconds
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def record_completion(
+        self,
+        student_id: str,
+        question_id: str,
+        is_mastered: bool,
+        quality: Optional[int] = None
+    ) -> Optional[Review]:
+        """
+        Update the review schedule after a student completes a question.
+
+        Args:
+            student_id: ID of the student
+            question_id: ID of the question
+            is_mastered: Whether the attempt was successful
+            quality: SM-2 recall quality 0-5 (defaults from is_mastered)
+
+        Returns:
+            The new review state, or None if the question is not under review
+        """
+        if quality is None:
+            quality = MASTERED_QUALITY if is_mastered else NOT_MASTERED_QUALITY
+        if not 0 <= quality <= 5:
+            raise DataValidationError(f"Review quality must be between 0 and 5, got {quality}")
+
+        now = self._now()
+        review = self.review_repo.get_review(student_id, question_id)
+        if review is None:
+            if not is_mastered:
+                return None
+            review = Review(student_id=student_id, question_id=question_id, due_at=now)
+
+        review = sm2_next(review, quality, now)
+        self.review_repo.upsert_review(review)
+        logger.info(f"Scheduled review of {question_id} for {student_id} at {review.due_at.isoformat()}")
+        return review
+
+    def due_for_student(self, student_id: str, within_seconds: float = 0.0, limit: int = 20) -> List[Review]:
+        """Reviews of one student due now (or within the given window), earliest first."""
+        due_before = self._now() + timedelta(seconds=within_seconds)
+        return self.review_repo.find_due_for_student(student_id, due_before, limit)
+
+    def due_within(self, within_seconds: float = 3600.0, limit: int = 100) -> List[Review]:
+        """Reviews of all students due within the given window, earliest first."""
+        return self.review_repo.find_due(self._now() + timedelta(seconds=within_seconds), limit)
+
+    def drain_cohort(
+        self,
+        student_ids: List[str],
+        within_seconds: float = 0.0,
+        limit_per_student: int = 20,
+        batch_size: int = 500
+    ) -> Dict[str, List[Review]]:
+        """
+        Take the due reviews of a whole cohort.
+
+        Taken reviews are leased for ``lease_seconds`` so a repeated drain does
+        not return them again before they are graded.
+
+        Args:
+            student_ids: Students in the cohort
+            within_seconds: Also take reviews due within this window
+            limit_per_student: Maximum reviews per student
+            batch_size: Students per database round trip
+
+        Returns:
+            Mapping of student_id to their taken reviews, earliest first
+        """
+        now = self._now()
+        due_before = now + timedelta(seconds=within_seconds)
+        lease_until = now + timedelta(seconds=self.lease_seconds)
+        drained: Dict[str, List[Review]] = {}
+        for i in range(0, len(student_ids), batch_size):
+            batch = student_ids[i:i + batch_size]
+            for review in self.review_repo.lease_due_for_students(batch, due_before, lease_until, limit_per_student):
+                drained.setdefault(review.student_id, []).append(review)
+        for reviews in drained.values():
+            reviews.sort(key=lambda review: review.due_at)
+        logger.info(f"Drained {sum(len(r) for r in drained.values())} due reviews for {len(drained)} students")
+        return drained
@@ -0,0 +1,171 @@
+# services/roster_import_service.py
+import csv
+import io
+import logging
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from core.exceptions import DataValidationError
+from models.student import Student
+from repositories.student_repository import StudentRepository
+from utils.json_stream import iter_json_items
+from utils.validators import ValidationUtils
+
+logger = logging.getLogger(__name__)
+
+ROSTER_FIELDS = ('student_id', 'name', 'email')
+
+# Rejected rows beyond this are only counted, so a bad file cannot exhaust memory
+MAX_REPORTED_REJECTIONS = 1000
+
+
+class RosterImportService:
+    """
+    Streams a student roster (CSV or JSON Lines) into the database.
+
+    Rows are validated as they are read and written in batches of
+    ``batch_size`` through StudentRepository.upsert_students, with up to
+    ``workers`` batches in flight. Only those batches are held in memory,
+    plus the set of ids already seen (used to reject duplicate rows).
+    """
+
+    def __init__(self, student_repo: StudentRepository, batch_size: int = 1000, workers: int = 4):
+        if batch_size < 1 or workers < 1:
+            raise ValueError("batch_size and workers must be at least 1")
+        self.student_repo = student_repo
+        self.batch_size = batch_size
+        self.workers = workers
+
+    def import_file(self, file_path: str, file_format: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Import a roster file.
+
+        Args:
+            file_path: CSV with a student_id,name,email header, or JSON Lines
+                (or a JSON array) of objects with those keys
+            file_format: 'csv' or 'jsonl'; inferred from the extension if omitted
+
+        Returns:
+            Summary with total/created/updated/rejected/failed row counts, the
+            first rejected rows with their errors, and failed batches
+        """
+        path = Path(file_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Roster file not found: {file_path}")
+        file_format = (file_format or path.suffix.lstrip('.')).lower()
+        if file_format not in ('csv', 'jsonl', 'json'):
+            raise DataValidationError(f"Unsupported roster format: {file_format!r} (use csv or jsonl)")
+
+        logger.info(f"Importing roster from {file_path} ({file_format})")
+        if file_format == 'csv':
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                return self.import_rows(_csv_rows(f))
+        with open(path, 'rb') as f:
+            return self.import_rows(enumerate(iter_json_items(f), 1))
+
+    def import_rows(self, rows: Iterator[Tuple[int, Any]]) -> Dict[str, Any]:
+        """
+        Validate and upsert (row number, row) pairs.
+
+        Returns:
+            Summary report, see import_file()
+        """
+        start = time.perf_counter()
+        report = {
+            'total_rows': 0, 'created': 0, 'updated': 0, 'rejected': 0, 'failed': 0,
+            'rejected_rows': [], 'failed_batches': [],
+        }
+        seen: Set[str] = set()
+        batch: List[Student] = []
+        in_flight: Dict[Future, Tuple[int, int]] = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="roster-import") as pool:
+            for row_number, row in rows:
+                report['total_rows'] += 1
+                student, errors = self._parse_row(row, seen)
+                if errors:
+                    report['rejected'] += 1
+                    if len(report['rejected_rows']) < MAX_REPORTED_REJECTIONS:
+                        report['rejected_rows'].append({
+                            'row': row_number,
+                            'student_id': row.get('student_id') if isinstance(row, dict) else None,
+                            'errors': errors,
+                        })
+                    continue
+                batch.append(student)
+                if len(batch) >= self.batch_size:
+                    self._submit(pool, in_flight, batch, row_number, report)
+                    batch = []
+            if batch:
+                self._submit(pool, in_flight, batch, report['total_rows'], report)
+            self._collect(in_flight, report, wait_for_all=True)
+
+        report['seconds'] = round(time.perf_counter() - start, 3)
+        written = report['created'] + report['updated']
+        report['rows_per_sec'] = round(written / report['seconds']) if report['seconds'] else written
+        logger.info(
+            f"Roster import finished: {report['created']} created, {report['updated']} updated, "
+            f"{report['rejected']} rejected, {report['failed']} failed in {report['seconds']}s"
+        )
+        return report
+
+    @staticmethod
+    def _parse_row(row: Any, seen: Set[str]) -> Tuple[Optional[Student], List[str]]:
+        if not isinstance(row, dict):
+            return None, ["row must be an object"]
+        student_id, name, email = (row.get(field) for field in ROSTER_FIELDS)
+        if isinstance(student_id, str):
+            student_id = student_id.strip()
+        errors = []
+        if not ValidationUtils.validate_student_id(student_id):
+            errors.append("student_id: must be letters, digits and underscores")
+        elif student_id in seen:
+            errors.append("student_id: duplicate row in roster")
+        if not isinstance(name, str) or not name.strip():
+            errors.append("name: cannot be empty")
+        if not ValidationUtils.validate_email(email):
+            errors.append("email: invalid address")
+        if errors:
+            return None, errors
+        seen.add(student_id)
+        return Student(student_id=student_id, name=name.strip(), email=email.strip()), []
+
+    def _submit(
+        self,
+        pool: ThreadPoolExecutor,
+        in_flight: Dict[Future, Tuple[int, int]],
+        batch: List[Student],
+        last_row: int,
+        report: Dict[str, Any]
+    ) -> None:
+        # Bound the queued batches so memory stays constant on large rosters
+        if len(in_flight) >= self.workers * 2:
+            self._collect(in_flight, report, wait_for_all=False)
+        in_flight[pool.submit(self.student_repo.upsert_students, batch)] = (last_row, len(batch))
+
+    @staticmethod
+    def _collect(in_flight: Dict[Future, Tuple[int, int]], report: Dict[str, Any], wait_for_all: bool) -> None:
+        done, _ = wait(list(in_flight), return_when=ALL_COMPLETED if wait_for_all else FIRST_COMPLETED)
+        for future in done:
+            last_row, size = in_flight.pop(future)
+            try:
+                counts = future.result()
+            except Exception as e:
+                report['failed'] += size
+                report['failed_batches'].append({'last_row': last_row, 'rows': size, 'error': str(e)})
+                logger.error(f"Roster batch ending at row {last_row} failed: {e}")
+                continue
+            report['created'] += counts['created']
+            report['updated'] += counts['updated']
+
+
+def _csv_rows(f: io.TextIOBase) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    reader = csv.DictReader(f)
+    missing = [field for field in ROSTER_FIELDS if field not in (reader.fieldnames or [])]
+    if missing:
+        raise DataValidationError(f"Roster CSV header is missing columns: {missing}")
+    # Row numbers count the header as row 1, like a spreadsheet
+    for row_number, row in enumerate(reader, 2):
+        yield row_number, row
@@ -0,0 +1,104 @@
+#services/statistics_service.py
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from repositories.setup_repository import SetupRepository
+
+logger = logging.getLogger(__name__)
+
+
+class StatisticsService:
+    """
+    TTL cache in front of SetupRepository.get_database_statistics().
+
+    Concurrent callers that find the cache expired share one refresh. With a
+    refresh interval, a daemon thread keeps the cache warm so readers (e.g. a
+    dashboard) never wait on the database at all.
+    """
+
+    def __init__(
+        self,
+        setup_repo: SetupRepository,
+        ttl_seconds: float = 60.0,
+        refresh_interval: float = 0.0
+    ):
+        self.setup_repo = setup_repo
+        self.ttl_seconds = ttl_seconds
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stats: Optional[Dict[str, Any]] = None
+        self._collected_at = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def get(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Return cached statistics, refreshing them if they are older than max_age.
+
+        Args:
+            max_age: Maximum acceptable age in seconds (defaults to the TTL)
+
+        Returns:
+            Dictionary with 'nodes', 'relationships', 'collected_at' and 'age_seconds'
+        """
+        max_age = self.ttl_seconds if max_age is None else max_age
+        stats, collected_at = self._cached()
+        if stats is None or time.monotonic() - collected_at > max_age:
+            with self._refresh_lock:
+                # Another caller may have refreshed while we waited for the lock
+                stats, collected_at = self._cached()
+                if stats is None or time.monotonic() - collected_at > max_age:
+                    stats, collected_at = self._refresh()
+        return dict(stats, age_seconds=round(time.monotonic() - collected_at, 3))
+
+    def invalidate(self) -> None:
+        """Drop the cached statistics, e.g. after a bulk load."""
+        with self._lock:
+            self._stats = None
+
+    def start(self) -> None:
+        """Start the background refresher if a refresh interval is configured."""
+        if self.refresh_interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="statistics-refresher", daemon=True)
+        self._thread.start()
+        logger.info(f"Database statistics refresher started (every {self.refresh_interval}s)")
+
+    def stop(self) -> None:
+        """Stop the background refresher."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _cached(self) -> tuple:
+        with self._lock:
+            return self._stats, self._collected_at
+
+    def _refresh(self) -> tuple:
+        stats = self.setup_repo.get_database_statistics()
+        stats['collected_at'] = datetime.now(timezone.utc).isoformat()
+        collected_at = time.monotonic()
+        with self._lock:
+            self._stats = stats
+            self._collected_at = collected_at
+            self.refreshes += 1
+        return stats, collected_at
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with self._refresh_lock:
+                    self._refresh()
+            except Exception as e:
+                # Keep serving the last good value; a dashboard should not fail with the database
+                self.refresh_failures += 1
+                logger.warning(f"Failed to refresh database statistics: {e}")
+            self._stop.wait(self.refresh_interval)
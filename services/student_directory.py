@@ -0,0 +1,132 @@
+#services/student_directory.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from core.invalidation_bus import STUDENT, invalidation_bus
+from repositories.student_repository import StudentRepository
+from models.student import Student
+
+logger = logging.getLogger(__name__)
+
+
+class StudentDirectory:
+    """
+    In-process cache of student lookups in front of StudentRepository.
+
+    Known students are cached with a TTL; unknown ids are cached in a
+    separate, shorter-lived negative cache so repeated requests for a bad id
+    don't hit the database either. Both caches are LRU-bounded and the entry
+    for a student is dropped whenever the repository writes that student.
+    Call close() when discarding a directory so it stops following writes.
+    """
+
+    def __init__(
+        self,
+        student_repo: StudentRepository,
+        ttl_seconds: float = 300.0,
+        negative_ttl_seconds: float = 30.0,
+        max_entries: int = 100_000
+    ):
+        self.student_repo = student_repo
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._positive: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._negative: 'OrderedDict[str, float]' = OrderedDict()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        # Bumped on every invalidation so a lookup racing a write is not cached.
+        self._generation = 0
+        student_repo.add_student_listener(self.invalidate)
+        invalidation_bus.subscribe(STUDENT, self._on_student_event)
+
+    def close(self) -> None:
+        """Stop following student writes (this process's repository and other workers)."""
+        self.student_repo.remove_student_listener(self.invalidate)
+        invalidation_bus.unsubscribe(STUDENT, self._on_student_event)
+
+    def _on_student_event(self, event: Dict[str, Any]) -> None:
+        self.invalidate(event['student_id'])
+
+    def get(self, student_id: str) -> Optional[Student]:
+        """
+        Return the student, or None if no such student exists.
+
+        Args:
+            student_id: ID of the student
+
+        Returns:
+            Cached or freshly loaded Student, or None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._positive.get(student_id)
+            if entry is not None:
+                student, expires_at = entry
+                if expires_at > now:
+                    self._positive.move_to_end(student_id)
+                    self.hits += 1
+                    return student
+                del self._positive[student_id]
+
+            expires_at = self._negative.get(student_id)
+            if expires_at is not None:
+                if expires_at > now:
+                    self.negative_hits += 1
+                    return None
+                del self._negative[student_id]
+            self.misses += 1
+            generation = self._generation
+
+        student = self.student_repo.find_student_by_id(student_id)
+
+        with self._lock:
+            if generation != self._generation:
+                return student
+            if student is not None:
+                self._store(self._positive, student_id, (student, now + self.ttl_seconds))
+            elif self.negative_ttl_seconds > 0:
+                self._store(self._negative, student_id, now + self.negative_ttl_seconds)
+        return student
+
+    def exists(self, student_id: str) -> bool:
+        """Check whether a student exists, using the cache when possible."""
+        return self.get(student_id) is not None
+
+    def invalidate(self, student_id: str) -> None:
+        """Drop cached state (positive or negative) for one student."""
+        with self._lock:
+            self._generation += 1
+            self._positive.pop(student_id, None)
+            self._negative.pop(student_id, None)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._generation += 1
+            self._positive.clear()
+            self._negative.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current sizes."""
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                'hits': self.hits,
+                'negative_hits': self.negative_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+                'cached_students': len(self._positive),
+                'cached_unknown_ids': len(self._negative),
+            }
+
+    def _store(self, cache: OrderedDict, key: str, value: Any) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_entries:
+            cache.popitem(last=False)
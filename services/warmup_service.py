@@ -0,0 +1,138 @@
+#services/warmup_service.py
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from config.settings import app_config, ranking_config
+from services.recommendation_service import RecommendationService
+
+logger = logging.getLogger(__name__)
+
+# Never a valid student id (see ValidationUtils.validate_student_id), so
+# priming reads match nothing and priming cannot touch real data
+WARMUP_STUDENT_ID = 'warmup:probe'
+
+
+class WarmupService:
+    """
+    Prepares a freshly started process to serve at full speed.
+
+    Steps, in order:
+      1. pool: open ``connections`` driver connections up front
+      2. plans: run each hot read query once, so Neo4j compiles and caches
+         its plan (the queries are parameterized, so any arguments will do)
+      3. curriculum: load the degraded-mode curriculum fallback
+      4. students: load the ``hot_students`` most recently active students
+         into the student directory and compute their recommendation lists;
+         further active students are queued for the background refresher
+
+    A failing step is logged and reported, never raised: a partially warm
+    process still serves correctly.
+    """
+
+    def __init__(
+        self,
+        recommendation_service: RecommendationService,
+        connections: int = 10,
+        hot_students: int = 500,
+        active_within_hours: float = 24.0
+    ):
+        self.service = recommendation_service
+        self.connections = connections
+        self.hot_students = hot_students
+        self.active_within_hours = active_within_hours
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run every warm-up step.
+
+        Returns:
+            Report with the outcome and duration of each step
+        """
+        start = time.perf_counter()
+        report: Dict[str, Any] = {}
+        for name, step in (
+            ('pool', self._warm_pool),
+            ('plans', self._prime_queries),
+            ('curriculum', self._load_curriculum),
+            ('students', self._preload_students),
+        ):
+            step_start = time.perf_counter()
+            try:
+                result = step()
+            except Exception as e:
+                logger.warning(f"Warm-up step '{name}' failed: {e}")
+                result = {'error': str(e)}
+            result['seconds'] = round(time.perf_counter() - step_start, 3)
+            report[name] = result
+        report['seconds'] = round(time.perf_counter() - start, 3)
+        logger.info(f"Warm-up finished in {report['seconds']}s: {report}")
+        return report
+
+    def hot_queries(self) -> List[Tuple[str, Callable[[], Any]]]:
+        """The (query name, call) pairs primed by the plans step."""
+        student_repo = self.service.student_repo
+        question_repo = self.service.question_repo
+        pool_size = ranking_config.candidate_pool if self.service.ranking_engine is not None else 20
+        queries = [
+            ('student.find_by_id', lambda: student_repo.find_student_by_id(WARMUP_STUDENT_ID)),
+            ('question.find_unmastered_for_student',
+             lambda: question_repo.find_unmastered_questions_for_student(WARMUP_STUDENT_ID, limit=pool_size)),
+            ('question.find_by_concept_for_student',
+             lambda: question_repo.find_questions_by_concept_for_student(WARMUP_STUDENT_ID, '', 10)),
+            ('question.find_by_id', lambda: question_repo.find_question_by_id(WARMUP_STUDENT_ID)),
+            ('student.ranking_features',
+             lambda: student_repo.get_ranking_features(WARMUP_STUDENT_ID, ranking_config.success_window)),
+            ('student.progress_summary', lambda: student_repo.get_student_progress_summary(WARMUP_STUDENT_ID)),
+        ]
+        review_scheduler = self.service.review_scheduler
+        if review_scheduler is not None:
+            queries.append(
+                ('review.find_due_for_student', lambda: review_scheduler.due_for_student(WARMUP_STUDENT_ID))
+            )
+        return queries
+
+    def _warm_pool(self) -> Dict[str, Any]:
+        return {'connections': self.service.db_manager.warm_pool(self.connections)}
+
+    def _prime_queries(self) -> Dict[str, Any]:
+        primed, failed = [], {}
+        for name, call in self.hot_queries():
+            try:
+                call()
+                primed.append(name)
+            except Exception as e:
+                failed[name] = str(e)
+                logger.warning(f"Could not prime query {name}: {e}")
+        return {'primed': primed, 'failed': failed}
+
+    def _load_curriculum(self) -> Dict[str, Any]:
+        fallback = self.service.curriculum_fallback
+        if fallback is None:
+            return {'questions': 0}
+        fallback.refresh()
+        return {'questions': len(fallback)}
+
+    def _preload_students(self) -> Dict[str, Any]:
+        if self.active_within_hours <= 0:
+            return {'preloaded': 0, 'queued': 0}
+        since = datetime.now(timezone.utc) - timedelta(hours=self.active_within_hours)
+        limit = app_config.recommendation_cache_size or self.hot_students
+        student_ids = self.service.student_repo.find_active_student_ids(since, max(limit, self.hot_students))
+        hot, rest = student_ids[:self.hot_students], student_ids[self.hot_students:]
+
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, self.connections), thread_name_prefix="warmup") as pool:
+            for future in [pool.submit(self.service.preload_student, student_id) for student_id in hot]:
+                try:
+                    future.result()
+                except Exception as e:
+                    failed += 1
+                    logger.debug(f"Could not preload a student during warm-up: {e}")
+        queued = 0
+        if rest and self.service.recommendation_cache is not None:
+            self.service.recommendation_cache.schedule_refresh(rest)
+            queued = len(rest)
+        return {'preloaded': len(hot) - failed, 'failed': failed, 'queued': queued}
@@ -0,0 +1,44 @@
+# tests/conftest.py
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.generator import generate_questions, generate_vocabulary  # noqa: E402
+from config.settings import app_config  # noqa: E402
+from core.invalidation_bus import invalidation_bus  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_settings(tmp_path, monkeypatch):
+    """Keep attempt logs in the test's directory and events off the host's bus."""
+    monkeypatch.setattr(app_config, 'attempt_log_dir', str(tmp_path / 'attempt_log'))
+    monkeypatch.setattr(invalidation_bus, 'enabled', False)
+
+
+@pytest.fixture
+def questions():
+    """A small synthetic catalogue in the ingest JSON format."""
+    return generate_questions(60, generate_vocabulary(20), steps=3, substeps_per_step=4)
+
+
+@pytest.fixture
+def questions_file(tmp_path, questions):
+    path = tmp_path / 'questions.json'
+    path.write_text(json.dumps(questions), encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture
+def roster_file(tmp_path):
+    path = tmp_path / 'roster.csv'
+    path.write_text(
+        "student_id,name,email\n"
+        "s1,Ada Lovelace,ada@example.com\n"
+        "s2,Alan Turing,alan@example.com\n",
+        encoding='utf-8'
+    )
+    return str(path)
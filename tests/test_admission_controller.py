@@ -0,0 +1,87 @@
+# tests/test_admission_controller.py
+"""AdmissionController: slot limits, load shedding and degraded-mode probing."""
+import threading
+import time
+
+import pytest
+
+from core.exceptions import ServiceOverloadedError
+from services.admission_controller import AdmissionController
+
+
+def _hold_slot(controller, release):
+    """Occupy one slot from a worker thread until ``release`` is set."""
+    entered = threading.Event()
+
+    def hold():
+        with controller.admit():
+            entered.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=hold, daemon=True)
+    thread.start()
+    assert entered.wait(5)
+    return thread
+
+
+def test_full_queue_is_shed():
+    controller = AdmissionController(max_concurrent=1, max_queue=0, timeout_seconds=5)
+    release = threading.Event()
+    holder = _hold_slot(controller, release)
+
+    with pytest.raises(ServiceOverloadedError):
+        with controller.admit():
+            pass
+    release.set()
+    holder.join(5)
+
+    with controller.admit():
+        pass
+    stats = controller.stats()
+    assert (stats['admitted'], stats['shed_queue_full'], stats['in_flight']) == (2, 1, 0)
+
+
+def test_expired_deadline_is_shed_before_queueing():
+    controller = AdmissionController(max_concurrent=4)
+
+    with pytest.raises(ServiceOverloadedError):
+        with controller.admit(deadline=time.monotonic() - 1):
+            pass
+    assert controller.stats()['shed_deadline'] == 1
+
+
+def test_queued_call_gives_up_at_its_deadline():
+    controller = AdmissionController(max_concurrent=1, max_queue=4)
+    release = threading.Event()
+    holder = _hold_slot(controller, release)
+
+    with pytest.raises(ServiceOverloadedError):
+        with controller.admit(deadline=time.monotonic() + 0.05):
+            pass
+    release.set()
+    holder.join(5)
+    assert controller.stats()['shed_deadline'] == 1
+
+
+def test_queued_call_runs_when_a_slot_frees():
+    controller = AdmissionController(max_concurrent=1, max_queue=4, timeout_seconds=5)
+    release = threading.Event()
+    holder = _hold_slot(controller, release)
+
+    threading.Timer(0.05, release.set).start()
+    with controller.admit():
+        pass
+    holder.join(5)
+    assert controller.stats()['admitted'] == 2
+
+
+def test_failure_degrades_until_a_probe_succeeds():
+    healthy = [False]
+    controller = AdmissionController(health_check=lambda: healthy[0], unhealthy_cooldown=0)
+
+    assert controller.available()
+    controller.report_failure(RuntimeError("connection refused"))
+    assert not controller.available()
+    healthy[0] = True
+    assert controller.available()
+    assert controller.stats()['database_available']
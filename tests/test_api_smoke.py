@@ -0,0 +1,69 @@
+# tests/test_api_smoke.py
+"""Smoke test of the HTTP API against the in-memory stand-in, over real sockets."""
+import asyncio
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from api.server import HttpServer, RecommendationApi, build_recommendation_service
+from core.exceptions import DataValidationError
+
+
+def _request(port, method, path, payload=None):
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", data=data, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def _serve(service, calls):
+    """Run the API on an ephemeral port and make ``calls`` against it from a worker thread."""
+    async def scenario():
+        server = HttpServer(RecommendationApi(service, 2), '127.0.0.1', 0)
+        await server.start()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, calls, server.port)
+        finally:
+            await server.stop()
+
+    return asyncio.run(scenario())
+
+
+def test_seeded_memory_backend_serves_a_student(questions_file, roster_file, questions):
+    service = build_recommendation_service('memory', questions_file, students_file=roster_file)
+
+    def calls(port):
+        status, body = _request(port, 'GET', '/students/s1/recommendation')
+        assert status == 200
+        first = body['question']['id']
+        assert first in {question['id'] for question in questions}
+
+        status, _ = _request(port, 'POST', '/students/s1/completions', {'question_id': first, 'is_mastered': True})
+        assert status == 202
+        status, body = _request(port, 'GET', '/students/s1/recommendation')
+        assert status == 200 and body['question']['id'] != first
+
+        status, body = _request(port, 'GET', '/students/s1/progress')
+        assert status == 200 and body['mastered_count'] == 1
+
+        assert _request(port, 'GET', '/students/nobody/recommendation')[0] == 404
+        assert _request(port, 'POST', '/students/nobody/completions', {'question_id': first})[0] == 404
+        assert _request(port, 'POST', '/students/s2/completions', {'question_id': 'missing'})[0] == 404
+
+    try:
+        _serve(service, calls)
+    finally:
+        service.close()
+
+
+def test_roster_with_rejected_rows_fails_startup(questions_file, tmp_path):
+    roster = tmp_path / 'bad.csv'
+    roster.write_text("student_id,name,email\ns1,Ada,not-an-email\n", encoding='utf-8')
+    with pytest.raises(DataValidationError):
+        build_recommendation_service('memory', questions_file, students_file=str(roster))
@@ -0,0 +1,68 @@
+# tests/test_attempt_log.py
+"""AttemptLog: appends, history filters and compaction of the segment tail."""
+import os
+from datetime import datetime, timedelta, timezone
+
+from repositories.attempt_log import AttemptLog
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _fill(log):
+    for minute, (student_id, question_id, mastered) in enumerate([
+        ('s1', 'q1', False), ('s1', 'q1', True), ('s2', 'q2', True), ('s1', 'q2', False),
+    ]):
+        log.append(student_id, question_id, mastered, duration_seconds=1.5, timestamp=START + timedelta(minutes=minute))
+
+
+def test_history_returns_attempts_oldest_first(tmp_path):
+    log = AttemptLog(str(tmp_path))
+    _fill(log)
+
+    history = log.history('s1')
+    assert [(a.question_id, a.mastered) for a in history] == [('q1', False), ('q1', True), ('q2', False)]
+    assert history[0].timestamp == START
+    assert history[0].duration_seconds == 1.5
+    assert log.history('nobody') == []
+
+
+def test_history_filters(tmp_path):
+    log = AttemptLog(str(tmp_path))
+    _fill(log)
+
+    assert [a.mastered for a in log.history('s1', question_id='q1')] == [False, True]
+    assert log.history('s1', question_id='unknown') == []
+    window = log.history('s1', since=START + timedelta(minutes=1), until=START + timedelta(minutes=3))
+    assert [a.timestamp for a in window] == [START + timedelta(minutes=1)]
+    assert [a.question_id for a in log.history('s1', limit=1)] == ['q2']
+    assert log.history('s1', limit=0) == []
+
+
+def test_compaction_keeps_history_and_removes_sealed_segments(tmp_path):
+    log = AttemptLog(str(tmp_path))
+    _fill(log)
+    before = {student: log.history(student) for student in ('s1', 's2')}
+
+    report = log.compact()
+    assert report['students'] == 2
+    assert report['records'] == 4
+    assert report['segments_removed'] == 1
+    assert os.path.exists(tmp_path / 'attempts.col')
+    assert {student: log.history(student) for student in ('s1', 's2')} == before
+
+    # New attempts land in a fresh segment and merge with the compacted block
+    log.append('s1', 'q3', True, timestamp=START + timedelta(minutes=10))
+    assert [a.question_id for a in log.history('s1')] == ['q1', 'q1', 'q2', 'q3']
+    assert log.compact()['records'] == 5
+    assert [a.question_id for a in log.history('s1')] == ['q1', 'q1', 'q2', 'q3']
+
+
+def test_another_process_reads_the_same_directory(tmp_path):
+    writer = AttemptLog(str(tmp_path))
+    _fill(writer)
+    writer.compact()
+    writer.append('s2', 'q9', False, timestamp=START + timedelta(hours=1))
+
+    reader = AttemptLog(str(tmp_path))
+    assert [a.question_id for a in reader.history('s2')] == ['q2', 'q9']
+    writer.stop()
@@ -0,0 +1,46 @@
+# tests/test_ingest_validator.py
+"""QuestionItemValidator: per-field errors, in process and across a process pool."""
+from utils import ingest_validator
+from utils.ingest_validator import QuestionItemValidator, question_item_validator
+
+
+def test_generated_items_are_valid(questions):
+    assert all(question_item_validator.check_item(item) == [] for item in questions)
+
+
+def test_every_failing_field_is_reported():
+    item = {
+        'id': 'q1', 'question_title': ' ', 'question': 'x', 'step_no': -1, 'sub_step_no': True, 'sl_no': 1,
+        'standard_concepts': ['a', 2], 'solution_approaches': [{'explanation': 'no name'}],
+    }
+
+    assert question_item_validator.check_item(item) == [
+        "question_title: cannot be empty",
+        "difficulty: missing",
+        "step_no: must be a non-negative number",
+        "sub_step_no: must be a non-negative number",
+        "standard_concepts: must be a list of strings",
+        "solution_approaches: approach 0 missing 'approach_name'",
+    ]
+    assert question_item_validator.check_item(['not', 'a', 'dict']) == ["item must be an object"]
+
+
+def test_validate_splits_valid_and_invalid_items(questions):
+    items = questions[:3] + [{'id': 'broken'}, 'junk']
+
+    report = question_item_validator.validate(items)
+    assert report['valid_items'] == questions[:3]
+    assert report['invalid_item_ids'] == ['broken', 'N/A']
+    assert [entry['index'] for entry in report['errors']] == [3, 4]
+
+
+def test_parallel_validation_matches_in_process(questions, monkeypatch):
+    monkeypatch.setattr(ingest_validator, 'PARALLEL_THRESHOLD', 10)
+    items = [dict(item) for item in questions]
+    items[7]['difficulty'] = ''
+    items[41]['sl_no'] = 'three'
+    validator = QuestionItemValidator()
+
+    parallel = validator.validate(items, workers=2, chunk_size=16)
+    assert parallel == validator.validate(items, workers=1)
+    assert [entry['index'] for entry in parallel['errors']] == [7, 41]
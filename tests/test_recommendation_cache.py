@@ -0,0 +1,94 @@
+# tests/test_recommendation_cache.py
+"""RecommendationCache: versioned refreshes, completion patches and bounded bookkeeping."""
+import time
+
+from models.question import Question
+from services.recommendation_cache import RecommendationCache
+
+
+def _question(question_id):
+    return Question(question_id, question_id, '', 'Easy', 1, 1, int(question_id[1:]), [], [], [])
+
+
+QUESTIONS = [_question(f"q{i}") for i in range(1, 6)]
+
+
+def _cache(**kwargs):
+    return RecommendationCache(lambda student_id: list(QUESTIONS), **kwargs)
+
+
+def test_refresh_is_stored_and_served():
+    cache = _cache()
+    assert cache.get('s1') is None
+
+    version = cache.version('s1')
+    assert cache.put('s1', QUESTIONS, version)
+    assert [q.id for q in cache.get('s1')] == ['q1', 'q2', 'q3', 'q4', 'q5']
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_refresh_that_raced_a_change_is_discarded():
+    cache = _cache()
+
+    version = cache.version('s1')
+    cache.record_completion('s1', 'q1', is_mastered=True)
+    assert not cache.put('s1', QUESTIONS, version)
+    assert cache.get('s1') is None
+
+    version = cache.version('s1')
+    cache.invalidate('s1')
+    assert not cache.put('s1', QUESTIONS, version)
+
+    version = cache.version('s1')
+    cache.clear()
+    assert not cache.put('s1', QUESTIONS, version)
+    assert cache.stats()['discarded_refreshes'] == 3
+
+
+def test_completion_patches_the_list_in_place():
+    cache = _cache(refill_below=0)
+    cache.put('s1', QUESTIONS, cache.version('s1'))
+
+    cache.record_completion('s1', 'q2', is_mastered=True)
+    cache.record_completion('s1', 'q3', is_mastered=False)
+    assert [q.id for q in cache.get('s1')] == ['q1', 'q3', 'q4', 'q5']
+    assert cache.stats()['patches'] == 1
+
+
+def test_low_list_is_refilled_in_the_background():
+    cache = _cache(refill_below=5)
+    cache.start()
+    try:
+        cache.put('s1', QUESTIONS, cache.version('s1'))
+        cache.record_completion('s1', 'q1', is_mastered=True)
+
+        deadline = time.monotonic() + 5
+        while cache.stats()['background_refreshes'] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(cache.get('s1')) == len(QUESTIONS)
+    finally:
+        cache.stop()
+
+
+def test_expired_list_is_a_miss():
+    cache = _cache(ttl_seconds=0)
+    cache.put('s1', QUESTIONS, cache.version('s1'))
+
+    assert cache.get('s1') is None
+    assert cache.stats()['expired'] == 1
+
+
+def test_versions_are_only_kept_for_cached_or_refreshing_students():
+    cache = _cache(max_entries=2)
+    for i in range(10):
+        student_id = f"s{i}"
+        cache.put(student_id, QUESTIONS, cache.version(student_id))
+        cache.record_completion(f"idle{i}", 'q1', is_mastered=True)
+    version = cache.version('inflight')
+    cache.abandon('inflight')
+
+    assert len(cache._entries) == 2
+    assert set(cache._versions) <= {'s8', 's9'}
+    assert cache._in_flight == {}
+    assert cache.put('inflight', QUESTIONS, version)
@@ -0,0 +1,35 @@
+# tests/test_record_decoder.py
+"""QuestionDecoder: compiled projections decode records in any column order."""
+import pytest
+
+from models.question import Question, SolutionApproach
+from repositories.record_decoder import QUESTION_COLUMNS, QuestionDecoder
+
+ROW = {
+    'id': 'q1', 'title': 'Two Sum', 'content': 'Find two numbers', 'difficulty': 'Easy',
+    'step_number': 1, 'sub_step_number': 2, 'sequence_number': 3,
+    'standard_concepts': ['Arrays'], 'sub_concepts': None,
+    'solution_approaches': [{'name': 'Hashing', 'explanation': 'One pass'}, 'not a map'],
+}
+
+
+def test_decodes_any_column_order():
+    decoder = QuestionDecoder()
+    keys = tuple(reversed(QUESTION_COLUMNS)) + ('extra',)
+    record = [ROW[key] for key in keys[:-1]] + ['ignored']
+
+    [question] = decoder.decode_all(keys, [record])
+    assert question == Question(
+        'q1', 'Two Sum', 'Find two numbers', 'Easy', 1, 2, 3, ['Arrays'], [],
+        [SolutionApproach('Hashing', 'One pass')],
+    )
+
+
+def test_projection_is_compiled_once():
+    decoder = QuestionDecoder()
+    assert decoder.compile(list(QUESTION_COLUMNS)) is decoder.compile(QUESTION_COLUMNS)
+
+
+def test_missing_columns_are_rejected():
+    with pytest.raises(ValueError, match='content'):
+        QuestionDecoder().compile([column for column in QUESTION_COLUMNS if column != 'content'])
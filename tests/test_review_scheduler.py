@@ -0,0 +1,81 @@
+# tests/test_review_scheduler.py
+"""SM-2 grading and cohort lease drains against the in-memory review repository."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from core.exceptions import DataValidationError
+from models.review import Review
+from models.student import Student
+from repositories.in_memory import (
+    InMemoryDatabaseManager, InMemoryReviewRepository, InMemorySetupRepository, InMemoryStudentRepository,
+)
+from services.data_population_service import DataPopulationService
+from services.review_scheduler import MIN_EASINESS, ReviewScheduler, sm2_next
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_sm2_intervals_grow_with_successful_reviews():
+    review = Review(student_id='s1', question_id='q1', due_at=NOW)
+
+    first = sm2_next(review, 4, NOW)
+    assert (first.repetitions, first.interval_days) == (1, 1.0)
+    assert first.due_at == NOW + timedelta(days=1)
+    assert first.last_reviewed_at == NOW
+
+    second = sm2_next(first, 4, NOW)
+    assert (second.repetitions, second.interval_days) == (2, 6.0)
+
+    third = sm2_next(second, 5, NOW)
+    assert third.repetitions == 3
+    assert third.interval_days == round(6.0 * second.easiness, 2)
+    assert third.easiness > second.easiness
+
+
+def test_sm2_failure_resets_and_easiness_is_floored():
+    review = Review(student_id='s1', question_id='q1', due_at=NOW, interval_days=30.0, repetitions=5, easiness=1.35)
+
+    failed = sm2_next(review, 0, NOW)
+    assert (failed.repetitions, failed.interval_days) == (0, 1.0)
+    assert failed.easiness == MIN_EASINESS
+
+
+@pytest.fixture
+def scheduler(questions):
+    db_manager = InMemoryDatabaseManager()
+    DataPopulationService(db_manager, InMemorySetupRepository(db_manager)).populate_from_data_list(questions)
+    students = InMemoryStudentRepository(db_manager)
+    for student_id in ('s1', 's2'):
+        students.create_or_update_student(Student(student_id=student_id, name=student_id, email=f"{student_id}@x.org"))
+    return ReviewScheduler(InMemoryReviewRepository(db_manager), lease_seconds=600)
+
+
+def test_first_mastery_creates_a_review(scheduler, questions):
+    question_id = questions[0]['id']
+
+    assert scheduler.record_completion('s1', question_id, is_mastered=False) is None
+    review = scheduler.record_completion('s1', question_id, is_mastered=True)
+    assert review.repetitions == 1
+    assert scheduler.review_repo.get_review('s1', question_id) == review
+    with pytest.raises(DataValidationError):
+        scheduler.record_completion('s1', question_id, is_mastered=True, quality=6)
+
+
+def test_drain_leases_due_reviews_once(scheduler, questions):
+    due = NOW - timedelta(minutes=5)
+    for student_id, question in (('s1', questions[0]), ('s1', questions[1]), ('s2', questions[2])):
+        scheduler.review_repo.upsert_review(Review(student_id=student_id, question_id=question['id'], due_at=due))
+    tomorrow = datetime.now(timezone.utc) + timedelta(days=1)
+    scheduler.review_repo.upsert_review(Review(student_id='s2', question_id=questions[3]['id'], due_at=tomorrow))
+
+    drained = scheduler.drain_cohort(['s1', 's2', 'unknown'], batch_size=1)
+    assert sorted(drained) == ['s1', 's2']
+    assert [r.question_id for r in drained['s1']] == [questions[0]['id'], questions[1]['id']]
+    assert [r.question_id for r in drained['s2']] == [questions[2]['id']]
+
+    # Leased reviews are pushed past the lease, so a repeated drain takes nothing
+    assert scheduler.drain_cohort(['s1', 's2']) == {}
+    leased = scheduler.review_repo.get_review('s1', questions[0]['id'])
+    assert leased.due_at > datetime.now(timezone.utc) + timedelta(seconds=500)
+    assert scheduler.due_within(within_seconds=2 * 86400)[-1].question_id == questions[3]['id']
@@ -0,0 +1,210 @@
+# utils/ingest_validator.py
+"""
+Precompiled field-level validation for question ingest items.
+
+The schema is compiled once into a flat tuple of (field, check) pairs so
+validating an item is a single loop over plain function calls, with no
+per-item dispatch on rule types. Every failing field is reported, not just
+the first, so a bad file can be fixed in one pass:
+
+    report = question_item_validator.validate(items, workers=4)
+    report['valid_items'], report['errors']
+
+Large inputs can be split across a process pool. Where fork is available
+the workers inherit the items and are only sent offsets; they send back
+just the indexes of invalid items and their errors.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A check returns None when the value is acceptable, otherwise an error message
+Check = Callable[[Any], Optional[str]]
+
+_MISSING = object()
+
+REQUIRED_FIELDS = ('id', 'question_title', 'question', 'difficulty', 'step_no', 'sub_step_no', 'sl_no')
+NON_NEGATIVE_FIELDS = ('step_no', 'sub_step_no', 'sl_no')
+NON_EMPTY_FIELDS = ('id', 'question_title', 'question', 'difficulty')
+NAME_LIST_FIELDS = ('standard_concepts', 'sub_concepts')
+
+# Below this many items a process pool costs more than it saves
+PARALLEL_THRESHOLD = 50_000
+
+
+def _present(value: Any) -> Optional[str]:
+    return None
+
+
+def _non_empty(value: Any) -> Optional[str]:
+    if type(value) is str:
+        return None if value.strip() else "cannot be empty"
+    if value is None or not str(value).strip():
+        return "cannot be empty"
+    return None
+
+
+def _non_negative_number(value: Any) -> Optional[str]:
+    kind = type(value)
+    if (kind is int or kind is float) and value >= 0:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0:
+        return None
+    return "must be a non-negative number"
+
+
+def _name_list(value: Any) -> Optional[str]:
+    if type(value) is not list:
+        return "must be a list"
+    for name in value:
+        if type(name) is not str:
+            return "must be a list of strings"
+    return None
+
+
+def _approach_list(value: Any) -> Optional[str]:
+    if type(value) is not list:
+        return "must be a list"
+    for i, approach in enumerate(value):
+        if type(approach) is not dict:
+            return f"approach {i} must be a dictionary"
+        name = approach.get('approach_name')
+        if type(name) is not str or not name.strip():
+            return f"approach {i} missing 'approach_name'"
+        explanation = approach.get('explanation', '')
+        if type(explanation) is not str:
+            return f"approach {i} 'explanation' must be a string"
+    return None
+
+
+class QuestionItemValidator:
+    """Validates ingest items against a schema compiled at construction time."""
+
+    def __init__(
+        self,
+        required: Sequence[str] = REQUIRED_FIELDS,
+        non_empty: Sequence[str] = NON_EMPTY_FIELDS,
+        non_negative: Sequence[str] = NON_NEGATIVE_FIELDS,
+        name_lists: Sequence[str] = NAME_LIST_FIELDS,
+        approaches: str = 'solution_approaches'
+    ):
+        self.required = tuple(required)
+        checks: List[Tuple[str, Check]] = []
+        checks.extend((field, _non_empty) for field in non_empty)
+        checks.extend((field, _non_negative_number) for field in non_negative)
+        checks.extend((field, _name_list) for field in name_lists)
+        if approaches:
+            checks.append((approaches, _approach_list))
+        checks.extend((field, _present) for field in self.required if field not in dict(checks))
+        # One flat (field, check, required) tuple: a missing required field is
+        # reported once as missing, a missing optional field is skipped
+        self._checks = tuple((field, check, field in self.required) for field, check in checks)
+
+    def check_item(self, item: Any) -> List[str]:
+        """
+        Validate one item.
+
+        Returns:
+            Error messages of the form "<field>: <problem>"; empty when valid
+        """
+        if type(item) is not dict:
+            return ["item must be an object"]
+        get = item.get
+        errors = []
+        for field, check, required in self._checks:
+            value = get(field, _MISSING)
+            if value is _MISSING:
+                if required:
+                    errors.append(f"{field}: missing")
+                continue
+            message = check(value)
+            if message:
+                errors.append(f"{field}: {message}")
+        return errors
+
+    def check_range(self, items: Sequence[Any], offset: int = 0) -> List[Tuple[int, List[str]]]:
+        """(index, errors) for every invalid item; indexes are shifted by offset."""
+        check_item = self.check_item
+        invalid = []
+        for index, item in enumerate(items, offset):
+            errors = check_item(item)
+            if errors:
+                invalid.append((index, errors))
+        return invalid
+
+    def validate(self, items: Sequence[Any], workers: int = 1, chunk_size: int = 20_000) -> Dict[str, Any]:
+        """
+        Validate every item and build a per-item error report.
+
+        Args:
+            items: Ingest items
+            workers: Processes to validate with; 0 uses every CPU. Inputs smaller
+                than PARALLEL_THRESHOLD are always validated in process
+            chunk_size: Items sent to a worker at a time
+
+        Returns:
+            Dictionary with valid_items, invalid_items, invalid_item_ids and
+            errors, a list of {'index', 'id', 'errors'} per invalid item
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(items) >= PARALLEL_THRESHOLD:
+            invalid = self._check_parallel(items, workers, chunk_size)
+        else:
+            invalid = self.check_range(items)
+
+        invalid_indexes = {index for index, _ in invalid}
+        valid_items = [item for index, item in enumerate(items) if index not in invalid_indexes] \
+            if invalid_indexes else list(items)
+        invalid_items = [items[index] for index, _ in invalid]
+        errors = [
+            {'index': index, 'id': _item_id(items[index]), 'errors': messages}
+            for index, messages in invalid
+        ]
+        return {
+            'valid_items': valid_items,
+            'invalid_items': invalid_items,
+            'invalid_item_ids': [entry['id'] for entry in errors],
+            'errors': errors,
+        }
+
+    def _check_parallel(self, items: Sequence[Any], workers: int, chunk_size: int) -> List[Tuple[int, List[str]]]:
+        global _inherited_items
+        offsets = range(0, len(items), chunk_size)
+        logger.debug(f"Validating {len(items)} items in {len(offsets)} chunks on {workers} processes")
+        if 'fork' in multiprocessing.get_all_start_methods():
+            # Forked workers inherit the items, so only offsets cross the pipe
+            _inherited_items = items
+            try:
+                with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as pool:
+                    results = pool.map(_check_inherited, repeat(self), offsets, repeat(chunk_size))
+                    return [entry for chunk in results for entry in chunk]
+            finally:
+                _inherited_items = None
+        with ProcessPoolExecutor(workers) as pool:
+            results = pool.map(
+                self.check_range,
+                (items[offset:offset + chunk_size] for offset in offsets),
+                offsets
+            )
+            return [entry for chunk in results for entry in chunk]
+
+
+# Items being validated by _check_parallel, visible to forked workers
+_inherited_items: Optional[Sequence[Any]] = None
+
+
+def _check_inherited(validator: QuestionItemValidator, offset: int, size: int) -> List[Tuple[int, List[str]]]:
+    return validator.check_range(_inherited_items[offset:offset + size], offset)
+
+
+def _item_id(item: Any) -> Any:
+    return item.get('id', 'N/A') if type(item) is dict else 'N/A'
+
+
+# Shared validator for the question ingest format (data/questions.json).
+question_item_validator = QuestionItemValidator()
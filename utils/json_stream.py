@@ -0,0 +1,113 @@
+# utils/json_stream.py
+"""
+Incremental reading of large JSON item files.
+
+Reads either a top-level JSON array or a stream of concatenated / newline-
+delimited objects (JSON Lines) and yields one item at a time, so memory is
+bounded by the largest single item rather than the file size.
+"""
+import json
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Tuple
+
+from core.exceptions import DataValidationError
+
+_WHITESPACE = ' \t\r\n'
+_CHUNK_SIZE = 1 << 20
+
+
+def iter_json_items(
+    stream: BinaryIO,
+    chunk_size: int = _CHUNK_SIZE,
+    on_chunk: Optional[Callable[[bytes], None]] = None
+) -> Iterator[Any]:
+    """
+    Yield the items of a JSON array or JSON Lines file.
+
+    Args:
+        stream: File opened in binary mode
+        chunk_size: Bytes read at a time
+        on_chunk: Called with every raw chunk read, e.g. to hash the file in the same pass
+
+    Raises:
+        DataValidationError: If the content is not valid JSON
+    """
+    decoder = json.JSONDecoder()
+    reader = _Utf8Reader(stream, chunk_size, on_chunk)
+    buffer = ''
+    position = 0
+    in_array: Optional[bool] = None
+    expect_separator = False
+
+    while True:
+        # Skip whitespace and, inside an array, the separators between items
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer) or reader.eof:
+                break
+            buffer, position = reader.read(), 0
+
+        if position >= len(buffer):
+            if in_array:
+                raise DataValidationError("Invalid JSON format: unterminated array")
+            return
+
+        char = buffer[position]
+        if in_array is None:
+            in_array = char == '['
+            if in_array:
+                position += 1
+                continue
+        if in_array:
+            if char == ']':
+                return
+            if expect_separator:
+                if char != ',':
+                    raise DataValidationError(
+                        f"Invalid JSON format: expected ',' or ']' near {buffer[position:position + 20]!r}"
+                    )
+                position += 1
+                expect_separator = False
+                continue
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            if reader.eof:
+                raise DataValidationError(f"Invalid JSON format: {e}")
+            # The item continues past the buffer; read more and retry
+            buffer, position = buffer[position:] + reader.read(), 0
+            continue
+        yield item
+        position = end
+        expect_separator = bool(in_array)
+        if position > chunk_size:
+            buffer, position = buffer[position:], 0
+
+
+class _Utf8Reader:
+    """Reads text from a binary stream without splitting multi-byte characters."""
+
+    def __init__(self, stream: BinaryIO, chunk_size: int, on_chunk: Optional[Callable[[bytes], None]]):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.on_chunk = on_chunk
+        self.eof = False
+        self._pending = b''
+
+    def read(self) -> str:
+        chunk = self.stream.read(self.chunk_size)
+        if chunk and self.on_chunk is not None:
+            self.on_chunk(chunk)
+        self.eof = not chunk
+        text, self._pending = _decode_utf8(self._pending + chunk, final=self.eof)
+        return text
+
+
+def _decode_utf8(data: bytes, final: bool) -> Tuple[str, bytes]:
+    try:
+        return data.decode('utf-8'), b''
+    except UnicodeDecodeError as e:
+        if final or e.start < len(data) - 3:
+            raise DataValidationError(f"Could not decode file as UTF-8: {e}")
+        return data[:e.start].decode('utf-8'), data[e.start:]
@@ -40,4 +40,5 @@ class ValidationUtils:
             True if student ID is valid, False otherwise
         """
         if not student_id or not isinstance(student_id, str):
-            return False
\ No newline at end of file
+            return False
+        return bool(ValidationUtils.STUDENT_ID_PATTERN.match(student_id))